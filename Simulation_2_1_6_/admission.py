@@ -0,0 +1,115 @@
+"""
+TinyLFU-style cache admission.
+
+A router with an admission filter records every interest it sees in a count-min sketch
+(behind a doorkeeper Bloom filter that absorbs one-hit wonders). When a returning data
+packet would force an eviction, the new item is admitted only if its estimated frequency
+is higher than that of the victim chosen by the router's replacement policy. The sketch is
+aged by halving all counters every `sample_size` recorded accesses, so the filter tracks
+recent popularity in a fixed amount of memory regardless of catalogue size.
+"""
+
+import zlib
+
+import numpy as np
+
+
+def _hashes(key, count, modulus):
+    """`count` deterministic indexes in [0, modulus) by double hashing (crc32 + adler32)."""
+    data = key.encode('utf-8')
+    h1 = zlib.crc32(data)
+    h2 = zlib.adler32(data) | 1
+    return [(h1 + i * h2) % modulus for i in range(count)]
+
+
+class CountMinSketch:
+    """Count-min sketch with small saturating counters and halving-based aging."""
+
+    def __init__(self, width=1024, depth=4, max_count=15):
+        self.width = width
+        self.depth = depth
+        self.max_count = max_count
+        self.table = np.zeros((depth, width), dtype=np.uint8)
+        self._rows = np.arange(depth)
+
+    def increment(self, key):
+        columns = _hashes(key, self.depth, self.width)
+        current = self.table[self._rows, columns]
+        # Conservative update: only raise the counters that hold the current minimum
+        minimum = current.min()
+        if minimum < self.max_count:
+            self.table[self._rows, columns] = np.where(current == minimum, minimum + 1, current)
+
+    def estimate(self, key):
+        return int(self.table[self._rows, _hashes(key, self.depth, self.width)].min())
+
+    def halve(self):
+        self.table >>= 1
+
+    def clear(self):
+        self.table.fill(0)
+
+
+class BloomFilter:
+    def __init__(self, size=8192, hashes=3):
+        self.size = size
+        self.hashes = hashes
+        self.bits = np.zeros(size, dtype=bool)
+
+    def __contains__(self, key):
+        return bool(self.bits[_hashes(key, self.hashes, self.size)].all())
+
+    def add(self, key):
+        self.bits[_hashes(key, self.hashes, self.size)] = True
+
+    def clear(self):
+        self.bits.fill(False)
+
+
+class TinyLFUAdmission:
+    """
+    Admission filter for a Router: `record()` every request, `admit(candidate, victim)` when
+    caching `candidate` would evict `victim`.
+    """
+
+    def __init__(self, width=1024, depth=4, doorkeeper_bits=8192, sample_size=None):
+        self.sketch = CountMinSketch(width=width, depth=depth)
+        self.doorkeeper = BloomFilter(size=doorkeeper_bits)
+        self.sample_size = sample_size or 10 * width
+        self.reset()
+
+    @classmethod
+    def for_cache(cls, cache_items):
+        """Size the sketch for a cache holding about `cache_items` objects (sample = 10x cache)."""
+        sample_size = max(10 * cache_items, 64)
+        width = 1 << max(6, (sample_size - 1).bit_length())
+        return cls(width=width, doorkeeper_bits=4 * width, sample_size=sample_size)
+
+    def reset(self):
+        self.sketch.clear()
+        self.doorkeeper.clear()
+        self.samples = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    def record(self, key):
+        if key in self.doorkeeper:
+            self.sketch.increment(key)
+        else:
+            self.doorkeeper.add(key)
+        self.samples += 1
+        if self.samples >= self.sample_size:
+            # Aging: halve every counter and forget the one-hit wonders
+            self.sketch.halve()
+            self.doorkeeper.clear()
+            self.samples //= 2
+
+    def estimate(self, key):
+        return self.sketch.estimate(key) + (1 if key in self.doorkeeper else 0)
+
+    def admit(self, candidate, victim):
+        if self.estimate(candidate) > self.estimate(victim):
+            self.admitted += 1
+            return True
+        self.rejected += 1
+        return False
@@ -0,0 +1,413 @@
+"""
+asyncio network emulation with concurrent in-flight interests.
+
+Unlike run_simulation, where one interest is resolved recursively before the next starts,
+every Router here runs as its own task that drains an inbound queue, and many subscribers
+issue interests concurrently. Interests travel hop by hop: a router answers from its
+Content Store, aggregates the interest in its PIT when the same name is already pending,
+or forwards it along the FIB. Data follows the PIT entries back downstream and is cached
+by every router on the way through Router.receive_data (so the configured eviction policy
+applies). A PIT entry lives for `interest_lifetime` (the subscribers' timeout), or until the
+publisher turns out to have no data; after that a retransmission is forwarded again.
+
+Links are directional and have a propagation delay and a bandwidth; a link transmits one
+packet at a time, so packets queue behind each other under load. All delays are expressed
+in virtual seconds and scheduled on the event loop scaled by `time_scale` (virtual time =
+wall time / time_scale), so a whole run stays on one machine without external services.
+
+Router and subscriber work (cache updates, popularity tables) runs synchronously on the
+event loop. The wall time it takes is kept out of virtual time, and instead every packet
+costs `processing_delay` virtual seconds at each router, which serves its queue one packet
+at a time. Timers are re-checked against the virtual clock when they fire, so a timer that
+fires late because the loop was busy is still delivered at its virtual due time. The event
+loop's own overhead is still counted, so very small time scales inflate latencies a little.
+The per-packet CSV tables and event logs of the routers are not written while
+emulating (Router.WRITE_TABLES), since that disk I/O is not part of the modelled network.
+"""
+
+import argparse
+import asyncio
+import collections
+import contextlib
+import csv
+import io
+import os
+import random
+import statistics
+
+from latency_model import LatencyModel
+from main import Router, Publisher, InterestPacket, DataPacket
+from metrics_registry import MetricsRegistry
+
+
+class Link:
+    """One direction of a link: FIFO transmission at `bandwidth` bytes/s plus `delay` seconds of propagation."""
+
+    def __init__(self, delay, bandwidth):
+        self.delay = delay
+        self.bandwidth = bandwidth
+        self.busy_until = 0.0
+        self.bytes_sent = 0
+        self.packets_sent = 0
+
+    def transmit(self, emulator, size, deliver, message):
+        now = emulator.now()
+        start = max(now, self.busy_until)
+        self.busy_until = start + (size / self.bandwidth if self.bandwidth else 0.0)
+        self.bytes_sent += size
+        self.packets_sent += 1
+        emulator.schedule(self.busy_until + self.delay - now, deliver, message)
+
+
+class RouterTask:
+    """Runs one Router: consumes its inbound queue and forwards interests and data over links."""
+
+    def __init__(self, emulator, router):
+        self.emulator = emulator
+        self.router = router
+        self.name = router.name
+        self.queue = asyncio.Queue()
+        self.pit = {}  # content name -> list of downstream faces waiting for it
+        self.aggregated = 0
+        self.expired = 0  # PIT entries dropped unsatisfied
+        self.max_pit_size = 0
+        self.max_queue_depth = 0
+
+    def deliver(self, message):
+        self.queue.put_nowait(message)
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+
+    async def run(self):
+        emulator = self.emulator
+        while True:
+            kind, packet, face = await self.queue.get()
+            if emulator.processing_delay:
+                await emulator.sleep(emulator.processing_delay)
+            with emulator.processing():
+                if kind == 'interest':
+                    self.on_interest(packet, face)
+                else:
+                    self.on_data(packet)
+
+    def on_interest(self, packet, face):
+        router = self.router
+        router.content_popularity.offer(packet.name)
+        if self.name in packet.path:
+            return  # loop: drop, as the sequential simulator does
+        router.total_requests += 1
+        packet.path.append(self.name)
+
+        if packet.name in router.cs:
+            router.cache_hits += 1
+            router.requests_served_from_cache += 1
+            self.emulator.metrics.record_cache_hit(self.name)
+            self.emulator.send(self, face, 'data', DataPacket(packet.name, packet.name))
+            return
+
+        if packet.name in self.pit:
+            # Interest aggregation: the name is already pending upstream
+            self.pit[packet.name].append(face)
+            self.aggregated += 1
+            return
+
+        router.publisher_hits += 1
+        self.emulator.metrics.record_cache_miss(self.name)
+        next_hop = router.fib.get(packet.name)
+        if next_hop is None:
+            return  # no route; the subscriber times out
+
+        faces = self.pit[packet.name] = [face]
+        router.pit[packet.name] = getattr(face, 'name', None)
+        self.max_pit_size = max(self.max_pit_size, len(self.pit))
+        self.emulator.schedule(self.emulator.interest_lifetime, self._expire, (packet.name, faces))
+        if isinstance(next_hop, Router):
+            self.emulator.send(self, self.emulator.tasks[next_hop.name], 'interest', packet)
+        elif isinstance(next_hop, Publisher):
+            router.requests_served_from_publisher += 1
+            self.emulator.fetch_from_publisher(self, next_hop, packet)
+
+    def drop_pending(self, name, faces=None):
+        """Remove the PIT entry for `name` (only if it is still `faces`, when given); True if removed."""
+        if name not in self.pit or (faces is not None and self.pit[name] is not faces):
+            return False
+        del self.pit[name]
+        self.router.pit.pop(name, None)
+        self.expired += 1
+        return True
+
+    def _expire(self, entry):
+        self.drop_pending(*entry)
+
+    def on_data(self, data_packet):
+        faces = self.pit.pop(data_packet.name, None)
+        self.router.pit.pop(data_packet.name, None)
+        if faces is None:
+            return  # unsolicited data
+        self.router.receive_data(data_packet)
+        for face in faces:
+            self.emulator.send(self, face, 'data', data_packet)
+
+
+class SubscriberAgent:
+    """Issues interests for one Subscriber and resolves them when the data comes back."""
+
+    def __init__(self, emulator, subscriber):
+        self.emulator = emulator
+        self.subscriber = subscriber
+        self.name = subscriber.name
+        self.pending = collections.defaultdict(list)  # content name -> futures
+
+    def deliver(self, message):
+        _, data_packet, _ = message
+        for future in self.pending.pop(data_packet.name, []):
+            if not future.done():
+                future.set_result(self.emulator.now())
+        if self.emulator.feedback:
+            with self.emulator.processing():
+                self.subscriber.receive_data(data_packet)
+
+    @staticmethod
+    def _expire(future):
+        if not future.done():
+            future.set_exception(asyncio.TimeoutError())
+
+    async def request(self, content):
+        emulator = self.emulator
+        packet = InterestPacket(content)
+        packet.original_hop_count = len(emulator.tasks)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[content].append(future)
+        sent_at = emulator.now()
+        emulator.send(self, emulator.tasks[self.subscriber.connected_router.name], 'interest', packet)
+        emulator.schedule(emulator.interest_lifetime, self._expire, future)
+        try:
+            received_at = await future
+        except asyncio.TimeoutError:
+            emulator.timeouts += 1
+            return
+        emulator.latencies.append(received_at - sent_at)
+        emulator.hops.append(len(packet.path))
+        emulator.metrics.record_interest(self.name, packet.original_hop_count, len(packet.path))
+
+    async def run(self, contents, requests, rate, window, rng):
+        """Issue `requests` interests with exponential gaps, keeping at most `window` in flight."""
+        slots = asyncio.Semaphore(window)
+        in_flight = []
+
+        async def issue(content):
+            try:
+                await self.request(content)
+            finally:
+                slots.release()
+
+        for _ in range(requests):
+            await self.emulator.sleep(rng.expovariate(rate))
+            await slots.acquire()
+            in_flight.append(asyncio.ensure_future(issue(rng.choice(contents))))
+        await asyncio.gather(*in_flight)
+
+
+class AsyncEmulator:
+    def __init__(self, routers, publishers, subscribers, link_delay=0.005, bandwidth=12.5e6, publisher_delay=0.02,
+                 interest_size=100, interest_lifetime=4.0, time_scale=1.0, link_overrides=None, feedback=True,
+                 processing_delay=LatencyModel.DEFAULT_PROCESSING_COST, write_tables=False):
+        self.routers = routers
+        self.publishers = publishers
+        self.subscribers = [s for s in subscribers if getattr(s, 'connected_router', None) is not None]
+        self.link_delay = link_delay
+        self.bandwidth = bandwidth
+        self.publisher_delay = publisher_delay
+        self.interest_size = interest_size
+        self.interest_lifetime = interest_lifetime
+        self.time_scale = time_scale
+        self.link_overrides = link_overrides or {}  # (from name, to name) -> (delay, bandwidth)
+        self.feedback = feedback
+        self.processing_delay = processing_delay  # virtual seconds per packet per router
+        self.write_tables = write_tables  # keep writing the routers' per-packet CSVs and logs
+        self.links = {}
+        self.metrics = MetricsRegistry(keep_history=False)
+        self.content_sizes = {}
+
+    # ----- virtual time -----
+    def now(self):
+        wall = self.loop.time() if self._busy_since is None else self._busy_since  # frozen while processing
+        return (wall - self._start - self._processing) / self.time_scale
+
+    @contextlib.contextmanager
+    def processing(self):
+        """Keep the wall time of the enclosed synchronous work out of virtual time."""
+        started = self._busy_since = self.loop.time()
+        try:
+            yield
+        finally:
+            self._processing += self.loop.time() - started
+            self._busy_since = None
+
+    def schedule(self, delay, deliver, message):
+        self._deliver_at(self.now() + max(delay, 0.0), deliver, message)
+
+    def _deliver_at(self, due, deliver, message):
+        remaining = (due - self.now()) * self.time_scale
+        if remaining > 1e-6:
+            self.loop.call_later(remaining, self._deliver_at, due, deliver, message)
+        else:
+            deliver(message)
+
+    def sleep(self, delay):
+        """Future resolved after `delay` virtual seconds."""
+        future = self.loop.create_future()
+        self.schedule(delay, lambda f: f.done() or f.set_result(None), future)
+        return future
+
+    # ----- transport -----
+    def link(self, src, dst):
+        key = (src.name, dst.name)
+        if key not in self.links:
+            self.links[key] = Link(*self.link_overrides.get(key, (self.link_delay, self.bandwidth)))
+        return self.links[key]
+
+    def packet_size(self, kind, packet):
+        if kind == 'interest':
+            return self.interest_size
+        if packet.name not in self.content_sizes and isinstance(packet.content, bytes):
+            self.content_sizes[packet.name] = len(packet.content)
+        return self.content_sizes.get(packet.name, self.interest_size)
+
+    def send(self, src, dst, kind, packet):
+        self.link(src, dst).transmit(self, self.packet_size(kind, packet), dst.deliver, (kind, packet, src))
+
+    def fetch_from_publisher(self, task, publisher, packet):
+        data_packet = publisher.serve_content(packet.name)
+        if data_packet is None:
+            task.drop_pending(packet.name)  # nothing will come back; let retransmissions through
+            return
+        size = self.packet_size('data', data_packet)
+        transfer = self.publisher_delay + (size / self.bandwidth if self.bandwidth else 0.0)
+        self.schedule(transfer, task.deliver, ('data', data_packet, publisher))
+
+    # ----- run -----
+    async def run(self, requests_per_subscriber=20, rate=5.0, window=4, contents=None, seed=0, policy=None):
+        self.loop = asyncio.get_running_loop()
+        self._start = self.loop.time()
+        self._processing = 0.0  # wall seconds spent in router and subscriber work
+        self._busy_since = None
+        self.latencies, self.hops, self.timeouts = [], [], 0
+        self.metrics.begin_run(policy)
+        for router in self.routers:
+            if policy is not None:
+                router.caching_policy = policy
+            router.reset()
+        write_tables, Router.WRITE_TABLES = Router.WRITE_TABLES, self.write_tables
+
+        self.tasks = {router.name: RouterTask(self, router) for router in self.routers}
+        runners = [asyncio.ensure_future(task.run()) for task in self.tasks.values()]
+        contents = contents or sorted({name for router in self.routers for name in router.fib})
+        rng = random.Random(seed)
+        agents = [SubscriberAgent(self, subscriber) for subscriber in self.subscribers]
+        try:
+            await asyncio.gather(*(agent.run(contents, requests_per_subscriber, rate, window,
+                                             random.Random(rng.getrandbits(64))) for agent in agents))
+        finally:
+            for runner in runners:
+                runner.cancel()
+            await asyncio.gather(*runners, return_exceptions=True)
+            Router.WRITE_TABLES = write_tables
+        self.elapsed = self.now()
+        return self.report()
+
+    def report(self):
+        latencies = sorted(self.latencies)
+
+        def percentile(q):
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else 0
+
+        return {
+            'Virtual Time (s)': self.elapsed,
+            'Satisfied': len(latencies),
+            'Timeouts': self.timeouts,
+            'Throughput (interests/s)': len(latencies) / self.elapsed if self.elapsed else 0,
+            'Mean Latency (ms)': statistics.mean(latencies) * 1000 if latencies else 0,
+            'P50 Latency (ms)': percentile(0.50),
+            'P95 Latency (ms)': percentile(0.95),
+            'P99 Latency (ms)': percentile(0.99),
+            'Cache Hit Ratio': self.metrics.cache_hit_ratio,
+            'Hop Reduction': self.metrics.hop_reduction,
+            'PIT Aggregations': sum(task.aggregated for task in self.tasks.values()),
+            'PIT Expiries': sum(task.expired for task in self.tasks.values()),
+            'Max PIT Size': max((task.max_pit_size for task in self.tasks.values()), default=0),
+            'Max Queue Depth': max((task.max_queue_depth for task in self.tasks.values()), default=0),
+        }
+
+    def router_table(self):
+        return [{
+            'Router': task.name,
+            'Cache Hits': task.router.cache_hits,
+            'Cache Misses': task.router.publisher_hits,
+            'Aggregated Interests': task.aggregated,
+            'Expired Interests': task.expired,
+            'Max PIT Size': task.max_pit_size,
+            'Max Queue Depth': task.max_queue_depth,
+            'Evictions': task.router.cache_evictions,
+        } for task in self.tasks.values()]
+
+
+def run_emulation(routers, publishers, subscribers, policy='LRU', quiet=True, **kwargs):
+    """Run one emulation synchronously and return (summary, per-router table)."""
+    run_keys = ('requests_per_subscriber', 'rate', 'window', 'contents', 'seed')
+    run_kwargs = {k: kwargs.pop(k) for k in run_keys if k in kwargs}
+    emulator = AsyncEmulator(routers, publishers, subscribers, **kwargs)
+    with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+        summary = asyncio.run(emulator.run(policy=policy, **run_kwargs))
+    return summary, emulator.router_table()
+
+
+def save_emulation_results(summary, router_table, policy, output_dir='Simulation_Results'):
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f'async_emulation_{policy}.csv')
+    with open(path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=list(router_table[0]))
+        writer.writeheader()
+        writer.writerows(router_table)
+    print(f"Per-router emulation results saved to {path}")
+
+
+def main(argv=None):
+    from main import load_network
+
+    parser = argparse.ArgumentParser(description="Emulate the saved network with concurrent interests on asyncio.")
+    parser.add_argument('--policies', nargs='+', default=['LRU', 'LFU', 'FIFO', 'MRU', 'FACR', 'Rdm'])
+    parser.add_argument('--requests', type=int, default=20, help="Interests issued per subscriber")
+    parser.add_argument('--rate', type=float, default=5.0, help="Interest rate per subscriber (per virtual second)")
+    parser.add_argument('--window', type=int, default=4, help="Maximum in-flight interests per subscriber")
+    parser.add_argument('--link-delay', type=float, default=0.005, help="Propagation delay per link (s)")
+    parser.add_argument('--bandwidth', type=float, default=12.5e6, help="Link bandwidth (bytes/s)")
+    parser.add_argument('--publisher-delay', type=float, default=0.02, help="Publisher fetch delay (s)")
+    parser.add_argument('--time-scale', type=float, default=1.0, help="Wall seconds per virtual second")
+    parser.add_argument('--processing-delay', type=float, default=LatencyModel.DEFAULT_PROCESSING_COST,
+                        help="Router processing time per packet (virtual s)")
+    parser.add_argument('--write-tables', action='store_true',
+                        help="Keep writing the routers' per-packet CSV tables and logs (slow)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    network = load_network()
+    if network is None:
+        print("No saved network found; run main.py once to create one.")
+        return
+    routers, publishers, subscribers = network
+
+    for policy in args.policies:
+        summary, table = run_emulation(
+            routers, publishers, subscribers, policy=policy,
+            requests_per_subscriber=args.requests, rate=args.rate, window=args.window, seed=args.seed,
+            link_delay=args.link_delay, bandwidth=args.bandwidth, publisher_delay=args.publisher_delay,
+            time_scale=args.time_scale, processing_delay=args.processing_delay, write_tables=args.write_tables,
+        )
+        print(f"\n{policy}:")
+        for key, value in summary.items():
+            print(f"  {key:<26} {value:.3f}" if isinstance(value, float) else f"  {key:<26} {value}")
+        save_emulation_results(summary, table, policy)
+
+
+if __name__ == "__main__":
+    main()
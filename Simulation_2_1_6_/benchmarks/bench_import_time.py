@@ -0,0 +1,75 @@
+"""
+Import-time benchmark for the simulator modules.
+
+Each sample runs `import <module>` in a fresh interpreter, so the numbers reflect what a
+worker process spawned by a multiprocessing pool pays before it can start simulating.
+It also reports which heavy stacks (pandas, matplotlib, ...) were pulled in by the import.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SIMULATION_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['numpy', 'pandas', 'matplotlib', 'networkx', 'sklearn']
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed, [m for m in {heavy!r} if m in sys.modules]]))
+"""
+
+
+def measure_import(module, repeat=5):
+    """Import `module` in `repeat` fresh interpreters and return timing statistics."""
+    samples = []
+    heavy = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, '-c', _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=SIMULATION_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        elapsed, heavy = json.loads(result.stdout.strip().splitlines()[-1])
+        samples.append(elapsed * 1000)
+
+    return {
+        'module': module,
+        'repeat': repeat,
+        'min_ms': min(samples),
+        'median_ms': statistics.median(samples),
+        'max_ms': max(samples),
+        'heavy_modules_loaded': heavy,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold import time of simulator modules.")
+    parser.add_argument('modules', nargs='*', default=['main', 'router_selection_system'])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', dest='json_path', help="Optional path to write the results as JSON")
+    args = parser.parse_args(argv)
+
+    results = [measure_import(module, args.repeat) for module in args.modules]
+    for res in results:
+        heavy = ', '.join(res['heavy_modules_loaded']) or 'none'
+        print(f"import {res['module']:<28} min {res['min_ms']:8.2f} ms  "
+              f"median {res['median_ms']:8.2f} ms  heavy modules: {heavy}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f"Import-time results saved to {args.json_path}")
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
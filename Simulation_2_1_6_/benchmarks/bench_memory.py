@@ -0,0 +1,153 @@
+"""
+Memory benchmark for routers and packets.
+
+Measures with tracemalloc the bytes allocated per Router, both freshly built with its FIB
+and after its Content Store and tables have filled. It also measures the bytes per
+in-flight InterestPacket that has crossed `hops` routers. Like bench_simulation, it runs in
+a temporary working directory.
+
+    python benchmarks/bench_memory.py                    # measure the current tree
+    python benchmarks/bench_memory.py --save-baseline    # store as the new baseline
+    python benchmarks/bench_memory.py --compare          # compare with the stored baseline
+"""
+
+import argparse
+import contextlib
+import datetime
+import gc
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import tracemalloc
+
+from bench_simulation import BENCH_DIR, RESULTS_DIR, _git_revision, make_catalog
+
+BASELINE_PATH = os.path.join(BENCH_DIR, 'memory_baseline.json')
+
+
+@contextlib.contextmanager
+def traced():
+    """Yield a dict whose 'bytes' is the memory still allocated by the block when it ends."""
+    gc.collect()
+    tracemalloc.start()
+    result = {}
+    start = tracemalloc.get_traced_memory()[0]
+    try:
+        yield result
+    finally:
+        gc.collect()
+        result['bytes'] = tracemalloc.get_traced_memory()[0] - start
+        tracemalloc.stop()
+
+
+def _routers(count, contents):
+    import main
+
+    routers = [main.Router(f"R{i}") for i in range(1, count + 1)]
+    for router, next_hop in zip(routers, routers[1:] + [None]):
+        router.fib.update(dict.fromkeys(contents, next_hop))
+    return routers
+
+
+def measure_router(count, catalog_size, fill):
+    """Bytes per router with a `catalog_size` FIB, optionally after caching CACHE_LIMIT items."""
+    import main
+
+    contents = make_catalog(catalog_size)
+    _routers(1, contents)  # import-time and first-use allocations are not per-router costs
+    with traced() as result:
+        routers = _routers(count, contents)
+        if fill:
+            for router in routers:
+                for name in contents[:main.Router.CACHE_LIMIT]:
+                    router.receive_data(main.DataPacket(name, b'', size=64))
+    return result['bytes'] / count, routers
+
+
+def measure_packets(count, hops):
+    """Bytes per InterestPacket held in flight after crossing `hops` routers."""
+    import main
+
+    names = [f"R{i}" for i in range(hops)]
+    with traced() as result:
+        packets = []
+        for i in range(count):
+            packet = main.InterestPacket(f"item{i % 100}.bin")
+            for name in names:
+                packet.path.append(name)
+            packets.append(packet)
+    return result['bytes'] / count, packets
+
+
+CASES = [
+    ('router_fresh', {'count': 50, 'catalog_size': 100}, lambda p: measure_router(p['count'], p['catalog_size'], False)),
+    ('router_filled', {'count': 20, 'catalog_size': 100}, lambda p: measure_router(p['count'], p['catalog_size'], True)),
+    ('interest_packet', {'count': 10000, 'hops': 5}, lambda p: measure_packets(p['count'], p['hops'])),
+]
+
+
+def run_cases():
+    results = []
+    workdir = tempfile.mkdtemp(prefix='ndn_membench_')
+    previous_cwd = os.getcwd()
+    try:
+        os.chdir(workdir)
+        for name, params, measure in CASES:
+            with contextlib.redirect_stdout(io.StringIO()):
+                per_item, _ = measure(params)
+            results.append({'benchmark': name, 'params': params, 'bytes': per_item})
+            label = ', '.join(f"{k}={v}" for k, v in params.items())
+            print(f"{name:<18} {label:<30} {per_item:12,.0f} bytes each")
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline):
+    previous = {r['benchmark']: r for r in baseline['results']}
+    print(f"\nComparison with baseline from {baseline['meta'].get('timestamp')} ({baseline['meta'].get('revision')}):")
+    for result in results:
+        old = previous.get(result['benchmark'])
+        if old is None or old['params'] != result['params']:
+            continue
+        print(f"  {result['benchmark']:<18} {old['bytes']:12,.0f} -> {result['bytes']:12,.0f} bytes "
+              f"(x{result['bytes'] / old['bytes']:.2f})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure memory per router and per in-flight packet.")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline file used by --compare/--save-baseline")
+    parser.add_argument('--compare', action='store_true', help="Compare the run with the stored baseline")
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = run_cases()
+    stamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    report = {'meta': {'timestamp': stamp, 'revision': _git_revision(), 'python': sys.version.split()[0]},
+              'results': results}
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    result_path = os.path.join(RESULTS_DIR, f"memory_{stamp}.json")
+    with open(result_path, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"\nResults saved to {result_path}")
+
+    if args.compare:
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as file:
+                compare(results, json.load(file))
+        else:
+            print(f"No baseline found at {args.baseline}")
+    if args.save_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
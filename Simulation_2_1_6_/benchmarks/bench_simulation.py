@@ -0,0 +1,376 @@
+"""
+Benchmark suite for the simulator hot paths.
+
+Benchmarks are registered asv-style with @benchmark(name, axis, **param_grid): for every
+parameter combination the function performs its setup and returns a zero-argument
+callable, which is then timed with an autoranged loop. Everything runs inside a temporary
+working directory, so the CSV/log side effects of the simulator never touch the tree.
+
+    python benchmarks/bench_simulation.py                        # run everything
+    python benchmarks/bench_simulation.py -k receive_data        # filter by regex
+    python benchmarks/bench_simulation.py --save-baseline        # store as the new baseline
+    python benchmarks/bench_simulation.py --compare              # compare with the stored baseline
+
+Each run writes results/<timestamp>.json, a scaling CSV and one PNG per benchmark
+(median time vs its scaling axis: routers, cache size or catalogue size).
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SIMULATION_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+POLICIES = ['LRU', 'LFU', 'FIFO', 'MRU', 'FACR', 'Rdm']
+
+if SIMULATION_DIR not in sys.path:
+    sys.path.insert(0, SIMULATION_DIR)
+
+BENCHMARKS = []
+
+
+def benchmark(name, axis, **grid):
+    """Register a benchmark; `axis` names the parameter used as x-axis of its scaling curve."""
+    def register(func):
+        BENCHMARKS.append({'name': name, 'axis': axis, 'grid': grid, 'setup': func})
+        return func
+    return register
+
+
+# ----- network fixtures -----
+def make_catalog(size, folder='catalog'):
+    """Create `size` small content files in `folder` and return their names."""
+    os.makedirs(folder, exist_ok=True)
+    names = [f"item{i}.bin" for i in range(1, size + 1)]
+    for name in names:
+        path = os.path.join(folder, name)
+        if not os.path.exists(path):
+            with open(path, 'wb') as file:
+                file.write(b'\0' * 64)
+    return names
+
+
+def build_chain(num_routers, catalog_size, policy='LRU'):
+    """Routers R1..Rn in a chain, one publisher behind the last router, one subscriber on R1."""
+    import main
+
+    contents = make_catalog(catalog_size)
+    routers = [main.Router(f"R{i}", caching_policy=policy) for i in range(1, num_routers + 1)]
+    publisher = main.Publisher("P1", "catalog")
+    subscriber = main.Subscriber("S1")
+    subscriber.connected_router = routers[0]
+    main.ContentIDManager.initialize_index([publisher])
+
+    for router, next_hop in zip(routers, routers[1:] + [publisher]):
+        router.fib.update(dict.fromkeys(contents, next_hop))
+    return routers, [publisher], [subscriber], contents
+
+
+@contextlib.contextmanager
+def cache_limit(size):
+    import main
+
+    previous = main.Router.CACHE_LIMIT
+    main.Router.CACHE_LIMIT = size
+    try:
+        yield
+    finally:
+        main.Router.CACHE_LIMIT = previous
+
+
+def send(subscriber, name):
+    import main
+
+    packet = main.InterestPacket(name)
+    packet.original_hop_count = 1
+    subscriber.send_interest(packet, subscriber.connected_router)
+
+
+# ----- benchmarks -----
+@benchmark('receive_interest', 'cache_size', policy=POLICIES, cache_size=[15, 60, 240], catalog_size=[500])
+def bench_receive_interest(policy, cache_size, catalog_size):
+    with cache_limit(cache_size):
+        routers, _, subscribers, contents = build_chain(3, catalog_size, policy)
+        rng = random.Random(0)
+        for name in contents:
+            send(subscribers[0], name)
+
+    def run():
+        with cache_limit(cache_size):
+            send(subscribers[0], rng.choice(contents))
+    return run
+
+
+@benchmark('receive_data', 'cache_size', policy=POLICIES, cache_size=[15, 60, 240], catalog_size=[500])
+def bench_receive_data(policy, cache_size, catalog_size):
+    import main
+
+    with cache_limit(cache_size):
+        routers, _, _, contents = build_chain(1, catalog_size, policy)
+        router = routers[0]
+        names = itertools.cycle(contents)
+        for _ in range(cache_size):
+            router.receive_data(main.DataPacket(next(names), b''))
+
+    def run():
+        with cache_limit(cache_size):
+            router.receive_data(main.DataPacket(next(names), b''))
+    return run
+
+
+@benchmark('update_popularity', 'catalog_size', catalog_size=[100, 1000, 5000])
+def bench_update_popularity(catalog_size):
+    routers, _, _, contents = build_chain(1, catalog_size)
+    router = routers[0]
+    for name in contents:
+        router.update_popularity(name)
+    rng = random.Random(0)
+    return lambda: router.update_popularity(rng.choice(contents), feedback='like')
+
+
+@benchmark('centrality', 'routers',
+           helper=['shortest_paths', 'closeness', 'reach', 'degree', 'betweenness', 'compute_network_metrics'],
+           routers=[10, 50, 200])
+def bench_centrality(helper, routers):
+    import main
+
+    network = build_chain(routers, 10)[0]
+    adj = main._build_graph_from_routers(network)
+    all_sp = main._all_pairs_shortest_paths_lengths(adj)
+    helpers = {
+        'shortest_paths': lambda: main._all_pairs_shortest_paths_lengths(adj),
+        'closeness': lambda: main._closeness_centrality_from_sp(all_sp),
+        'reach': lambda: main._reach_centrality_from_sp(all_sp),
+        'degree': lambda: main._degree_centrality(adj),
+        'betweenness': lambda: main._betweenness_centrality(adj, normalized=True),
+        'compute_network_metrics': lambda: main.compute_network_metrics(network),
+    }
+    return helpers[helper]
+
+
+@benchmark('router_selection', 'routers', mode=['manual', 'ai'], routers=[5, 20, 80])
+def bench_router_selection(mode, routers):
+    import main
+    from router_selection_system import RouterSelectionSystem
+
+    network, _, subscribers, contents = build_chain(routers, 10)
+    send(subscribers[0], contents[0])
+    network_metrics = main.compute_network_metrics(network)
+    traced_path = [router.name for router in network]
+    selection_system = RouterSelectionSystem()
+    process = selection_system.process_manual_path if mode == 'manual' else selection_system.process_ai_path
+    counter = itertools.count(1)
+    return lambda: process(routers=network, traced_path=traced_path, network_metrics=network_metrics,
+                           iteration=next(counter), policy='LRU', content_request=contents[0])
+
+
+@benchmark('run_simulation_routers', 'routers', routers=[5, 20, 80])
+def bench_run_simulation_routers(routers):
+    return _simulation(routers, 15, 100)
+
+
+@benchmark('run_simulation_cache', 'cache_size', cache_size=[15, 60, 240])
+def bench_run_simulation_cache(cache_size):
+    return _simulation(5, cache_size, 500)
+
+
+@benchmark('run_simulation_catalog', 'catalog_size', catalog_size=[100, 1000, 5000])
+def bench_run_simulation_catalog(catalog_size):
+    return _simulation(5, 15, catalog_size)
+
+
+def _simulation(num_routers, cache_size, catalog_size, iterations=20):
+    """One LRU run of `iterations` requests; centrality outputs are benchmarked separately."""
+    import main
+
+    routers, publishers, subscribers, contents = build_chain(num_routers, catalog_size)
+
+    def run():
+        with cache_limit(cache_size):
+            main.run_simulation(routers, publishers, subscribers, 'LRU', iterations,
+                                contents=contents, centrality_every=0)
+    return run
+
+
+# ----- timing -----
+def time_callable(func, repeat=5, min_time=0.05):
+    """Autorange the loop count to at least `min_time` seconds, then time `repeat` loops (seconds/call)."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 10000:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return {'number': number, 'repeat': repeat, 'min': min(samples),
+            'median': statistics.median(samples), 'mean': statistics.mean(samples)}
+
+
+def run_benchmarks(pattern=None, repeat=5, min_time=0.05):
+    results = []
+    selected = [b for b in BENCHMARKS if not pattern or re.search(pattern, b['name'])]
+    workdir = tempfile.mkdtemp(prefix='ndn_bench_')
+    previous_cwd = os.getcwd()
+    try:
+        for bench in selected:
+            keys = list(bench['grid'])
+            for values in itertools.product(*(bench['grid'][k] for k in keys)):
+                params = dict(zip(keys, values))
+                case_dir = tempfile.mkdtemp(dir=workdir)
+                os.chdir(case_dir)
+                random.seed(0)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    func = bench['setup'](**params)
+                    timing = time_callable(func, repeat=repeat, min_time=min_time)
+                os.chdir(workdir)
+                shutil.rmtree(case_dir, ignore_errors=True)
+
+                result = {'benchmark': bench['name'], 'axis': bench['axis'], 'params': params, **timing}
+                results.append(result)
+                label = ', '.join(f"{k}={v}" for k, v in params.items())
+                print(f"{bench['name']:<24} {label:<40} median {timing['median'] * 1e3:10.3f} ms")
+    finally:
+        os.chdir(previous_cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+# ----- reporting -----
+def _case_key(result):
+    return result['benchmark'] + json.dumps(result['params'], sort_keys=True)
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SIMULATION_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold=1.2):
+    """Print the ratio to the baseline per case; return the list of regressions."""
+    previous = {_case_key(r): r for r in baseline['results']}
+    regressions = []
+    print(f"\nComparison with baseline from {baseline['meta'].get('timestamp')} ({baseline['meta'].get('revision')}):")
+    for result in results:
+        old = previous.get(_case_key(result))
+        if old is None:
+            continue
+        ratio = result['median'] / old['median'] if old['median'] else float('inf')
+        status = 'REGRESSION' if ratio > threshold else 'faster' if ratio < 1 / threshold else ''
+        if status == 'REGRESSION':
+            regressions.append((result, ratio))
+        label = ', '.join(f"{k}={v}" for k, v in result['params'].items())
+        print(f"  {result['benchmark']:<24} {label:<40} x{ratio:6.2f} {status}")
+    return regressions
+
+
+def write_scaling_curves(results, stamp):
+    """Write all cases as a CSV and plot median time vs the scaling axis of each benchmark."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import pandas as pd
+
+    rows = [{'benchmark': r['benchmark'], 'axis': r['axis'], 'axis_value': r['params'][r['axis']],
+             'variant': ', '.join(f"{k}={v}" for k, v in r['params'].items() if k != r['axis']) or r['benchmark'],
+             'median_s': r['median'], 'min_s': r['min']} for r in results]
+    if not rows:
+        return []
+    df = pd.DataFrame(rows)
+    csv_path = os.path.join(RESULTS_DIR, f"scaling_{stamp}.csv")
+    df.to_csv(csv_path, index=False)
+
+    paths = [csv_path]
+    for name, group in df.groupby('benchmark'):
+        fig, ax = plt.subplots(figsize=(8, 5))
+        for variant, series in group.groupby('variant'):
+            series = series.sort_values('axis_value')
+            ax.plot(series['axis_value'], series['median_s'] * 1e3, marker='o', label=variant)
+        ax.set_xscale('log')
+        ax.set_yscale('log')
+        ax.set_xlabel(group['axis'].iloc[0])
+        ax.set_ylabel('Median time per call (ms)')
+        ax.set_title(name)
+        ax.legend(fontsize='small')
+        ax.grid(True, which='both', alpha=0.3)
+        path = os.path.join(RESULTS_DIR, f"scaling_{name}_{stamp}.png")
+        fig.savefig(path, dpi=120, bbox_inches='tight')
+        plt.close(fig)
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the simulator hot paths.")
+    parser.add_argument('-k', dest='pattern', help="Only run benchmarks whose name matches this regex")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.05, help="Minimum seconds per timed loop")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline file used by --compare/--save-baseline")
+    parser.add_argument('--compare', action='store_true', help="Compare the run with the stored baseline")
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline")
+    parser.add_argument('--threshold', type=float, default=1.2, help="Slowdown ratio reported as a regression")
+    parser.add_argument('--no-plots', action='store_true', help="Skip the scaling curve CSV/PNG output")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.pattern, repeat=args.repeat, min_time=args.min_time)
+    stamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+    report = {
+        'meta': {'timestamp': stamp, 'revision': _git_revision(), 'python': platform.python_version(),
+                 'machine': platform.platform()},
+        'results': results,
+    }
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    result_path = os.path.join(RESULTS_DIR, f"{stamp}.json")
+    with open(result_path, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"\nResults saved to {result_path}")
+
+    if not args.no_plots:
+        for path in write_scaling_curves(results, stamp):
+            print(f"Scaling output saved to {path}")
+
+    regressions = []
+    if args.compare:
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as file:
+                regressions = compare(results, json.load(file), args.threshold)
+        else:
+            print(f"No baseline found at {args.baseline}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Checkpoint and resume for long simulations.
+
+A Checkpointer writes the complete simulation state every `every` iterations (and after
+each finished policy): routers with their caches, policy structures and popularity state,
+publishers and subscribers, the metrics registry, latency model, subscriber population and
+its RNG, the `random` module state, the iteration counter and the partial results. The
+objects are pickled together so shared references survive, compressed with gzip, and
+written to a temporary file that replaces the previous checkpoint atomically, so an
+interruption never leaves a half-written checkpoint behind.
+
+`main.py --resume` loads the checkpoint, truncates the results file to the rows it had
+recorded, and continues from the saved iteration; the results match an uninterrupted run.
+Cache TTLs and LRU/MRU/SizeLRU access times are wall-clock datetimes, so on load they are
+shifted by the time that passed since the save, as if the run had never stopped.
+"""
+
+import datetime
+import gzip
+import os
+import pickle
+import random
+
+CHECKPOINT_PATH = 'Checkpoints/simulation.ckpt'
+CHECKPOINT_VERSION = 1
+
+
+class Checkpointer:
+    def __init__(self, path=CHECKPOINT_PATH, every=1000, sink=None):
+        self.path = path
+        self.every = every
+        self.sink = sink  # ResultsSink whose file position is recorded with each checkpoint
+        self.context = {}  # run-independent state (network snapshot, policies done, ...) saved every time
+        self.saves = 0
+
+    def due(self, completed):
+        return bool(self.every) and completed % self.every == 0
+
+    def save(self, run_state=None):
+        """Write the context plus `run_state` (the in-progress policy run, or None between runs)."""
+        state = dict(self.context, run=run_state, random_state=random.getstate(), version=CHECKPOINT_VERSION,
+                     saved_at=datetime.datetime.now())
+        if self.sink is not None:
+            if self.sink.format != 'csv':
+                raise ValueError("Checkpointing needs a CSV results file")
+            self.sink.flush()
+            state['results'] = {'path': self.sink.path, 'rows': self.sink.rows_written,
+                                'bytes': os.path.getsize(self.sink.path)}
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temporary = f'{self.path}.tmp'
+        with gzip.open(temporary, 'wb', compresslevel=6) as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+        with open(temporary, 'rb') as file:
+            os.fsync(file.fileno())
+        os.replace(temporary, self.path)
+        self.saves += 1
+
+
+def load_checkpoint(path=CHECKPOINT_PATH):
+    """Load a checkpoint and restore the `random` module state it recorded."""
+    with gzip.open(path, 'rb') as file:
+        state = pickle.load(file)
+    if state.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version {state.get('version')} in {path}")
+    random.setstate(state['random_state'])
+    if 'saved_at' in state and 'snapshot' in state:
+        rebase_wall_clock(state['snapshot'].routers, datetime.datetime.now() - state['saved_at'])
+    return state
+
+
+def rebase_wall_clock(routers, offset):
+    """Move every router's cache expiry and access times forward by `offset` (a timedelta)."""
+    for router in routers:
+        for table in (router.cache_ttl, router.cache_access_times):
+            for name, moment in table.items():
+                table[name] = moment + offset
+
+
+def resume_results(state, buffer_rows=10_000):
+    """Reopen the results file of a checkpoint, dropping rows written after it was taken."""
+    from results_sink import ResultsSink
+
+    results = state['results']
+    with open(results['path'], 'r+b') as file:
+        file.truncate(results['bytes'])
+    sink = ResultsSink(results['path'], buffer_rows=buffer_rows, append=True)
+    sink.rows_written = results['rows']
+    return sink
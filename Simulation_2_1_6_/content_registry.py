@@ -0,0 +1,118 @@
+"""
+Per-simulation content IDs and a network-wide cache occupancy matrix.
+
+ContentRegistry numbers the contents of one simulation densely from 0 to N-1. Unlike
+ContentIDManager, which is a process-wide table whose IDs start at 100 and which is still
+used for the IDs in logs and exported tables, each run owns its registry. Parallel runs
+therefore cannot interfere, and the IDs can index arrays directly.
+
+CacheOccupancy mirrors every router's Content Store as one row of a routers x contents
+boolean matrix. Routers update their row as items are cached and evicted, through the
+`content_index` attribute that run_simulation sets. Questions about the whole network are
+then array operations: which routers on a path hold an item, how full each cache is, and
+how many copies of each item exist. Fill is counted in bytes for routers with a byte
+capacity (--cache-bytes) and in items against CACHE_LIMIT otherwise.
+"""
+
+import numpy as np
+
+
+class ContentRegistry:
+    def __init__(self, names=()):
+        self.ids = {}
+        self.names = []
+        for name in names:
+            self.register(name)
+
+    @classmethod
+    def from_publishers(cls, publishers, contents=()):
+        """Registry of every publisher's catalogue plus `contents`, in a stable order."""
+        return cls([name for publisher in publishers for name in sorted(publisher.images)] + list(contents))
+
+    def register(self, name):
+        """ID of `name`, assigning the next free one if it is new."""
+        content_id = self.ids.get(name)
+        if content_id is None:
+            content_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return content_id
+
+    def get(self, name, default=None):
+        return self.ids.get(name, default)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.ids
+
+
+class CacheOccupancy:
+    def __init__(self, routers, registry=None):
+        self.registry = registry if registry is not None else ContentRegistry()
+        self.router_ids = {router.name: index for index, router in enumerate(routers)}
+        self.router_names = [router.name for router in routers]
+        self.by_bytes = np.array([router.cache_capacity_bytes is not None for router in routers], dtype=bool)
+        self.capacity = np.array([router.cache_capacity_bytes or router.CACHE_LIMIT for router in routers], dtype=float)
+        self.used = np.zeros(len(routers))  # bytes for routers with a byte capacity, items otherwise
+        self.cached = np.zeros((len(routers), max(len(self.registry), 1)), dtype=bool)
+
+    def _column(self, name):
+        content_id = self.registry.register(name)
+        if content_id >= self.cached.shape[1]:
+            # Grow geometrically so contents registered mid-run stay cheap
+            extra = max(content_id + 1, 2 * self.cached.shape[1]) - self.cached.shape[1]
+            self.cached = np.pad(self.cached, ((0, 0), (0, extra)))
+        return content_id
+
+    # ----- updates from the routers -----
+    def add(self, router_name, name, size=0):
+        row, column = self.router_ids[router_name], self._column(name)
+        if not self.cached[row, column]:
+            self.cached[row, column] = True
+            self.used[row] += size if self.by_bytes[row] else 1
+
+    def discard(self, router_name, name, size=0):
+        content_id = self.registry.get(name)
+        row = self.router_ids[router_name]
+        if content_id is not None and content_id < self.cached.shape[1] and self.cached[row, content_id]:
+            self.cached[row, content_id] = False
+            self.used[row] -= size if self.by_bytes[row] else 1
+
+    def clear_router(self, router_name):
+        row = self.router_ids[router_name]
+        self.cached[row] = False
+        self.used[row] = 0
+
+    # ----- queries -----
+    def _rows(self, router_names):
+        if router_names is None:
+            return np.arange(len(self.router_names))
+        return np.array([self.router_ids[name] for name in router_names if name in self.router_ids], dtype=int)
+
+    def holders(self, name, router_names=None):
+        """Names of the routers (of `router_names`, e.g. a traced path, in that order) caching `name`."""
+        content_id = self.registry.get(name)
+        if content_id is None or content_id >= self.cached.shape[1]:
+            return []
+        rows = self._rows(router_names)
+        return [self.router_names[row] for row in rows[self.cached[rows, content_id]]]
+
+    def occupancy(self, router_names=None):
+        """Fraction of each router's capacity (bytes, or CACHE_LIMIT items) in use."""
+        rows = self._rows(router_names)
+        return self.used[rows] / self.capacity[rows]
+
+    def network_occupancy(self):
+        """Cache space in use over total capacity, across all routers."""
+        return float(self.used.sum() / self.capacity.sum()) if self.capacity.sum() else 0.0
+
+    def copies(self):
+        """Number of routers caching each registered content, indexed by content ID."""
+        return self.cached[:, :len(self.registry)].sum(axis=0)
+
+    def summary(self):
+        copies = self.copies()
+        distinct = int((copies > 0).sum())
+        return {'network_occupancy': self.network_occupancy(), 'distinct_cached': distinct,
+                'mean_copies': float(copies.sum() / distinct) if distinct else 0.0}
@@ -68,8 +68,9 @@ class EnhancedRouterSelectionSystem:
         # Step 2: Calculate cmBA for each router in path
         print(f"\nStep 2: Calculating cmBA for routers in path...")
         path_router_metrics = []
+        routers_by_name = {r.name: r for r in reversed(routers)}
         for router_name in traced_path:
-            router = next((r for r in routers if r.name == router_name), None)
+            router = routers_by_name.get(router_name)
             if router:
                 # Calculate manual metrics
                 cache_occupancy = (len(router.cs) / router.CACHE_LIMIT) * 100
@@ -200,20 +201,8 @@ class EnhancedRouterSelectionSystem:
         """
         Manual path tracing - simple sequential path
         """
-        path = []
-        current_router = routers[0]  # Start from first router
-        
-        while current_router and len(path) < len(routers):
-            path.append(current_router.name)
-            
-            # Simple path: move to next router
-            current_index = routers.index(current_router)
-            if current_index < len(routers) - 1:
-                current_router = routers[current_index + 1]
-            else:
-                break
-                
-        return path
+        # Simple path: every router in order from the first one
+        return [router.name for router in routers]
     
     def calculate_manual_cmba(self, router, network_metrics):
         """
@@ -0,0 +1,217 @@
+"""
+Incremental feature store for the ML training data.
+
+ML_Training_Data/<policy>/features.csv files are append-only. FeatureStore.update() reads
+each file from the byte offset it reached last time, so only new rows are parsed. The
+'Feedback Scores' lists are split and one-hot encoded with vectorized string operations,
+and the result is appended to the store as one typed, column-per-array .npz chunk. The
+per-policy StandardScaler statistics are updated with partial_fit on the new rows only.
+
+Store layout (Feature_Store/ by default):
+
+    manifest.json        offsets per input file, chunk list, feedback layout, scaler statistics
+    chunk_00000.npz ...  one chunk per update: typed columns plus a uint8 feedback matrix
+
+load() returns the stored rows as a DataFrame, standardized with the current statistics
+by default. Its columns match the old Processed_Features_with_Policy.csv layout.
+"""
+
+import io
+import json
+import os
+
+import numpy as np
+
+STORE_DIR = 'Feature_Store'
+DATA_DIR = 'ML_Training_Data'
+STORE_VERSION = 1
+
+INPUT_COLUMNS = ['Simulation Time', 'No of Clients', 'Total Requests',
+                 'Hop Reduction', 'Cache Hit Ratio', 'Latency', 'Feedback Scores']
+CONTINUOUS_COLUMNS = ['No of Clients', 'Total Requests', 'Hop Reduction', 'Cache Hit Ratio', 'Latency']
+COLUMN_TYPES = {'No of Clients': np.int32, 'Total Requests': np.int64, 'Hop Reduction': np.float64,
+                'Cache Hit Ratio': np.float64, 'Latency': np.float64}
+FEEDBACK_LEVELS = ['dislike', 'highly_dislike', 'highly_like', 'like', 'neutral']
+
+
+def parse_feedback(series):
+    """
+    One-hot encode stringified feedback lists ("['like', 'neutral']") without a per-row
+    Python loop. Returns a uint8 matrix of shape (rows, slots * len(FEEDBACK_LEVELS)),
+    slot-major; missing slots and unknown levels encode as all zeros.
+    """
+    import pandas as pd
+
+    tokens = series.astype(str).str.replace(r"[\[\]'\"\s]", '', regex=True).str.split(',', expand=True)
+    codes = np.stack([pd.Categorical(tokens[column], categories=FEEDBACK_LEVELS).codes
+                      for column in tokens.columns], axis=1) if len(tokens) else np.empty((0, 0), dtype=np.int8)
+    rows, slots = codes.shape
+    onehot = np.zeros((rows, slots, len(FEEDBACK_LEVELS)), dtype=np.uint8)
+    row_index, slot_index = np.nonzero(codes >= 0)
+    onehot[row_index, slot_index, codes[row_index, slot_index]] = 1
+    return onehot.reshape(rows, slots * len(FEEDBACK_LEVELS))
+
+
+def feedback_columns(slots):
+    return [f'x{slot}_{level}' for slot in range(slots) for level in FEEDBACK_LEVELS]
+
+
+class FeatureStore:
+    def __init__(self, path=STORE_DIR):
+        self.path = path
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        manifest_path = os.path.join(self.path, 'manifest.json')
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as file:
+                manifest = json.load(file)
+            if manifest.get('version') == STORE_VERSION:
+                return manifest
+            print(f"Feature store {self.path} has an unsupported version; rebuilding it.")
+        return self._empty_manifest()
+
+    @staticmethod
+    def _empty_manifest():
+        return {'version': STORE_VERSION, 'offsets': {}, 'chunks': [], 'policies': [],
+                'feedback_slots': 0, 'scalers': {}, 'rows': 0}
+
+    def _save_manifest(self):
+        temporary = os.path.join(self.path, 'manifest.json.tmp')
+        with open(temporary, 'w') as file:
+            json.dump(self.manifest, file, indent=2)
+        os.replace(temporary, os.path.join(self.path, 'manifest.json'))
+
+    def clear(self):
+        for chunk in self.manifest['chunks']:
+            chunk_path = os.path.join(self.path, chunk)
+            if os.path.exists(chunk_path):
+                os.remove(chunk_path)
+        self.manifest = self._empty_manifest()
+
+    # ----- ingestion -----
+    def _read_new_rows(self, features_file):
+        """New complete lines of `features_file` since the stored offset, as a DataFrame, and the new offset."""
+        import pandas as pd
+
+        offset = self.manifest['offsets'].get(features_file, 0)
+        with open(features_file, 'rb') as file:
+            file.seek(offset)
+            data = file.read()
+        end = data.rfind(b'\n') + 1  # leave a partially written last line for the next update
+        if end == 0:
+            return None, offset
+        block = data[:end]
+        if offset == 0:
+            block = block[block.find(b'\n') + 1:]  # header line
+        if not block.strip():
+            return None, offset + end
+        df = pd.read_csv(io.BytesIO(block), header=None, names=INPUT_COLUMNS)
+        return df, offset + end
+
+    def update(self, data_dir=DATA_DIR):
+        """Append every row added to `data_dir`/<policy>/features.csv since the last update."""
+        import pandas as pd
+        from sklearn.preprocessing import StandardScaler
+
+        # Input files are append-only; if one shrank it was rewritten, so start over
+        for features_file, offset in self.manifest['offsets'].items():
+            if not os.path.exists(features_file) or os.path.getsize(features_file) < offset:
+                print(f"{features_file} was truncated or removed; rebuilding the feature store.")
+                self.clear()
+                break
+
+        os.makedirs(self.path, exist_ok=True)
+        frames, policies = [], []
+        for policy in sorted(os.listdir(data_dir)) if os.path.isdir(data_dir) else []:
+            features_file = os.path.join(data_dir, policy, 'features.csv')
+            if not os.path.exists(features_file):
+                continue
+            df, offset = self._read_new_rows(features_file)
+            self.manifest['offsets'][features_file] = offset
+            if df is not None and len(df):
+                print(f"Loading {len(df)} new rows from {features_file}")
+                frames.append(df)
+                policies.append(policy)
+
+        added = sum(len(df) for df in frames)
+        if added:
+            for policy in policies:
+                if policy not in self.manifest['policies']:
+                    self.manifest['policies'].append(policy)
+            codes = np.concatenate([np.full(len(df), self.manifest['policies'].index(policy), dtype=np.int16)
+                                    for df, policy in zip(frames, policies)])
+            new = pd.concat(frames, ignore_index=True)
+            feedback = parse_feedback(new['Feedback Scores'])
+            self.manifest['feedback_slots'] = max(self.manifest['feedback_slots'],
+                                                  feedback.shape[1] // len(FEEDBACK_LEVELS))
+
+            columns = {'policy': codes,
+                       'time': pd.to_datetime(new['Simulation Time']).to_numpy(dtype='datetime64[s]'),
+                       'feedback': feedback}
+            for column, dtype in COLUMN_TYPES.items():
+                columns[column] = new[column].to_numpy(dtype=dtype)
+            chunk = f"chunk_{len(self.manifest['chunks']):05d}.npz"
+            np.savez_compressed(os.path.join(self.path, chunk), **columns)
+            self.manifest['chunks'].append(chunk)
+            self.manifest['rows'] += added
+
+            # Scaler statistics per policy, updated with the new rows only
+            values = new[CONTINUOUS_COLUMNS].to_numpy(dtype=float)
+            for policy in set(policies):
+                scaler = self.scaler(policy) or StandardScaler()
+                scaler.partial_fit(values[codes == self.manifest['policies'].index(policy)])
+                self.manifest['scalers'][policy] = {'n': int(scaler.n_samples_seen_),
+                                                    'mean': scaler.mean_.tolist(), 'var': scaler.var_.tolist()}
+
+        self._save_manifest()
+        print(f"Feature store {self.path}: {added} new rows, {self.manifest['rows']} in total.")
+        return added
+
+    def scaler(self, policy):
+        """The fitted StandardScaler of `policy`, rebuilt from the stored statistics (None if unseen)."""
+        from sklearn.preprocessing import StandardScaler
+
+        stats = self.manifest['scalers'].get(policy)
+        if stats is None:
+            return None
+        scaler = StandardScaler()
+        scaler.n_samples_seen_ = np.int64(stats['n'])
+        scaler.mean_ = np.array(stats['mean'])
+        scaler.var_ = np.array(stats['var'])
+        scaler.scale_ = np.where(scaler.var_ > 0, np.sqrt(scaler.var_), 1.0)
+        scaler.n_features_in_ = len(CONTINUOUS_COLUMNS)
+        return scaler
+
+    # ----- reading -----
+    def load(self, scaled=True):
+        """All stored rows as a DataFrame (continuous columns standardized per policy if `scaled`)."""
+        import pandas as pd
+
+        slots = self.manifest['feedback_slots']
+        width = slots * len(FEEDBACK_LEVELS)
+        parts = {name: [] for name in ['policy', 'time', 'feedback'] + CONTINUOUS_COLUMNS}
+        for chunk in self.manifest['chunks']:
+            with np.load(os.path.join(self.path, chunk)) as data:
+                for name in parts:
+                    array = data[name]
+                    if name == 'feedback' and array.shape[1] < width:
+                        array = np.pad(array, ((0, 0), (0, width - array.shape[1])))
+                    parts[name].append(array)
+        if not self.manifest['chunks']:
+            return pd.DataFrame(columns=['Simulation Time'] + CONTINUOUS_COLUMNS + ['Policy'] + feedback_columns(slots))
+
+        policy_codes = np.concatenate(parts['policy'])
+        df = pd.DataFrame({'Simulation Time': np.concatenate(parts['time'])})
+        for column in CONTINUOUS_COLUMNS:
+            df[column] = np.concatenate(parts[column])
+        if scaled:
+            values = df[CONTINUOUS_COLUMNS].to_numpy(dtype=float)
+            for code, policy in enumerate(self.manifest['policies']):
+                mask = policy_codes == code
+                if mask.any():
+                    values[mask] = self.scaler(policy).transform(values[mask])
+            df[CONTINUOUS_COLUMNS] = values
+        df['Policy'] = pd.Categorical.from_codes(policy_codes, categories=self.manifest['policies'])
+        feedback = pd.DataFrame(np.concatenate(parts['feedback']), columns=feedback_columns(slots))
+        return pd.concat([df, feedback], axis=1)
@@ -0,0 +1,136 @@
+"""
+Space-bounded popularity tracking with the Space-Saving algorithm (Metwally et al.).
+
+A SpaceSaving(k) summary monitors at most k names. When an unmonitored name arrives and
+the summary is full, it replaces the name with the smallest count and inherits that count
+as its error. For every name, estimate - error <= true count <= estimate, and any name
+whose true count exceeds total / k is guaranteed to be monitored.
+
+Summaries are mergeable (Agarwal et al.): counts of names present in both are added, a
+name missing from a full summary is charged that summary's minimum count as extra error,
+and the result is trimmed back to k names. This lets the network-wide ranking be built in
+memory from the routers' summaries, with an error of at most (sum of totals) / k.
+"""
+
+import csv
+import heapq
+import os
+
+
+class SpaceSaving:
+    def __init__(self, k=1000):
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        self.k = k
+        self.total = 0
+        self.counts = {}  # name -> estimated count (upper bound)
+        self.errors = {}  # name -> maximum overestimation
+        self._heap = []   # (count, name) entries; stale ones are skipped lazily
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __contains__(self, name):
+        return name in self.counts
+
+    def __getitem__(self, name):
+        return self.counts.get(name, 0)
+
+    def offer(self, name, weight=1):
+        """Count `weight` occurrences of `name`."""
+        self.total += weight
+        if name in self.counts:
+            self.counts[name] += weight
+        elif len(self.counts) < self.k:
+            self.counts[name] = weight
+            self.errors[name] = 0
+        else:
+            victim, floor = self._pop_min()
+            del self.counts[victim]
+            del self.errors[victim]
+            self.counts[name] = floor + weight
+            self.errors[name] = floor
+        heapq.heappush(self._heap, (self.counts[name], name))
+        if len(self._heap) > 4 * self.k:
+            self._heap = [(count, n) for n, count in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        while True:
+            count, name = heapq.heappop(self._heap)
+            if self.counts.get(name) == count:
+                return name, count
+
+    @property
+    def min_count(self):
+        """Smallest monitored count (0 while the summary is not full)."""
+        if len(self.counts) < self.k:
+            return 0
+        while self._heap and self.counts.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else 0
+
+    @property
+    def error_bound(self):
+        """Upper bound on the overestimation of any count."""
+        return self.total / self.k
+
+    def estimate(self, name):
+        return self.counts.get(name, 0)
+
+    def guaranteed(self, name):
+        """Lower bound on the true count of `name`."""
+        return self.counts.get(name, 0) - self.errors.get(name, 0)
+
+    def top(self, n=None):
+        """[(name, estimated count, error)] sorted by estimate, highest first."""
+        ranked = sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))
+        return [(name, count, self.errors[name]) for name, count in ranked[:n]]
+
+    def merge(self, other):
+        """Return a new summary combining `self` and `other`, trimmed to max(k)."""
+        return SpaceSaving.merge_all([self, other])
+
+    @classmethod
+    def merge_all(cls, summaries, k=None):
+        """Merge several summaries into one of size `k` (default: the largest input k)."""
+        summaries = list(summaries)
+        k = k or max((s.k for s in summaries), default=1)
+        names = set().union(*(s.counts for s in summaries))
+        counts = dict.fromkeys(names, 0)
+        errors = dict.fromkeys(names, 0)
+        for summary in summaries:
+            # A name a full summary does not monitor may still have been seen up to its minimum count
+            floor = summary.min_count
+            for name in names:
+                if name in summary.counts:
+                    counts[name] += summary.counts[name]
+                    errors[name] += summary.errors[name]
+                else:
+                    counts[name] += floor
+                    errors[name] += floor
+        merged = cls(k)
+        merged.total = sum(s.total for s in summaries)
+        for name, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:k]:
+            merged.counts[name] = count
+            merged.errors[name] = errors[name]
+        merged._heap = [(count, name) for name, count in merged.counts.items()]
+        heapq.heapify(merged._heap)
+        return merged
+
+
+def network_ranking(routers, k=None):
+    """Network-wide heavy hitters, merged in memory from every router's summary."""
+    return SpaceSaving.merge_all((router.content_popularity for router in routers), k)
+
+
+def save_ranking(summary, path, n=None):
+    """Write the top `n` names of `summary` with their error bounds to a CSV file."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['Content Name', 'Estimated Requests', 'Guaranteed Requests', 'Max Error', 'Rank'])
+        for rank, (name, count, error) in enumerate(summary.top(n), start=1):
+            writer.writerow([name, count, count - error, error, rank])
+    print(f"Heavy hitters ({len(summary)} of at most {summary.k} names, "
+          f"error <= {summary.error_bound:.2f} requests) saved to {path}")
@@ -0,0 +1,190 @@
+"""
+Hot-path instrumentation for simulation runs.
+
+The simulator wraps its stages in `instrumentation.stage("<name>")` blocks. While
+instrumentation is disabled, `stage()` hands back a shared no-op context manager, so the
+cost in normal runs is a method call. When enabled, every stage records calls, inclusive
+time, self time (excluding nested stages) and, optionally, net allocated bytes via
+tracemalloc, all broken down per policy. A cProfile capture can run alongside.
+"""
+
+import collections
+import cProfile
+import datetime
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ('owner', 'name', 'start', 'child_time', 'memory_start')
+
+    def __init__(self, owner, name):
+        self.owner = owner
+        self.name = name
+        self.child_time = 0.0
+
+    def __enter__(self):
+        self.owner._stack.append(self)
+        if self.owner.trace_memory:
+            self.memory_start = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        owner = self.owner
+        owner._stack.pop()
+        if owner._stack:
+            owner._stack[-1].child_time += elapsed
+
+        stats = owner.stages[owner.policy][self.name]
+        stats['calls'] += 1
+        stats['total_time'] += elapsed
+        stats['self_time'] += elapsed - self.child_time
+        if owner.trace_memory:
+            stats['allocated_bytes'] += tracemalloc.get_traced_memory()[0] - self.memory_start
+        return False
+
+
+def _new_stage_stats():
+    return {'calls': 0, 'total_time': 0.0, 'self_time': 0.0, 'allocated_bytes': 0}
+
+
+class Instrumentation:
+    """Per-stage counters and timers, with optional cProfile and tracemalloc capture."""
+
+    def __init__(self):
+        self.enabled = False
+        self.trace_memory = False
+        self.profiler = None
+        self.policy = 'setup'  # stages recorded before the first run_simulation call
+        self._stack = []
+        self._started_at = None
+        self.stages = collections.defaultdict(lambda: collections.defaultdict(_new_stage_stats))
+        self.counters = collections.defaultdict(collections.Counter)
+
+    def enable(self, cprofile=False, trace_memory=False):
+        """Start collecting stage statistics (and optionally a cProfile / tracemalloc capture)."""
+        self.enabled = True
+        self._started_at = time.perf_counter()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.trace_memory = trace_memory
+        if cprofile:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def disable(self):
+        """Stop collecting; statistics gathered so far are kept for the report."""
+        if self.profiler is not None:
+            self.profiler.disable()
+        self.enabled = False
+
+    def reset(self):
+        self.disable()
+        self.__init__()
+
+    def set_policy(self, policy):
+        self.policy = policy
+
+    def stage(self, name):
+        """Context manager timing one stage; a shared no-op when instrumentation is disabled."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            self.counters[self.policy][name] += amount
+
+    # ----- reporting -----
+    def report(self):
+        """Return the collected statistics as a JSON-serialisable dict."""
+        report = {
+            'generated_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'wall_time': (time.perf_counter() - self._started_at) if self._started_at else 0.0,
+            'trace_memory': self.trace_memory,
+            'policies': {},
+        }
+        for policy, stages in self.stages.items():
+            report['policies'][str(policy)] = {
+                'stages': {name: dict(stats) for name, stats in stages.items()},
+                'counters': dict(self.counters.get(policy, {})),
+            }
+        if self.trace_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            report['memory'] = {'current_bytes': current, 'peak_bytes': peak}
+        return report
+
+    def summary_text(self, report=None, top=25):
+        """Human-readable summary: stages sorted by self time, per policy."""
+        report = report or self.report()
+        lines = [f"Simulation profile ({report['generated_at']}), wall time {report['wall_time']:.3f}s"]
+        for policy, data in report['policies'].items():
+            lines.append("")
+            lines.append(f"Policy: {policy}")
+            lines.append(f"  {'Stage':<22}{'Calls':>10}{'Total (s)':>12}{'Self (s)':>12}{'Self/call (us)':>16}{'Alloc (KiB)':>14}")
+            for name, stats in sorted(data['stages'].items(), key=lambda item: -item[1]['self_time']):
+                per_call = stats['self_time'] / stats['calls'] * 1e6 if stats['calls'] else 0.0
+                lines.append(f"  {name:<22}{stats['calls']:>10}{stats['total_time']:>12.4f}{stats['self_time']:>12.4f}"
+                             f"{per_call:>16.1f}{stats['allocated_bytes'] / 1024:>14.1f}")
+            for name, value in sorted(data['counters'].items()):
+                lines.append(f"  counter {name}: {value}")
+
+        if 'memory' in report:
+            lines.append("")
+            lines.append(f"Traced memory: current {report['memory']['current_bytes'] / 1024:.1f} KiB, "
+                         f"peak {report['memory']['peak_bytes'] / 1024:.1f} KiB")
+
+        if self.profiler is not None:
+            stream = io.StringIO()
+            pstats.Stats(self.profiler, stream=stream).sort_stats('cumulative').print_stats(top)
+            lines.append("")
+            lines.append("cProfile (top functions by cumulative time):")
+            lines.append(stream.getvalue())
+        return "\n".join(lines)
+
+    def write_report(self, output_dir='Profiling'):
+        """Write the JSON report, the text summary and (if captured) the raw cProfile stats."""
+        self.disable()
+        os.makedirs(output_dir, exist_ok=True)
+        stamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        report = self.report()
+
+        json_path = os.path.join(output_dir, f"profile_{stamp}.json")
+        with open(json_path, 'w') as file:
+            json.dump(report, file, indent=2)
+
+        text_path = os.path.join(output_dir, f"profile_{stamp}.txt")
+        with open(text_path, 'w') as file:
+            file.write(self.summary_text(report))
+
+        paths = [json_path, text_path]
+        if self.profiler is not None:
+            prof_path = os.path.join(output_dir, f"profile_{stamp}.prof")
+            self.profiler.dump_stats(prof_path)
+            paths.append(prof_path)
+
+        print(f"Profiling report saved to {', '.join(paths)}")
+        return paths
+
+
+# Process-wide instance used by the simulator modules
+instrumentation = Instrumentation()
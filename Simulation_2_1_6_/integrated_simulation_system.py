@@ -1,9 +1,5 @@
 import os
 import sys
-import pandas as pd
-import numpy as np
-import networkx as nx
-import matplotlib.pyplot as plt
 from datetime import datetime
 import csv
 import pickle
@@ -11,6 +7,7 @@ import random
 
 # Import the existing simulation components
 from main import Router, Publisher, Subscriber, InterestPacket, DataPacket, ContentIDManager
+from path_index import ForwardingTable
 from router_selection_system import RouterSelectionSystem
 
 class IntegratedSimulationSystem:
@@ -19,11 +16,16 @@ class IntegratedSimulationSystem:
     with the new router selection and AI recommendation system.
     """
     
-    def __init__(self):
+    def __init__(self, table_buffer=100):
         self.router_selection_system = RouterSelectionSystem()
         self.simulation_data = []
         self.network_metrics = {}
         self.performance_tables = {}
+        self._topology_key = None  # (routers, router count, FIB generation) the network metrics describe
+        self.table_buffer = table_buffer  # iterations of router performance rows kept before writing them
+        self.performance_table_path = None
+        self._performance_rows = []
+        self._buffered_iterations = 0
         
     def setup_network_with_selection(self, num_routers, num_subscribers):
         """
@@ -83,6 +85,8 @@ class IntegratedSimulationSystem:
         """
         Calculate network topology metrics for router selection
         """
+        import networkx as nx
+
         # Create network graph
         G = nx.Graph()
         
@@ -90,10 +94,11 @@ class IntegratedSimulationSystem:
         for router in routers:
             G.add_node(router.name)
         
-        # Add edges based on FIB connections
+        # Add edges based on FIB connections (once per distinct next hop)
+        router_names = {router.name for router in routers}
         for router in routers:
-            for content, next_hop in router.fib.items():
-                if hasattr(next_hop, 'name') and next_hop.name in [r.name for r in routers]:
+            for next_hop in {id(hop): hop for hop in router.fib.values()}.values():
+                if hasattr(next_hop, 'name') and next_hop.name in router_names:
                     G.add_edge(router.name, next_hop.name)
         
         # Calculate centrality measures
@@ -107,8 +112,18 @@ class IntegratedSimulationSystem:
             'closeness_centrality': closeness_centrality,
             'graph': G
         }
+        self._topology_key = (id(routers), len(routers), ForwardingTable.generation)
         
         print("Network metrics calculated successfully")
+
+    def update_network_metrics(self, routers):
+        """
+        Recalculate the network metrics only after a topology change (routers added or
+        removed, or any FIB entry changed); requests alone leave them as they are.
+        """
+        if self._topology_key != (id(routers), len(routers), ForwardingTable.generation):
+            self.calculate_network_metrics(routers)
+        return self.network_metrics
     
     def run_integrated_simulation(self, routers, publishers, subscribers, iterations):
         """
@@ -117,6 +132,8 @@ class IntegratedSimulationSystem:
         print(f"Starting integrated simulation with {iterations} iterations...")
         
         contents = [f"cat_image{i}.jpg" for i in range(1, 51)] + [f"dog_image{i}.jpg" for i in range(1, 51)]
+        self.performance_table_path = None  # each run writes its own table
+        self.update_network_metrics(routers)
         
         for iteration in range(iterations):
             print(f"\n--- Iteration {iteration + 1} ---")
@@ -150,8 +167,8 @@ class IntegratedSimulationSystem:
                 # Process the request through the network
                 subscriber.send_interest(interest_packet, subscriber.connected_router)
                 
-                # Update network metrics after request processing
-                self.calculate_network_metrics(routers)
+                # Network metrics change only with the topology, not with requests
+                self.update_network_metrics(routers)
                 
                 # Save performance data
                 self.save_performance_data(routers, iteration, manual_selection, ai_recommendation)
@@ -160,6 +177,8 @@ class IntegratedSimulationSystem:
                 if ai_recommendation and ai_recommendation['router_name'] != self.router_selection_system.get_task_migration_leader():
                     print(f"Task migration leader updated to: {ai_recommendation['router_name']}")
         
+        self.flush_performance_tables()
+        
         # Generate final reports
         self.generate_final_reports()
         
@@ -200,39 +219,57 @@ class IntegratedSimulationSystem:
     
     def save_router_performance_table(self, routers, iteration):
         """
-        Save detailed router performance table
+        Buffer the router performance rows of an iteration; they are written to one
+        table every `table_buffer` iterations
         """
-        os.makedirs('Data_Tables/Router_Performance', exist_ok=True)
-        
-        filename = f"Data_Tables/Router_Performance/router_performance_iter_{iteration + 1}.csv"
+        for router in routers:
+            # Calculate performance metrics
+            cache_occupancy = (len(router.cs) / router.CACHE_LIMIT) * 100
+            total_requests = router.cache_hits + router.publisher_hits
+            cache_hit_ratio = (router.cache_hits / total_requests * 100) if total_requests > 0 else 0
+            
+            # Get cmBA score from network metrics
+            cmba_score = self.network_metrics['degree_centrality'].get(router.name, 0)
+            
+            # Calculate latency
+            latency = router.total_cache_access_time / max(total_requests, 1)
+            
+            self._performance_rows.append([
+                iteration + 1,
+                router.name,
+                f"{cache_occupancy:.2f}%",
+                f"{cmba_score:.4f}",
+                f"{latency:.4f}s",
+                f"{cache_hit_ratio:.2f}%",
+                total_requests,
+                router.cache_hits
+            ])
+        
+        self._buffered_iterations += 1
+        if self._buffered_iterations >= self.table_buffer:
+            self.flush_performance_tables()
+    
+    def flush_performance_tables(self):
+        """
+        Append the buffered router performance rows to the run's performance table
+        """
+        if not self._performance_rows:
+            return
+        if self.performance_table_path is None:
+            os.makedirs('Data_Tables/Router_Performance', exist_ok=True)
+            self.performance_table_path = ("Data_Tables/Router_Performance/"
+                                           f"router_performance_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
         
-        with open(filename, 'w', newline='') as file:
+        write_header = not os.path.exists(self.performance_table_path)
+        with open(self.performance_table_path, 'a', newline='') as file:
             writer = csv.writer(file)
-            writer.writerow(['Router', 'Cache_Occupancy', 'cmBA_Score', 'Latency', 'Cache_Hit_Ratio', 'Total_Requests', 'Cache_Hits'])
-            
-            for router in routers:
-                # Calculate performance metrics
-                cache_occupancy = (len(router.cs) / router.CACHE_LIMIT) * 100
-                total_requests = router.cache_hits + router.publisher_hits
-                cache_hit_ratio = (router.cache_hits / total_requests * 100) if total_requests > 0 else 0
-                
-                # Get cmBA score from network metrics
-                cmba_score = self.network_metrics['degree_centrality'].get(router.name, 0)
-                
-                # Calculate latency
-                latency = router.total_cache_access_time / max(total_requests, 1)
-                
-                writer.writerow([
-                    router.name,
-                    f"{cache_occupancy:.2f}%",
-                    f"{cmba_score:.4f}",
-                    f"{latency:.4f}s",
-                    f"{cache_hit_ratio:.2f}%",
-                    total_requests,
-                    router.cache_hits
-                ])
+            if write_header:
+                writer.writerow(['Iteration', 'Router', 'Cache_Occupancy', 'cmBA_Score', 'Latency', 'Cache_Hit_Ratio', 'Total_Requests', 'Cache_Hits'])
+            writer.writerows(self._performance_rows)
         
-        print(f"Router performance table saved: {filename}")
+        print(f"Router performance table updated ({self._buffered_iterations} iterations): {self.performance_table_path}")
+        self._performance_rows = []
+        self._buffered_iterations = 0
     
     def generate_final_reports(self):
         """
@@ -317,6 +354,9 @@ class IntegratedSimulationSystem:
         """
         Generate visualization plots for the simulation results
         """
+        import matplotlib.pyplot as plt
+        import numpy as np
+
         if not self.simulation_data:
             return
             
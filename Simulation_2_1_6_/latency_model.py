@@ -0,0 +1,133 @@
+"""
+Topology-derived latency accounting.
+
+The end-to-end latency of a request is computed from the path it actually took and where
+it was served (InterestPacket.served_from):
+
+    access link (subscriber <-> first router), both directions
+  + per-router processing (plus a queueing delay that grows with the router's recent load)
+  + propagation delay of every router-to-router link, both directions
+  + transmission of the data packet over every hop on the way back (size / bandwidth)
+  + for cache misses: the link to the publisher, both directions, plus its fetch cost
+
+so a policy that serves more requests closer to the subscriber shows lower latency.
+"""
+
+import collections
+import os
+import random
+
+
+class LatencyModel:
+    DEFAULT_PROCESSING_COST = 0.0005  # seconds per router visit
+
+    def __init__(self, link_delay=0.002, access_delay=0.001, processing_cost=DEFAULT_PROCESSING_COST,
+                 publisher_delay=0.02, bandwidth=12.5e6, default_content_size=50_000,
+                 queueing=True, request_rate=500.0, load_window=100, link_delays=None, processing_costs=None):
+        self.link_delay = link_delay
+        self.access_delay = access_delay
+        self.processing_cost = processing_cost
+        self.publisher_delay = publisher_delay
+        self.bandwidth = bandwidth
+        self.default_content_size = default_content_size
+        self.queueing = queueing
+        self.request_rate = request_rate  # offered load (requests/s) used to turn path shares into utilisation
+        self.load_window = load_window
+        self.link_delays = dict(link_delays or {})  # frozenset({a, b}) -> seconds
+        self.processing_costs = dict(processing_costs or {})  # router name -> seconds
+        self.content_sizes = {}
+        self.reset()
+
+    def reset(self):
+        """Forget load history and per-router observations (keeps the configuration)."""
+        self._recent_paths = collections.deque()
+        self._load = collections.Counter()
+        self.router_latency_sum = collections.defaultdict(float)
+        self.router_latency_count = collections.Counter()
+
+    # ----- configuration -----
+    def register_publishers(self, publishers):
+        """Record the size of every publishable content item."""
+        for publisher in publishers:
+            for name, path in getattr(publisher, 'images', {}).items():
+                if name not in self.content_sizes:
+                    try:
+                        self.content_sizes[name] = os.path.getsize(path)
+                    except OSError:
+                        pass
+
+    def assign_link_delays(self, routers, low=0.001, high=0.01, seed=0):
+        """Give every router-to-router link in the FIBs a fixed random delay in [low, high)."""
+        rng = random.Random(seed)
+        for router in sorted(routers, key=lambda r: r.name):
+            for next_hop in {id(hop): hop for hop in router.fib.values() if hop is not None}.values():
+                key = frozenset((router.name, next_hop.name))
+                if key not in self.link_delays:
+                    self.link_delays[key] = rng.uniform(low, high)
+
+    # ----- components -----
+    def link(self, a, b):
+        return self.link_delays.get(frozenset((a, b)), self.link_delay)
+
+    def transmission(self, content_name):
+        size = self.content_sizes.get(content_name, self.default_content_size)
+        return size / self.bandwidth if self.bandwidth else 0.0
+
+    def processing_delay(self, router_name):
+        """Processing cost of one visit, plus an M/M/1 queueing delay from the router's recent load."""
+        service = self.processing_costs.get(router_name, self.processing_cost)
+        if not self.queueing or not self._recent_paths:
+            return service
+        utilisation = min(0.95, self._load[router_name] / len(self._recent_paths) * self.request_rate * service)
+        return service + service * utilisation / (1 - utilisation)
+
+    def fetch_cost(self, content_name):
+        return self.publisher_delay
+
+    # ----- per request -----
+    def request_latency(self, interest_packet):
+        """
+        End-to-end latency of a completed request, or None if it was never served (dropped
+        by loop detection or missing route). Also records per-router latency observations
+        and updates the load used for queueing.
+        """
+        served_from = getattr(interest_packet, 'served_from', None)
+        path = list(interest_packet.path)
+        if served_from is None or not path:
+            self._observe_load(path)
+            return None
+
+        transmission = self.transmission(interest_packet.name)
+        # Latency from each router on the path to the data source and back, built from the far end
+        onward = 0.0
+        if served_from != path[-1]:
+            onward = 2 * self.link(path[-1], served_from) + self.fetch_cost(interest_packet.name) + transmission
+        for position in range(len(path) - 1, -1, -1):
+            name = path[position]
+            onward += self.processing_delay(name)
+            if position < len(path) - 1:
+                onward += 2 * self.link(name, path[position + 1]) + transmission
+            self.router_latency_sum[name] += onward
+            self.router_latency_count[name] += 1
+
+        self._observe_load(path)
+        return 2 * self.access_delay + transmission + onward
+
+    def _observe_load(self, path):
+        if not self.queueing:
+            return
+        visited = set(path)
+        self._recent_paths.append(visited)
+        self._load.update(visited)
+        if len(self._recent_paths) > self.load_window:
+            self._load.subtract(self._recent_paths.popleft())
+
+    # ----- per router -----
+    def router_latency(self, router):
+        """Mean observed latency from `router` to the data source and back, or an estimate if unseen."""
+        count = self.router_latency_count.get(router.name, 0)
+        if count:
+            return self.router_latency_sum[router.name] / count
+        total = router.cache_hits + router.publisher_hits
+        miss_ratio = router.publisher_hits / total if total else 1.0
+        return self.processing_delay(router.name) + miss_ratio * (2 * self.link_delay + self.publisher_delay)
@@ -4,36 +4,77 @@ import datetime
 import time
 import collections
 import csv
-import networkx as nx
-import matplotlib.pyplot as plt
+import functools
+import json
 import pickle  # Import pickle for saving and loading 
-import pandas as pd
-from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestClassifier
+import sys
+from heavy_hitters import SpaceSaving, network_ranking, save_ranking
+from instrumentation import instrumentation
+from latency_model import LatencyModel
+from metrics_registry import MetricsRegistry
+from path_index import ForwardingTable
+from popularity_aggregation import PopularityAggregator
+from results_sink import ResultsSink
 from router_selection_system import RouterSelectionSystem
 
+# pandas, networkx, matplotlib and sklearn are imported inside the functions that
+# use them so that `import main` stays cheap for worker processes and helper scripts.
+DEFAULT_MODEL_PATH = 'models/random_forest_model.pkl'
+POLICIES = ['LRU', 'LFU', 'FIFO', 'MRU', 'FACR', 'Rdm', 'GDSF', 'SizeLRU', 'RandomForest', 'Bandit']
+
 
 # Base classes for Network elements
+# Node, Router and the packets use __slots__: a network holds many routers and every request
+# allocates packets, so they carry no per-instance __dict__.
 class Node:
+    __slots__ = ('name', 'fib', 'pit', 'cs')
+
     def __init__(self, name):
         self.name = name
-        self.fib = {}  # Forwarding Information Base
+        self.fib = ForwardingTable()  # Forwarding Information Base
         self.pit = {}  # Pending Interest Table
         self.cs = []   # Content Store with limited cache size (15 images)
 
+    def __setstate__(self, state):
+        # Slot state is (__dict__ or None, slots); networks pickled before __slots__ give a plain dict
+        if isinstance(state, tuple):
+            state = {**(state[0] or {}), **state[1]}
+        for key, value in state.items():
+            if key == 'fib' and not isinstance(value, ForwardingTable):
+                value = ForwardingTable(value)
+            setattr(self, key, value)
+
 class InterestPacket:
+    __slots__ = ('name', 'nonce', 'path', 'served_from', 'original_hop_count', 'actual_hop_count',
+                 'seq', 'forwarded_remote')
+
     def __init__(self, name):
+        # Routers crossed so far; a router is never added twice (loops are dropped), and
+        # membership tests on the path double as loop detection
+        self.path = []
+        self.reset(name)
+
+    def reset(self, name):
+        """Reuse this packet for a new request, keeping its path buffers."""
         self.name = name
         self.nonce = random.randint(1000, 9999)
-        self.visited = set()
-        self.path = []
-        self.original_hop_count = 0 
-        self.actual_hop_count = 0  
+        self.path.clear()
+        self.served_from = None  # name of the router (cache hit) or publisher that answered
+        self.original_hop_count = 0
+        self.actual_hop_count = 0
+        self.seq = None  # request sequence number (sharded runs)
+        self.forwarded_remote = False  # handed to a router of another shard (sharded runs)
+        return self
 
 class DataPacket:
-    def __init__(self, name, content):
+    __slots__ = ('name', 'content', 'size')
+
+    def __init__(self, name, content, size=None):
         self.name = name
         self.content = content
+        if size is None:
+            size = len(content) if isinstance(content, (bytes, bytearray)) else 0
+        self.size = size  # payload size in bytes
 
 class ContentIDManager:
     _content_id_map = {}
@@ -52,24 +93,63 @@ class ContentIDManager:
     def get_unique_id(cls, content_name):
         """Retrieve the unique ID for a given content name."""
         return cls._content_id_map.get(content_name, None)
+
+    @classmethod
+    def snapshot(cls):
+        """Copy of the name -> ID map, e.g. for a checkpoint."""
+        return dict(cls._content_id_map)
+
+    @classmethod
+    def restore(cls, mapping):
+        """Replace the name -> ID map with `mapping` (from snapshot())."""
+        cls._content_id_map = dict(mapping)
     
 # Router class with caching policies and FIB, PIT, CS functionality
 class Router(Node):
     CACHE_LIMIT = 15  # Cache size limit
     TOP_N_POPULAR = 5  # Reserve top 5 for most popular items
-
-    def __init__(self, name, caching_policy='LRU', alpha=0.9):
+    POPULARITY_TOP_K = 1000  # Names tracked by the per-router Space-Saving summary
+    POPULARITY_TABLE_LIMIT = POPULARITY_TOP_K  # Rows kept in the popularity table (None = unbounded)
+    WRITE_TABLES = True  # per-packet CS/PIT/popularity CSVs and event logs (the async emulator turns them off)
+    SIZE_AWARE_POLICIES = ('GDSF', 'SizeLRU')
+    _EMPTY_POPULARITY = None  # template for reset_popularity, built on first use
+    __slots__ = ('caching_policy', 'alpha', 'cache_capacity_bytes', 'max_object_bytes', 'popularity_table',
+                 'cache_frequency', 'cache_access_times', 'connections', 'metrics', 'latency_model', 'admission',
+                 'policy_label', 'cache_hits', 'publisher_hits', 'requests_served_from_cache',
+                 'requests_served_from_publisher', 'cache_evictions', 'total_cache_access_time', 'total_requests',
+                 'content_popularity', 'cache_ttl', 'cs_sizes', 'cs_bytes', 'gdsf_clock', 'gdsf_priority',
+                 'cache_rejections', 'content_index', 'on_path_caching')
+
+    def __init__(self, name, caching_policy='LRU', alpha=0.9, cache_capacity_bytes=None, max_object_bytes=None):
         super().__init__(name)
         self.caching_policy = caching_policy  # Store the caching policy
         self.alpha = alpha  # Smoothing factor for EWMA (for calculating popularity)
-        self.popularity_table = pd.DataFrame(columns=['Content Name', 'R_count', 'Popularity', 'Rank', 'Feedback'])
+        # Byte capacity of the Content Store; None keeps the item-count limit (CACHE_LIMIT)
+        self.cache_capacity_bytes = cache_capacity_bytes
+        self.max_object_bytes = max_object_bytes  # admission threshold: larger objects are not cached
+        self.reset_popularity()
         self.cache_frequency = collections.defaultdict(int)  # Frequency for LFU policy
         self.cache_access_times = {}  # Access times for LRU and MRU policies
         self.connections = []  # Store connections to other routers or nodes
-        self.fib={}
+        self.fib = ForwardingTable()
+        self.metrics = None  # MetricsRegistry receiving hit/miss events, if any
+        self.latency_model = None  # LatencyModel supplying processing costs, if any
+        self.admission = None  # admission filter (e.g. TinyLFUAdmission) consulted before evictions
+        self.policy_label = None  # name of the run this router belongs to, if it differs from caching_policy
+        self.content_index = None  # CacheOccupancy mirroring the Content Store, if any
+        self.on_path_caching = None  # strategy for caching data on its way back (None: publisher's router only)
         self.reset()  # Initialize or reset all internal state variables
 
         self.save_fib()  #save initial fib
+
+    def __setstate__(self, state):
+        # Attributes added since a network was pickled start from their defaults
+        self.cache_capacity_bytes = self.max_object_bytes = None
+        self.metrics = self.latency_model = self.admission = self.policy_label = self.content_index = None
+        self.on_path_caching = None
+        super().__setstate__(state)
+        if not hasattr(self, 'cs_sizes'):
+            self.reset()
         
 
     def reset(self):
@@ -83,14 +163,34 @@ class Router(Node):
         self.cache_frequency = collections.defaultdict(int)  # Frequency of accesses (for LFU)
         self.total_cache_access_time = 0  
         self.total_requests = 0  
-        self.content_popularity = collections.defaultdict(int)  # Track how often each content is requested
+        self.content_popularity = SpaceSaving(Router.POPULARITY_TOP_K)  # Bounded top-k request counts
         self.cache_ttl = {}  # Store time-to-live (TTL) for cache entries
         self.cs = []  # Clear the content store (cache)
+        self.cs_sizes = {}  # Size in bytes of every cached item
+        self.cs_bytes = 0
+        self.gdsf_clock = 0.0  # GDSF inflation value L
+        self.gdsf_priority = {}
+        self.cache_rejections = 0  # objects refused by the admission threshold or filter
         self.pit = {}  # Clear the pending interest table (PIT)
+        if self.admission is not None:
+            self.admission.reset()
+        if self.content_index is not None:
+            self.content_index.clear_router(self.name)
+
+    def reset_popularity(self):
+        """Start a fresh, empty popularity table."""
+        if Router._EMPTY_POPULARITY is None:
+            import pandas as pd
+
+            Router._EMPTY_POPULARITY = pd.DataFrame(columns=['Content Name', 'R_count', 'Popularity', 'Rank', 'Feedback'])
+        # Copying an empty frame is ~10x cheaper than building one, which matters for large networks
+        self.popularity_table = Router._EMPTY_POPULARITY.copy()
 
 
     def update_popularity(self, content_name, feedback=None):
         """Update the request count and popularity score for content based on requests and feedback."""
+        import pandas as pd
+
         # Check if the content already exists in the popularity table
         if content_name in self.popularity_table['Content Name'].values:
             # Update existing entry
@@ -107,6 +207,14 @@ class Router(Node):
             self.popularity_table.at[content_index, 'R_count'] = r_count
             self.popularity_table.at[content_index, 'Popularity'] = new_popularity
             self.popularity_table.at[content_index, 'Feedback'] = feedback or 'None'
+        elif Router.POPULARITY_TABLE_LIMIT is not None and len(self.popularity_table) >= Router.POPULARITY_TABLE_LIMIT:
+            # Table full: as in Space-Saving, the new content takes over the least popular row and its
+            # counts, so a newcomer can still climb the ranking (its score is an overestimate)
+            content_index = pd.to_numeric(self.popularity_table['Popularity']).idxmin()
+            self.popularity_table.at[content_index, 'Content Name'] = content_name
+            self.popularity_table.at[content_index, 'R_count'] += 1
+            self.popularity_table.at[content_index, 'Popularity'] += (1 - self.alpha)
+            self.popularity_table.at[content_index, 'Feedback'] = feedback or 'None'
         else:
             # Add new content entry with initial values if it doesn't exist
             new_entry = {
@@ -124,6 +232,8 @@ class Router(Node):
  
     def rank_content(self):
         """Rank contents based on their popularity scores as integers and limit decimal points."""
+        import pandas as pd
+
         # Rank in descending order of popularity, converting rank to integers
         self.popularity_table['Rank'] = self.popularity_table['Popularity'].rank(method='min', ascending=False).astype(int)
     
@@ -132,149 +242,142 @@ class Router(Node):
     
         # Sort values by rank
         self.popularity_table.sort_values(by='Rank', inplace=True)
+        if Router.POPULARITY_TABLE_LIMIT is not None:
+            self.popularity_table = self.popularity_table.head(Router.POPULARITY_TABLE_LIMIT)
 
     def receive_interest(self, interest_packet, subscriber):
+        """Handle an interest; return the DataPacket sent back towards the subscriber, or None."""
         content_id = ContentIDManager.get_unique_id(interest_packet.name)
-        self.content_popularity[interest_packet.name] += 1
+        self.content_popularity.offer(interest_packet.name)
 
         # Log the interest received
         self.log_event(f"Received interest for {interest_packet.name} with ID {content_id} from Subscriber {subscriber.name}")
 
-        access_time = random.uniform(0.01, 0.1)
+        if self.latency_model is not None:
+            access_time = self.latency_model.processing_delay(self.name)
+        else:
+            access_time = LatencyModel.DEFAULT_PROCESSING_COST
         self.total_cache_access_time += access_time
         
         # Prevent loops by checking if this router has already been visited
-        if self.name in interest_packet.visited:
+        if self.name in interest_packet.path:
             self.log_event(f"Loop detected: Dropping interest for {interest_packet.name} at {self.name}")
-            return
+            return None
         
         # No loop only increment total_requests
         self.total_requests += 1
+        if self.admission is not None:
+            self.admission.record(interest_packet.name)
         
-        # hop count tracking
-        if not hasattr(interest_packet, 'actual_hop_count'):
-            interest_packet.actual_hop_count = 0
+        # hop count tracking (reset() starts it at 0)
         interest_packet.actual_hop_count += 1
         
         # Add this router to the packet's path
         interest_packet.path.append(self.name)
-        interest_packet.visited.add(self.name)
         
         if interest_packet.name not in self.pit:
             self.pit[interest_packet.name] = subscriber.name
             self.save_pit()
 
-        if interest_packet.name in self.cs:
+        with instrumentation.stage('cache_lookup'):
+            cached = interest_packet.name in self.cs
+
+        if cached:
             # Cache hit
             self.cache_hits += 1
             self.requests_served_from_cache += 1
-            data_packet = DataPacket(name=interest_packet.name, content=interest_packet.name)
+            if self.metrics is not None:
+                self.metrics.record_cache_hit(self.name)
+            interest_packet.served_from = self.name
+            self._record_access(interest_packet.name)
+            data_packet = DataPacket(name=interest_packet.name, content=interest_packet.name,
+                                     size=self.cs_sizes.get(interest_packet.name, 0))
             self.log_event(f"Cache hit: Serving {interest_packet.name} with ID {content_id} from cache")
             subscriber.receive_data(data_packet)
-            return
+            return data_packet
         else:
             # Cache miss: Fetch content from publisher or next-hop router
             self.publisher_hits += 1
+            if self.metrics is not None:
+                self.metrics.record_cache_miss(self.name)
             self.log_event(f"Cache miss: Fetching {interest_packet.name} with ID {content_id} from Publisher or other routers")
             next_hop = self.fib.get(interest_packet.name)
+            data_packet = None
 
             if next_hop:
                 if isinstance(next_hop, Router):
-                    next_hop.receive_interest(interest_packet, subscriber)
+                    data_packet = next_hop.receive_interest(interest_packet, subscriber)
+                    if data_packet is not None and self.on_path_caching is not None:
+                        self.cache_on_path(interest_packet, data_packet)
                 elif isinstance(next_hop, Publisher):
-                    data_packet = next_hop.serve_content(interest_packet.name)
+                    with instrumentation.stage('publisher_fetch'):
+                        data_packet = next_hop.serve_content(interest_packet.name)
                     if data_packet:
-                        self.receive_data(data_packet)
+                        interest_packet.served_from = next_hop.name
+                        if self.on_path_caching is None:
+                            self.receive_data(data_packet)
+                        else:
+                            self.cache_on_path(interest_packet, data_packet)
                         subscriber.receive_data(data_packet)
             else:
                 self.log_event(f"No route found in FIB for {interest_packet.name}")
 
             self.requests_served_from_publisher += 1
+            return data_packet
+
+    def cache_on_path(self, interest_packet, data_packet):
+        """Data on its way back to the subscriber: keep a copy if the on-path caching strategy says so."""
+        path = interest_packet.path
+        # Hop distances from the source: the router that answered from its cache, or the publisher
+        hops = len(path) - 1 if interest_packet.served_from == path[-1] else len(path)
+        distance = hops - path.index(self.name)
+        if self.on_path_caching.caches(self, interest_packet, distance, hops):
+            self.receive_data(data_packet)
     
     def save_popularity_table(self, policy):
         """Save the popularity table to a policy-specific CSV, including feedback."""
-        os.makedirs(f'Popularity_Table/{policy}', exist_ok=True)
-        self.popularity_table.to_csv(f'Popularity_Table/{policy}/Ptable.csv', index=False)
+        if not Router.WRITE_TABLES:
+            return
+        with instrumentation.stage('csv_write'):
+            os.makedirs(f'Popularity_Table/{policy}', exist_ok=True)
+            self.popularity_table.to_csv(f'Popularity_Table/{policy}/Ptable.csv', index=False)
         print(f"Popularity table saved with feedback for {policy}.")
 
     def receive_data(self, data_packet):
         current_time = datetime.datetime.now()
-        # Remove expired content from the cache
-        for content, expiry_time in list(self.cache_ttl.items()):
-            if current_time > expiry_time:
-                self.cs.remove(content)
-                self.cache_ttl.pop(content)
-                self.log_event(f"Content {content} expired and removed from cache")
-
-        ttl = current_time + datetime.timedelta(minutes=5)
-        self.cache_ttl[data_packet.name] = ttl  # Set TTL for new cache entry
-
-        # Handle cache evictions if the limit is reached
-        if len(self.cs) >= Router.CACHE_LIMIT:
-            self.cache_evictions += 1
-            
-            # Implement FACR policy eviction
-            if self.caching_policy == 'FACR':
-                # Identify top 5 popular content by rank in popularity_table
-                top_5_popular = set(self.popularity_table.head(5)['Content Name'])
-                non_reserved_cache = [item for item in self.cs if item not in top_5_popular]
-
-                # Check if non-reserved cache space is full
-                if len(non_reserved_cache) >= (Router.CACHE_LIMIT - Router.TOP_N_POPULAR):
-                    to_remove = non_reserved_cache[0]  # Evict the oldest in non-reserved
-                    self.cs.remove(to_remove)
-                    self.cache_access_times.pop(to_remove, None)
-                    self.cache_frequency.pop(to_remove, None)
-            else:
-            
-                if self.caching_policy == 'LRU':
-                    lru_content = min(self.cache_access_times, key=self.cache_access_times.get)
-                    self.cs.remove(lru_content)
-                    self.cache_access_times.pop(lru_content)
-                elif self.caching_policy == 'LFU':
-                    lfu_content = min(self.cache_frequency, key=self.cache_frequency.get)
-                    self.cs.remove(lfu_content)
-                    self.cache_frequency.pop(lfu_content)
-                elif self.caching_policy == 'FIFO':
-                    self.cs.pop(0)  # Remove the first cached item (FIFO)
-                elif self.caching_policy == 'MRU':
-                    mru_content = max(self.cache_access_times, key=self.cache_access_times.get)
-                    self.cs.remove(mru_content)
-                    self.cache_access_times.pop(mru_content)
-                elif self.caching_policy == 'Rdm':
-                    # Random eviction strategy
-                    import random as _rnd
-                    if self.cs:
-                        to_remove = _rnd.choice(self.cs)
-                        self.cs.remove(to_remove)
-                        self.cache_access_times.pop(to_remove, None)
-                        self.cache_frequency.pop(to_remove, None)
-                """elif self.caching_policy == 'FACR':
-                    # Reserve space for the top 5 popular items in the cache
-                    top_5_popular = set(self.popularity_table.head(5)['Content Name'])
-                    non_reserved_cache = [item for item in self.cs if item not in top_5_popular]
-
-                # Check if non-reserved cache space is full
-                if len(non_reserved_cache) >= (Router.CACHE_LIMIT - 5):
-                    # Remove the oldest item from non-reserved cache
-                    to_remove = non_reserved_cache[0]
-                    self.cs.remove(to_remove)
-                    self.cache_access_times.pop(to_remove, None)
-                    self.cache_frequency.pop(to_remove, None)"""
-
-        # Cache the new content
-        if data_packet.name not in self.cs:
-            self.cs.append(data_packet.name)
-        if self.caching_policy in ['LRU', 'MRU']:
-            self.cache_access_times[data_packet.name] = current_time
-        elif self.caching_policy == 'LFU':
-            self.cache_frequency[data_packet.name] += 1
+        with instrumentation.stage('eviction'):
+            # Remove expired content from the cache
+            for content, expiry_time in list(self.cache_ttl.items()):
+                if current_time > expiry_time:
+                    self._evict(content)
+                    self.log_event(f"Content {content} expired and removed from cache")
+            admitted = self._make_room(data_packet.size, data_packet.name)
+
+        if admitted:
+            ttl = current_time + datetime.timedelta(minutes=5)
+            self.cache_ttl[data_packet.name] = ttl  # Set TTL for new cache entry
+
+            # Cache the new content
+            if data_packet.name not in self.cs:
+                self.cs.append(data_packet.name)
+                self.cs_sizes[data_packet.name] = data_packet.size
+                self.cs_bytes += data_packet.size
+                if self.content_index is not None:
+                    self.content_index.add(self.name, data_packet.name, data_packet.size)
+            if self.caching_policy in ['LRU', 'MRU']:
+                self.cache_access_times[data_packet.name] = current_time
+            elif self.caching_policy == 'LFU':
+                self.cache_frequency[data_packet.name] += 1
+            self._record_access(data_packet.name)
+        else:
+            self.log_event(f"Admission: {data_packet.name} ({data_packet.size} bytes) not cached in {self.name}")
         self.save_cs()    ##Save and update
 
         # Update popularity metrics for the content
-        self.update_popularity(data_packet.name)
-        self.rank_content()
-        self.save_popularity_table(self.caching_policy)  # Save the popularity table to Ptable.csv
+        with instrumentation.stage('popularity_update'):
+            self.update_popularity(data_packet.name)
+            self.rank_content()
+        self.save_popularity_table(self.policy_label or self.caching_policy)  # Save the popularity table to Ptable.csv
 
         # Log caching event
         content_id = ContentIDManager.get_unique_id(data_packet.name)
@@ -282,44 +385,154 @@ class Router(Node):
         self.save_cs()
 
 
-    def save_fib(self):
-        fib_dir = os.path.join('Output/FIB', self.name)
-        os.makedirs(fib_dir, exist_ok=True)
+    def _make_room(self, incoming_size, incoming_name=None):
+        """
+        Evict items so that an object of `incoming_size` bytes fits; return False if it must
+        not be cached. Without a byte capacity this keeps the item-count behaviour: at most
+        one eviction once CACHE_LIMIT items are cached. With an admission filter, each
+        eviction only happens if the incoming item is estimated to be more frequent than
+        the victim.
+        """
+        if self.cache_capacity_bytes is None:
+            if len(self.cs) >= Router.CACHE_LIMIT:
+                victim = self._select_victim(incoming_size)
+                if victim is not None and not self._admits(incoming_name, victim):
+                    return False
+                self.cache_evictions += 1
+                if victim is not None:
+                    self._evict(victim, replacement=True)
+            return True
+
+        limit = self.cache_capacity_bytes if self.max_object_bytes is None else min(self.max_object_bytes, self.cache_capacity_bytes)
+        if incoming_size > limit:
+            self.cache_rejections += 1
+            return False
+        while self.cs and self.cs_bytes + incoming_size > self.cache_capacity_bytes:
+            victim = self._select_victim(incoming_size)
+            if victim is None or not self._admits(incoming_name, victim):
+                return False
+            self._evict(victim, replacement=True)
+            self.cache_evictions += 1
+        return True
+
+    def _admits(self, incoming_name, victim):
+        if self.admission is None or incoming_name is None or incoming_name == victim:
+            return True
+        if self.admission.admit(incoming_name, victim):
+            return True
+        self.cache_rejections += 1
+        return False
+
+    def _select_victim(self, incoming_size=0):
+        """Pick the cached item to evict under the current policy, or None if nothing may be evicted."""
+        if not self.cs:
+            return None
+        policy = self.caching_policy
+        if policy == 'FACR':
+            # Reserve the top popular items; evict the oldest non-reserved one once that space is full
+            top_popular = set(self.popularity_table.head(Router.TOP_N_POPULAR)['Content Name'])
+            non_reserved_cache = [item for item in self.cs if item not in top_popular]
+            if self.cache_capacity_bytes is None and len(non_reserved_cache) < Router.CACHE_LIMIT - Router.TOP_N_POPULAR:
+                return None
+            return non_reserved_cache[0] if non_reserved_cache else None
+        if policy == 'LRU':
+            return min(self.cs, key=lambda item: self.cache_access_times.get(item, datetime.datetime.min))
+        if policy == 'LFU':
+            return min(self.cs, key=lambda item: self.cache_frequency.get(item, 0))
+        if policy == 'FIFO':
+            return self.cs[0]
+        if policy == 'MRU':
+            return max(self.cs, key=lambda item: self.cache_access_times.get(item, datetime.datetime.min))
+        if policy == 'Rdm':
+            return random.choice(self.cs)
+        if policy == 'GDSF':
+            return min(self.cs, key=lambda item: self.gdsf_priority.get(item, 0.0))
+        if policy == 'SizeLRU':
+            # LRU-MIN: least recently used among the items at least as large as the incoming one,
+            # halving the size threshold until such items exist
+            threshold = incoming_size
+            while threshold >= 1:
+                candidates = [item for item in self.cs if self.cs_sizes.get(item, 0) >= threshold]
+                if candidates:
+                    return min(candidates, key=lambda item: self.cache_access_times.get(item, datetime.datetime.min))
+                threshold //= 2
+            return min(self.cs, key=lambda item: self.cache_access_times.get(item, datetime.datetime.min))
+        # Unknown policies do not evict under the item limit; a byte budget still has to hold
+        return self.cs[0] if self.cache_capacity_bytes is not None else None
+
+    def _evict(self, content, replacement=False):
+        """
+        Remove `content` from the Content Store and every policy structure. Only replacement
+        evictions (not TTL expiries) advance the GDSF clock.
+        """
+        self.cs.remove(content)
+        if self.content_index is not None:
+            self.content_index.discard(self.name, content, self.cs_sizes.get(content, 0))
+        self.cs_bytes -= self.cs_sizes.pop(content, 0)
+        self.cache_ttl.pop(content, None)
+        self.cache_access_times.pop(content, None)
+        self.cache_frequency.pop(content, None)
+        priority = self.gdsf_priority.pop(content, None)
+        if replacement and priority is not None and self.caching_policy == 'GDSF':
+            self.gdsf_clock = priority  # GDSF inflation: L becomes the evicted item's priority
+
+    def _record_access(self, content):
+        """Update the size-aware policies' state when `content` is cached or served from cache."""
+        if self.caching_policy == 'GDSF':
+            # GreedyDual-Size-Frequency with unit cost: H = L + frequency / size
+            self.cache_frequency[content] += 1
+            self.gdsf_priority[content] = self.gdsf_clock + self.cache_frequency[content] / max(self.cs_sizes.get(content, 0), 1)
+        elif self.caching_policy == 'SizeLRU':
+            self.cache_access_times[content] = datetime.datetime.now()
 
-        with open(f'{fib_dir}/fib.csv', mode='w', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow(["Name", "ID", "Next Hop"])
-            for name, next_hop in self.fib.items():
-                content_id = ContentIDManager.get_unique_id(name)
-                next_hop_name = next_hop.name if next_hop else "None"
-                writer.writerow([name, content_id, next_hop_name])
+    def save_fib(self):
+        with instrumentation.stage('csv_write'):
+            fib_dir = os.path.join('Output/FIB', self.name)
+            os.makedirs(fib_dir, exist_ok=True)
+
+            with open(f'{fib_dir}/fib.csv', mode='w', newline='') as file:
+                writer = csv.writer(file)
+                writer.writerow(["Name", "ID", "Next Hop"])
+                for name, next_hop in self.fib.items():
+                    content_id = ContentIDManager.get_unique_id(name)
+                    next_hop_name = next_hop.name if next_hop else "None"
+                    writer.writerow([name, content_id, next_hop_name])
 
     def save_pit(self):
-        pit_dir = os.path.join('Output/PIT', self.name)
-        os.makedirs(pit_dir, exist_ok=True)
+        if not Router.WRITE_TABLES:
+            return
+        with instrumentation.stage('csv_write'):
+            pit_dir = os.path.join('Output/PIT', self.name)
+            os.makedirs(pit_dir, exist_ok=True)
 
-        with open(f'{pit_dir}/pit.csv', mode='w', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow(["Name", "ID", "Requester"])
-            for name, requester in self.pit.items():
-                content_id = ContentIDManager.get_unique_id(name)
-                writer.writerow([name, content_id, requester])
+            with open(f'{pit_dir}/pit.csv', mode='w', newline='') as file:
+                writer = csv.writer(file)
+                writer.writerow(["Name", "ID", "Requester"])
+                for name, requester in self.pit.items():
+                    content_id = ContentIDManager.get_unique_id(name)
+                    writer.writerow([name, content_id, requester])
 
     def save_cs(self):
-        cs_dir = os.path.join('Output/CS', self.name)
-        os.makedirs(cs_dir, exist_ok=True)
+        if not Router.WRITE_TABLES:
+            return
+        with instrumentation.stage('csv_write'):
+            cs_dir = os.path.join('Output/CS', self.name)
+            os.makedirs(cs_dir, exist_ok=True)
 
-        with open(f'{cs_dir}/cs.csv', mode='w', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow(["Content", "ID"])
-            for content in self.cs:
-                content_id = ContentIDManager.get_unique_id(content)
-                writer.writerow([content, content_id])
+            with open(f'{cs_dir}/cs.csv', mode='w', newline='') as file:
+                writer = csv.writer(file)
+                writer.writerow(["Content", "ID"])
+                for content in self.cs:
+                    content_id = ContentIDManager.get_unique_id(content)
+                    writer.writerow([content, content_id])
 
     def log_event(self, message):
-        os.makedirs('Logs', exist_ok=True)
-        with open(f'Logs/log_{self.name}.txt', 'a') as log_file:
-            log_file.write(f"[{datetime.datetime.now()}] {message}\n")
+        if not Router.WRITE_TABLES:
+            return
+        with instrumentation.stage('log_event'):
+            os.makedirs('Logs', exist_ok=True)
+            with open(f'Logs/log_{self.name}.txt', 'a') as log_file:
+                log_file.write(f"[{datetime.datetime.now()}] {message}\n")
 
 
 class Publisher(Node):
@@ -334,7 +547,7 @@ class Publisher(Node):
         image_files = [f for f in os.listdir(self.folder) if os.path.isfile(os.path.join(self.folder, f))]
         for image_name in image_files:
             file_path = os.path.join(self.folder, image_name)
-            images[image_name] = file_path
+            images[sys.intern(image_name)] = file_path  # one shared string per content name
         return images
 
     def serve_content(self, content_name):
@@ -346,42 +559,193 @@ class Publisher(Node):
         return None
 
 class Subscriber(Node):
+    # Array-backed state is held by a SubscriberPopulation once the subscriber is bound to one
+    population = None
+    index = None
+    _active = True
+
     def __init__(self, name):
         super().__init__(name)
         self.active = True
+        self.metrics = None  # MetricsRegistry receiving hop statistics, if any
+
+    @property
+    def active(self):
+        if self.population is not None:
+            return bool(self.population.active[self.index])
+        return self._active
+
+    @active.setter
+    def active(self, value):
+        if self.population is not None:
+            self.population.active[self.index] = value
+        else:
+            self._active = value
 
     def send_interest(self, interest_packet, router):
         if isinstance(router, Router):
-            router.receive_interest(interest_packet, self)
+            with instrumentation.stage('forwarding'):
+                router.receive_interest(interest_packet, self)
+
+        interest_packet.actual_hop_count = len(interest_packet.path)
+        if self.population is not None:
+            self.population.record_hops(self.index, interest_packet.original_hop_count, interest_packet.actual_hop_count)
+        if self.metrics is not None:
+            self.metrics.record_interest(self.name, interest_packet.original_hop_count, interest_packet.actual_hop_count)
     
     
     def provide_feedback(self, router, content_name, feedback):
         """Provide feedback on the content after receiving it."""
-        print(f"Providing feedback: {feedback} for {content_name} via {router.name}")
-        if feedback in ['like', 'dislike', 'neutral', 'highly_like', 'highly_dislike']:
-            router.update_popularity(content_name, feedback=feedback)
-        else:
-            router.update_popularity(content_name, feedback='None')
+        with instrumentation.stage('subscriber_output'):
+            print(f"Providing feedback: {feedback} for {content_name} via {router.name}")
+        with instrumentation.stage('popularity_update'):
+            if feedback in ['like', 'dislike', 'neutral', 'highly_like', 'highly_dislike']:
+                router.update_popularity(content_name, feedback=feedback)
+            else:
+                router.update_popularity(content_name, feedback='None')
 
     def receive_data(self, data_packet):
-        print(f"Subscriber {self.name} received data for {data_packet.name}")
+        with instrumentation.stage('subscriber_output'):
+            print(f"Subscriber {self.name} received data for {data_packet.name}")
         # Assign feedback based on random or behavior-driven logic
         feedback = random.choice(['like', 'dislike', 'neutral', 'highly_like', 'highly_dislike'])
-        print(f"Subscriber {self.name} provided feedback: {feedback} for {data_packet.name}")
+        with instrumentation.stage('subscriber_output'):
+            print(f"Subscriber {self.name} provided feedback: {feedback} for {data_packet.name}")
         self.provide_feedback(self.connected_router, data_packet.name, feedback)
 
 
+TOPOLOGY_PATH = "Saved_Network/topology.json"
+LEGACY_NETWORK_PATH = "Saved_Network/network_setup.pkl"
+TOPOLOGY_FORMAT_VERSION = 1
+NETWORK_PLOT_LIMIT = 500  # larger networks are not drawn
+
+
+def export_topology(routers, publishers, subscribers):
+    """
+    Describe the network as a plain, JSON-serialisable dict: routers, links, FIB prefixes
+    grouped by next hop, publishers and subscriber attachments. Runtime state (caches,
+    popularity tables, loaded files) is deliberately left out.
+    """
+    links = set()
+    fib = {}
+    for router in routers:
+        by_next_hop = {}
+        for name, next_hop in router.fib.items():
+            hop_name = next_hop.name if next_hop else None
+            by_next_hop.setdefault(hop_name, []).append(name)
+            if hop_name is not None:
+                links.add(tuple(sorted((router.name, hop_name))))
+        fib[router.name] = [[hop_name, names] for hop_name, names in by_next_hop.items()]
+
+    return {
+        'format': 'ndn-topology',
+        'version': TOPOLOGY_FORMAT_VERSION,
+        'routers': [
+            {'name': r.name, 'caching_policy': r.caching_policy, 'alpha': r.alpha,
+             'cache_capacity_bytes': r.cache_capacity_bytes, 'max_object_bytes': r.max_object_bytes}
+            for r in routers
+        ],
+        'publishers': [{'name': p.name, 'folder': p.folder} for p in publishers],
+        'subscribers': [
+            {'name': s.name, 'router': s.connected_router.name if getattr(s, 'connected_router', None) else None}
+            for s in subscribers
+        ],
+        'links': [list(link) for link in sorted(links)],
+        'fib': fib,
+    }
+
+
+def build_network(topology):
+    """Create fresh Router, Publisher and Subscriber objects from an exported topology."""
+    if topology.get('format') != 'ndn-topology' or topology.get('version') != TOPOLOGY_FORMAT_VERSION:
+        raise ValueError(f"Unsupported topology format: {topology.get('format')} v{topology.get('version')}")
+
+    routers = [Router(r['name'], caching_policy=r['caching_policy'], alpha=r['alpha'],
+                      cache_capacity_bytes=r.get('cache_capacity_bytes'), max_object_bytes=r.get('max_object_bytes'))
+               for r in topology['routers']]
+    publishers = [Publisher(p['name'], p['folder']) for p in topology['publishers']]
+    nodes = {node.name: node for node in routers + publishers}
+
+    subscribers = []
+    for entry in topology['subscribers']:
+        subscriber = Subscriber(entry['name'])
+        subscriber.connected_router = nodes.get(entry['router'])
+        subscribers.append(subscriber)
+
+    ContentIDManager.initialize_index(publishers)
+
+    for router in routers:
+        for hop_name, names in topology['fib'].get(router.name, []):
+            next_hop = nodes.get(hop_name) if hop_name is not None else None
+            router.fib.update(dict.fromkeys(map(sys.intern, names), next_hop))
+
+    return routers, publishers, subscribers
+
+
+def save_topology(routers, publishers, subscribers, path=TOPOLOGY_PATH):
+    """Write the compact topology description to a JSON file."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as file:
+        json.dump(export_topology(routers, publishers, subscribers), file, separators=(',', ':'))
+
+
+def load_topology(path=TOPOLOGY_PATH):
+    """Read a topology description written by save_topology."""
+    with open(path) as file:
+        return json.load(file)
+
+
+class NetworkSnapshot:
+    """
+    In-memory snapshot of a network's pristine state.
+
+    `restore()` resets the live objects in place (caches, PIT, statistics, popularity
+    tables, FIB and subscriber attachments), which is much cheaper than re-reading and
+    unpickling the network from disk. `clone()` builds an independent copy, e.g. for a
+    worker process, from the compact topology description.
+    """
+
+    def __init__(self, routers, publishers, subscribers):
+        self.routers = routers
+        self.publishers = publishers
+        self.subscribers = subscribers
+        self.topology = export_topology(routers, publishers, subscribers)
+        self._router_state = [(r.caching_policy, r.alpha, dict(r.fib)) for r in routers]
+        self._attachments = [getattr(s, 'connected_router', None) for s in subscribers]
+
+    def restore(self):
+        """Reset the snapshotted objects to their pristine state and return them."""
+        for router, (policy, alpha, fib) in zip(self.routers, self._router_state):
+            router.caching_policy = policy
+            router.alpha = alpha
+            if router.fib != fib:
+                router.fib.clear()
+                router.fib.update(fib)
+            router.reset()
+            router.reset_popularity()
+
+        for subscriber, router in zip(self.subscribers, self._attachments):
+            subscriber.connected_router = router
+            subscriber.active = True
+
+        return self.routers, self.publishers, self.subscribers
+
+    def clone(self):
+        """Build an independent copy of the network from the snapshot's topology."""
+        return build_network(self.topology)
+
+
 def save_network(routers, publishers, subscribers):
     """Save the network setup to a file."""
-    os.makedirs("Saved_Network", exist_ok=True)
-    with open("Saved_Network/network_setup.pkl", "wb") as file:
-        pickle.dump((routers, publishers, subscribers), file)
+    save_topology(routers, publishers, subscribers)
     print("Network setup saved successfully.")
 
 def load_network():
-    """Load the network setup from a saved file."""
+    """Load the network setup from a saved file (compact topology, or a legacy pickle)."""
     try:
-        with open("Saved_Network/network_setup.pkl", "rb") as file:
+        if os.path.exists(TOPOLOGY_PATH):
+            return build_network(load_topology())
+        with open(LEGACY_NETWORK_PATH, "rb") as file:
             return pickle.load(file)  # Ensure it returns a tuple
     except Exception as e:
         print(f"Failed to load the network: {e}")
@@ -389,7 +753,7 @@ def load_network():
 
 def setup_network():
     """Set up the network or reuse an existing one."""
-    if os.path.exists("Saved_Network/network_setup.pkl"):
+    if os.path.exists(TOPOLOGY_PATH) or os.path.exists(LEGACY_NETWORK_PATH):
         choice = input("Use existing network setup? (yes/no): ").strip().lower()
         if choice == 'yes':
             try:
@@ -455,6 +819,20 @@ def setup_network():
     print("New network setup created and saved.")
     return routers, publishers, subscribers  # Return the new network components
 
+def generate_network(args):
+    """Build and save a generated topology (--topology) with shortest-path FIBs."""
+    from topology import generate_topology, make_graph
+
+    graph = make_graph(args.topology, routers=args.routers, seed=args.topology_seed, path=args.topology_file)
+    topology = generate_topology(graph, subscribers=args.subscribers, replicas=args.publisher_replicas,
+                                 publisher_rule=args.publisher_placement, subscriber_rule=args.subscriber_placement,
+                                 seed=args.topology_seed)
+    routers, publishers, subscribers = build_network(topology)
+    save_network(routers, publishers, subscribers)
+    print(f"Generated {args.topology} network: {len(routers)} routers, {len(graph.edges)} links, "
+          f"{len(publishers)} publishers, {len(subscribers)} subscribers.")
+    return routers, publishers, subscribers
+
 def estimate_max_possible_hops(routers, starting_router):
     """Estimate the maximum possible hops from starting router to publisher."""
     return len(routers)  # Simple assumption for now, improves real behavior
@@ -462,13 +840,16 @@ def estimate_max_possible_hops(routers, starting_router):
 
 def compute_network_metrics(routers):
     """Compute degree, betweenness, and closeness centralities for routers."""
+    import networkx as nx
+
     G = nx.Graph()
     for router in routers:
         G.add_node(router.name)
 
+    # Match next hops by name, not class: the routers may come from another copy of this module
     for router in routers:
         for _content, next_hop in router.fib.items():
-            if isinstance(next_hop, Router):
+            if G.has_node(getattr(next_hop, 'name', None)):
                 G.add_edge(router.name, next_hop.name)
 
     if G.number_of_nodes() == 0:
@@ -500,105 +881,197 @@ def _deduplicate_path(path_list):
     return unique_path
 
 
-def run_simulation(routers, publishers, subscribers, policy, iterations, model=None, selection_system=None):
-    # Reset routers to ensure a clean state
-    for router in routers:
-        router.caching_policy = policy
-        router.reset()
-
-    contents = [f"cat_image{i}.jpg" for i in range(1, 51)] + [f"dog_image{i}.jpg" for i in range(1, 51)]
-    simulation_data = []
+def run_simulation(routers, publishers, subscribers, policy, iterations, model=None, selection_system=None, metrics=None,
+                   subscriber_sampling='direct', contents=None, centrality_every=1, latency_model=None, sink=None,
+                   checkpoint=None, resume_state=None, selector=None, occupancy=None, on_path_caching=None):
+    """
+    Run `iterations` content requests under `policy` and return the per-iteration rows.
+
+    `contents` overrides the requested catalogue (defaults to the 50 cat and 50 dog images);
+    `centrality_every` controls how often the centrality outputs and CMBA selection are
+    refreshed (every N iterations, 0 disables them). Latency is computed per request by
+    `latency_model` (a default LatencyModel if omitted) from the path and hit location.
+    With a `sink` (ResultsSink) every row is streamed to disk as it is produced and only
+    the latest row is kept and returned.
+
+    A `checkpoint` (Checkpointer) saves the run state every `checkpoint.every` iterations;
+    passing that state back as `resume_state` (with the network and metrics restored from
+    the same checkpoint) continues the run from where it was saved.
+
+    A `selector` gives every router its own policy: a policy_assignment strategy (static map,
+    CMBA tiers or learned per router) or, for policy 'Bandit', a BanditPolicySelector (a
+    default one if omitted). It is consulted again every `selector.epoch` iterations.
+
+    The routers mirror their Content Stores into `occupancy` (a CacheOccupancy over a
+    per-run ContentRegistry, created if omitted) for network-wide cache queries; the
+    selection system reads cache occupancy and the path's copies of a request from it.
+
+    With an `on_path_caching` strategy (see on_path_caching) data travels back along the
+    interest's path and each router on it may keep a copy; without one, only the router
+    next to the publisher caches.
+    """
+    from content_registry import CacheOccupancy, ContentRegistry
+    from subscriber_population import SubscriberPopulation
+
+    if resume_state is not None:
+        # Everything below was restored from the checkpoint; do not reset it
+        metrics = resume_state['metrics']
+        latency_model = resume_state['latency_model']
+        population = resume_state['population']
+        policy = resume_state['policy']
+        run_label = resume_state['run_label']
+        completed = resume_state['completed']
+        simulation_data = resume_state['simulation_data']
+        selector = resume_state.get('selector')
+        occupancy = resume_state.get('occupancy')
+        instrumentation.set_policy(run_label)
+    else:
+        # Network-wide counters are pushed by routers and subscribers as events happen
+        metrics = metrics if metrics is not None else MetricsRegistry()
+        metrics.begin_run(policy)
+        instrumentation.set_policy(policy)
+        latency_model = latency_model if latency_model is not None else LatencyModel()
+        latency_model.reset()
+        latency_model.register_publishers(publishers)
+
+        if occupancy is None:
+            occupancy = CacheOccupancy(routers, ContentRegistry.from_publishers(publishers))
+
+        # Reset routers to ensure a clean state
+        for router in routers:
+            router.caching_policy = policy
+            router.policy_label = policy
+            router.content_index = occupancy
+            router.on_path_caching = on_path_caching
+            router.reset()
+            router.metrics = metrics
+            router.latency_model = latency_model
+        for subscriber in subscribers:
+            subscriber.metrics = metrics
+        if on_path_caching is not None:
+            on_path_caching.start(routers)
+
+        simulation_data = []
+        completed = 0  # iterations finished so far
+        run_label = policy  # `policy` may be replaced by RandomForest predictions below
+        if policy == 'Bandit' and selector is None:
+            from policy_bandit import BanditPolicySelector
+
+            selector = BanditPolicySelector()
+        if selector is not None:
+            selector.start(routers, latency_model)
+
+    if contents is None:
+        contents = [sys.intern(f"{kind}_image{i}.jpg") for kind in ('cat', 'dog') for i in range(1, 51)]
     active_prob = 0.9  # Subscriber active probability
     router_names = [router.name for router in routers]
-
-    for _ in range(iterations):
-        network_metrics = compute_network_metrics(routers) if selection_system else None
-        for subscriber in subscribers:
-            subscriber.active = random.random() < active_prob
-
-        active_subscribers = [s for s in subscribers if s.active]
-        if active_subscribers:
-            subscriber = random.choice(active_subscribers)
+    router_name_set = set(router_names)
+    if resume_state is None:
+        population = SubscriberPopulation(subscribers, routers, active_prob=active_prob,
+                                          sampling=subscriber_sampling, seed=random.getrandbits(64))
+
+    interest_packet = None  # one packet is reused for every request of the run
+    for _ in range(completed, iterations):
+        with instrumentation.stage('network_metrics'):
+            network_metrics = compute_network_metrics(routers) if selection_system else None
+        active_count, subscriber_index = population.sample()
+        latency = None
+
+        if subscriber_index is not None:
+            subscriber = population.subscribers[subscriber_index]
             content_to_request = random.choice(contents)
 
-            interest_packet = InterestPacket(name=content_to_request)
+            if interest_packet is None:
+                interest_packet = InterestPacket(name=content_to_request)
+            else:
+                interest_packet.reset(content_to_request)
             interest_packet.original_hop_count = estimate_max_possible_hops(routers, subscriber.connected_router)
 
             subscriber.send_interest(interest_packet, subscriber.connected_router)
-
-            interest_packet.actual_hop_count = len(interest_packet.path)
-            subscriber.last_interest_packet = interest_packet
+            latency = latency_model.request_latency(interest_packet)
+            if interest_packet.served_from is not None:
+                metrics.record_delivery(latency_model.content_sizes.get(content_to_request, 0),
+                                        from_cache=interest_packet.served_from in router_name_set)
 
             if selection_system and interest_packet.path:
                 traced_path = [node for node in interest_packet.path if node in router_names]
                 traced_path = _deduplicate_path(traced_path)
                 if traced_path:
-                    iteration_idx = len(simulation_data) + 1
-                    manual_result = selection_system.process_manual_path(
-                        routers=routers,
-                        traced_path=traced_path,
-                        network_metrics=network_metrics or {},
-                        iteration=iteration_idx,
-                        policy=policy,
-                        content_request=content_to_request
-                    )
-                    if manual_result:
-                        selected_name = manual_result['selected_router']['router_name']
-                        print(f"[manual-path] Iteration {iteration_idx} ({policy}) selected {selected_name}")
-
-                    ai_result = selection_system.process_ai_path(
-                        routers=routers,
-                        traced_path=traced_path,
-                        network_metrics=network_metrics or {},
-                        iteration=iteration_idx,
-                        policy=policy,
-                        content_request=content_to_request
-                    )
-                    if ai_result:
-                        print(f"[ai-path] Iteration {iteration_idx} ({policy}) recommended {ai_result['router_name']}")
-
-        # Calculate metrics
-        latency = random.uniform(0.01, 0.1)  # Simulated latency (adjust as needed)
-        total_requests = sum(router.cache_hits + router.publisher_hits for router in routers)
-        total_cache_hits = sum(router.cache_hits for router in routers)
-        avg_cache_hit = (total_cache_hits / total_requests) * 100 if total_requests > 0 else 0
-        avg_latency = latency / total_requests if total_requests > 0 else 0
-
-
-
-        hop_reduction_ratios = []
-        for subscriber in subscribers:
-            if hasattr(subscriber, 'last_interest_packet'):
-                pkt = subscriber.last_interest_packet
-                if pkt.original_hop_count > 0:
-                    reduction = (pkt.original_hop_count - pkt.actual_hop_count) / pkt.original_hop_count
-                    hop_reduction_ratios.append(reduction)
-
-        total_hop_reduction = sum(hop_reduction_ratios) / len(hop_reduction_ratios) if hop_reduction_ratios else 0
+                    with instrumentation.stage('router_selection'):
+                        iteration_idx = completed + 1
+                        manual_result = selection_system.process_manual_path(
+                            routers=routers,
+                            traced_path=traced_path,
+                            network_metrics=network_metrics or {},
+                            iteration=iteration_idx,
+                            policy=policy,
+                            content_request=content_to_request,
+                            occupancy=occupancy
+                        )
+                        if manual_result:
+                            selected_name = manual_result['selected_router']['router_name']
+                            print(f"[manual-path] Iteration {iteration_idx} ({policy}) selected {selected_name}")
+
+                        ai_result = selection_system.process_ai_path(
+                            routers=routers,
+                            traced_path=traced_path,
+                            network_metrics=network_metrics or {},
+                            iteration=iteration_idx,
+                            policy=policy,
+                            content_request=content_to_request,
+                            occupancy=occupancy
+                        )
+                        if ai_result:
+                            print(f"[ai-path] Iteration {iteration_idx} ({policy}) recommended {ai_result['router_name']}")
 
         # Collect simulation data (simplified format)
-        simulation_data.append([datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                                len(active_subscribers),
-                                total_requests,
-                                total_hop_reduction,
-                                avg_cache_hit,
-                                avg_latency])
+        with instrumentation.stage('metrics'):
+            row = metrics.iteration_row(active_count, latency)
+            if sink is not None:
+                sink.add(run_label, completed + 1, row)
+                simulation_data[:] = [row]
+            else:
+                simulation_data.append(row)
+        completed += 1
+        instrumentation.count('iterations')
+
+        # Per-router policies: let the selector react to the epoch that ended (e.g. bandit rewards)
+        if selector is not None and selector.epoch and completed % selector.epoch == 0:
+            with instrumentation.stage('policy_prediction'):
+                selector.step(routers, latency_model)
 
         # If the policy is RandomForest, predict the next policy dynamically
         if model and policy == 'RandomForest':
-            predicted_policy = predict_policy(model, simulation_data)  # Predict policy dynamically
+            with instrumentation.stage('policy_prediction'):
+                predicted_policy = predict_policy(model, simulation_data)  # Predict policy dynamically
             print(f"Predicted policy: {predicted_policy}")  # You can use this to log predicted policies
 
             # Set the predicted policy for the next iteration
             policy = predicted_policy
 
         # Per-iteration: compute and save centrality outputs and CMBA selection
-        try:
-            plot_centrality_measures(routers, save_path=None, show_plot=False)
-            save_cmba_selection(simulation_id=f"{policy}_iter_{len(simulation_data)}", results_csv="Graphs/Centrality/results.csv")
-        except Exception as _e:
-            print("[iteration-centrality] skipped due to:", _e)
-
+        if centrality_every and not completed % centrality_every:
+            try:
+                with instrumentation.stage('centrality'):
+                    plot_centrality_measures(routers, save_path=None, show_plot=False)
+                    save_cmba_selection(simulation_id=f"{policy}_iter_{completed}", results_csv="Graphs/Centrality/results.csv")
+            except Exception as _e:
+                print("[iteration-centrality] skipped due to:", _e)
+
+        if checkpoint is not None and checkpoint.due(completed) and completed < iterations:
+            checkpoint.save({
+                'policy': policy, 'run_label': run_label, 'completed': completed,
+                'simulation_data': simulation_data, 'metrics': metrics,
+                'latency_model': latency_model, 'population': population, 'selector': selector,
+                'occupancy': occupancy,
+            })
+
+    if selector is not None and hasattr(selector, 'summary'):
+        print(f"Bandit policy choices ({selector.epochs} epochs): {selector.summary()}")
+    if occupancy is not None:
+        cache_summary = occupancy.summary()
+        print(f"Cache occupancy at the end of {run_label}: {cache_summary['network_occupancy']:.1%} of capacity, "
+              f"{cache_summary['distinct_cached']} distinct items, {cache_summary['mean_copies']:.2f} copies each")
     return simulation_data
 
 
@@ -607,6 +1080,8 @@ def run_simulation(routers, publishers, subscribers, policy, iterations, model=N
 
 def save_simulation_data(simulation_data, policy):
     """Save the simulation data to a CSV file for each policy."""
+    import pandas as pd
+
     # Ensure the directory for saving the data exists
     os.makedirs(f'ML_Training_Data/{policy}', exist_ok=True)
     
@@ -648,6 +1123,8 @@ def run_simulation_for_all_policies(routers, publishers, subscribers, iterations
     return all_simulation_data
 
 def load_model(filename):
+    from sklearn.ensemble import RandomForestClassifier
+
     with open(filename, 'rb') as file:
         model = pickle.load(file)
 
@@ -656,13 +1133,18 @@ def load_model(filename):
 
     return model
 
-# Loading the Random Forest model
-random_forest_model = load_model('model/random_forest_model.pkl')
 
+@functools.lru_cache(maxsize=None)
+def get_random_forest_model(filename=DEFAULT_MODEL_PATH):
+    """Load the Random Forest model on first use and reuse it afterwards."""
+    return load_model(filename)
 
 
 # Preprocess the data for prediction
 def preprocess_simulation_data(simulation_data):
+    import pandas as pd
+    from sklearn.preprocessing import StandardScaler
+
     # Convert the real-time simulation data into a DataFrame for prediction
     df = pd.DataFrame([simulation_data])
     # Feature scaling (use the same scaler as during training)
@@ -670,9 +1152,9 @@ def preprocess_simulation_data(simulation_data):
     scaled_data = scaler.fit_transform(df)
     return scaled_data
 
-from sklearn.preprocessing import StandardScaler
-
 def predict_policy(model, simulation_data):
+    from sklearn.preprocessing import StandardScaler
+
     # Use the simulation data to predict the next policy
     # Extract relevant features from the simulation data
     # The last row of simulation data contains the most recent metrics (No of Clients, Total Requests, etc.)
@@ -690,42 +1172,27 @@ def predict_policy(model, simulation_data):
     return predicted_policy
 
 
-# Load your model once (you can use this to switch policies in real time)
-random_forest_model = load_model('model/random_forest_model.pkl')
-
-
-
-def generate_global_ptable():
-    # Dictionary to store cumulative popularity across policies
-    global_popularity = {}
-
-    # List of policies used in the simulation
-    policies = ['LRU', 'LFU', 'FIFO', 'MRU', 'FACR', 'RandomForest']
-
-
-    # Loop through each policy's Ptable to collect and aggregate popularity data
-    for policy in policies:
-        ptable_path = f'Popularity_Table/{policy}/Ptable.csv'
-        if os.path.exists(ptable_path):
-            policy_ptable = pd.read_csv(ptable_path)
-            
-            # Accumulate popularity for each content across policies
-            for _, row in policy_ptable.iterrows():
-                content_name = row['Content Name']
-                popularity = row['Popularity']
-                
-                # Add popularity to global score, initializing if new
-                if content_name in global_popularity:
-                    global_popularity[content_name] += popularity
-                else:
-                    global_popularity[content_name] = popularity
-
-    # Create a DataFrame from the aggregated popularity dictionary
-    global_ptable = pd.DataFrame(list(global_popularity.items()), columns=['Content Name', 'Aggregated Popularity'])
+def generate_global_ptable(aggregator=None):
+    """
+    Write Popularity_Table/Global/Global_Ptable.csv. With a PopularityAggregator the ranking
+    covers every router of every policy run; otherwise it is rebuilt from the per-policy Ptable.csv files.
+    """
+    import pandas as pd
 
-    # Sort and rank by the aggregated popularity
-    global_ptable.sort_values(by='Aggregated Popularity', ascending=False, inplace=True)
-    global_ptable['Rank'] = range(1, len(global_ptable) + 1)  # Sequential ranking
+    if aggregator is not None:
+        global_ptable = aggregator.global_ranking()
+    else:
+        # List of policies used in the simulation
+        policies = ['LRU', 'LFU', 'FIFO', 'MRU', 'FACR', 'RandomForest']
+        tables = [pd.read_csv(f'Popularity_Table/{policy}/Ptable.csv', usecols=['Content Name', 'Popularity'])
+                  for policy in policies if os.path.exists(f'Popularity_Table/{policy}/Ptable.csv')]
+        combined = pd.concat(tables) if tables else pd.DataFrame(columns=['Content Name', 'Popularity'])
+
+        # Sum popularity per content across policies, then sort and rank
+        global_ptable = (combined.groupby('Content Name', sort=False)['Popularity'].sum()
+                         .sort_values(ascending=False, kind='stable')
+                         .rename('Aggregated Popularity').reset_index())
+        global_ptable['Rank'] = range(1, len(global_ptable) + 1)  # Sequential ranking
 
     # Save Global Ptable as a CSV file
     os.makedirs('Popularity_Table/Global', exist_ok=True)
@@ -760,7 +1227,7 @@ def save_results(policy_stats):
     with open(filename, mode='w', newline='') as file:
         writer = csv.writer(file)
         # Write header row
-        writer.writerow(["Policy", "Iteration", "Cache Hit Ratio", "Latency", "Hop Reduction"])
+        writer.writerow(["Policy", "Iteration", "Cache Hit Ratio", "Latency", "Hop Reduction", "Byte Hit Ratio"])
 
         # Write each row of stats for every policy and iteration
         for stat in policy_stats:
@@ -769,16 +1236,19 @@ def save_results(policy_stats):
                 stat["Iteration"],
                 stat["Cache Hit Ratio"],
                 stat["Latency"],
-                stat["Hop Reduction"]
+                stat["Hop Reduction"],
+                stat["Byte Hit Ratio"]
             ])
 
     print(f"Results saved to {filename}.")
 
 def plot_policy_comparison(policy_stats):
-    df = pd.DataFrame(policy_stats)
+    """`policy_stats` is a list of per-iteration dicts or the path of a results file."""
+    import matplotlib.pyplot as plt
+    from results_sink import policy_means
 
     # Calculate mean Cache Hit Ratio per policy
-    cache_hit_avg = df.groupby('Policy')['Cache Hit Ratio'].mean()
+    cache_hit_avg = policy_means(policy_stats, 'Cache Hit Ratio')
 
     # Plot
     plt.figure(figsize=(8, 5))
@@ -795,6 +1265,9 @@ def plot_policy_comparison(policy_stats):
     plt.show()
 
 def plot_network_graph(routers, publishers, subscribers):
+    import matplotlib.pyplot as plt
+    import networkx as nx
+
     if not isinstance(routers, list):
         raise TypeError(f"Expected routers to be a list, but got {type(routers)}")
 
@@ -842,6 +1315,9 @@ def plot_network_graph(routers, publishers, subscribers):
     plt.show()
 
 def plot_simulation_log(simulation_data, policy):
+    import matplotlib.pyplot as plt
+    import pandas as pd
+
     df = pd.DataFrame(simulation_data, columns=[
         "Simulation Time", "No of Clients", "Total Requests", 
         "Hop Reduction", "Cache Hit Ratio", "Latency"
@@ -890,9 +1366,6 @@ def plot_simulation_log(simulation_data, policy):
 
 
 # ================= CENTRALITY MEASURES PLOTS =================
-import matplotlib.pyplot as plt
-import os
-import pandas as pd
 from collections import deque, defaultdict
 
 def _build_graph_from_routers(routers):
@@ -1022,6 +1495,9 @@ def plot_centrality_measures(routers, save_path=None, show_plot=True):
     Compute centrality measures from router objects WITHOUT using networkx internals,
     following formulas in the provided PDF. Save CSVs and PNGs into Graphs/Centrality/.
     """
+    import matplotlib.pyplot as plt
+    import pandas as pd
+
     adj = _build_graph_from_routers(routers)
     if len(adj) == 0:
         return
@@ -1071,28 +1547,30 @@ def plot_centrality_measures(routers, save_path=None, show_plot=True):
         ("Betweenness", "Betweenness"),
         ("CMBA (avg)", "CMBA"),
     ]
-    fig, axs = plt.subplots(len(measures), 1, figsize=(10, 3*len(measures)))
-    for ax, (title, col) in zip(axs, measures):
-        ax.bar(df["Router"], df[col])
-        ax.set_title(title)
-        ax.set_ylabel("Score")
-        ax.tick_params(axis='x', rotation=90)
-    plt.tight_layout()
-    plt.savefig(os.path.join(outdir, "centrality_measures.png"), dpi=150, bbox_inches="tight")
-    if show_plot:
-        plt.show()
-    plt.close(fig)
+    with instrumentation.stage('plotting'):
+        fig, axs = plt.subplots(len(measures), 1, figsize=(10, 3*len(measures)))
+        for ax, (title, col) in zip(axs, measures):
+            ax.bar(df["Router"], df[col])
+            ax.set_title(title)
+            ax.set_ylabel("Score")
+            ax.tick_params(axis='x', rotation=90)
+        plt.tight_layout()
+        plt.savefig(os.path.join(outdir, "centrality_measures.png"), dpi=150, bbox_inches="tight")
+        if show_plot:
+            plt.show()
+        plt.close(fig)
 # ================= END CENTRALITY MEASURES PLOTS =================
 import glob
 import csv
 import math
-import matplotlib.pyplot as plt
 
 def save_cmba_selection(simulation_id="sim_1", results_csv="Graphs/Centrality/results.csv"):
     """
     Read centrality results, compute average CMBA, select top router by CMBA,
     and save selection summaries and a sorted CMBA table.
     """
+    import pandas as pd
+
     outdir = os.path.dirname(results_csv) or "Graphs/Centrality"
     os.makedirs(outdir, exist_ok=True)
     try:
@@ -1375,13 +1853,14 @@ def create_comparison_plots(outdir="Graphs/Centrality", baseline_csv="Simulation
     import pandas as pd
     import matplotlib.pyplot as plt
     import os
+    from results_sink import load_results
 
     os.makedirs(outdir, exist_ok=True)
     baseline_values = {"CHR": None, "HRR": None, "Latency": None}
 
     # Read the simulation results CSV for baseline
     try:
-        df = pd.read_csv(baseline_csv)
+        df = load_results(baseline_csv)
         print(f"[create_comparison_plots] Columns in {baseline_csv}: {list(df.columns)}")
         # Find columns by name (case-insensitive)
         chr_col = next((c for c in df.columns if "cache hit" in c.lower()), None)
@@ -1476,9 +1955,13 @@ def create_iterative_comparison_plots(outdir="Graphs/Centrality", results_csv="S
       - With CMBA: baseline scaled by improvement factor derived from avg CMBA
     Saves PNGs and a comparison_iterative.csv summarizing values by iteration.
     """
+    import matplotlib.pyplot as plt
+    import pandas as pd
+    from results_sink import load_results
+
     os.makedirs(outdir, exist_ok=True)
     try:
-        df = pd.read_csv(results_csv)
+        df = load_results(results_csv, ["Policy", "Iteration", "Cache Hit Ratio", "Hop Reduction", "Latency"])
     except Exception as e:
         print(f"[create_iterative_comparison_plots] Could not read {results_csv}: {e}")
         return None
@@ -1549,8 +2032,12 @@ def create_iterative_comparison_plots(outdir="Graphs/Centrality", results_csv="S
     print(f"[create_iterative_comparison_plots] Saved iterative comparison to {comp_csv}")
     return comp_iter_df
 def plot_merged_graph(policy_stats):
-    """Plot a merged graph comparing all traditional caching policies."""
-    df = pd.DataFrame(policy_stats)
+    """Plot a merged graph comparing all traditional caching policies (list of dicts or results file path)."""
+    import matplotlib.pyplot as plt
+    from results_sink import load_results
+
+    metrics = ["Cache Hit Ratio", "Latency", "Hop Reduction"]
+    df = load_results(policy_stats, ["Policy", "Iteration"] + metrics)
 
     fig, axs = plt.subplots(1, 3, figsize=(18, 6))
 
@@ -1571,8 +2058,6 @@ def plot_merged_graph(policy_stats):
         "markevery": 10,  # ✅ Markers every 10 points (as you want)
     }
 
-    metrics = ["Cache Hit Ratio", "Latency", "Hop Reduction"]
-
     for i, metric in enumerate(metrics):
         ax = axs[i]
         for policy in df["Policy"].unique():
@@ -1603,77 +2088,242 @@ def plot_merged_graph(policy_stats):
     plt.tight_layout(rect=[0, 0.03, 1, 0.95])
     plt.show()
 
-import pickle
-
-def main():
-    # Load existing network or create a new one
-    routers, publishers, subscribers = setup_network()
-    selection_system = RouterSelectionSystem()
-
-    # Plot the network topology at the beginning
-    plot_network_graph(routers, publishers, subscribers)
-
-    # Get the number of iterations for the simulation
-    iterations = int(input("Enter the number of content requests in the simulation: "))
-    
-    # Load the trained Random Forest model
-    random_forest_model = load_model('models/random_forest_model.pkl')  # Load the trained model
-
-    # Run the simulation for all policies and collect results
-    policy_stats = []
-
-    # Define the caching policies to be tested, including Random Forest
-    policies = ['LRU', 'LFU', 'FIFO', 'MRU', 'FACR', 'Rdm', 'RandomForest']
+def parse_args(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="NDN caching policy simulation")
+    parser.add_argument('--policies', nargs='+', choices=POLICIES, default=POLICIES,
+                        help="Caching policies to simulate, in order (the trained model is only loaded for RandomForest)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Collect per-stage timings for every policy and write a profiling report")
+    parser.add_argument('--cprofile', action='store_true',
+                        help="Also capture a cProfile trace of the whole run (implies --profile)")
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help="Also track allocated bytes per stage with tracemalloc (implies --profile)")
+    parser.add_argument('--profile-dir', default='Profiling',
+                        help="Directory for the profiling report (default: Profiling)")
+    parser.add_argument('--cache-bytes', type=int, default=None,
+                        help="Content Store capacity in bytes (default: item limit of Router.CACHE_LIMIT)")
+    parser.add_argument('--max-object-bytes', type=int, default=None,
+                        help="Admission threshold: objects larger than this are not cached")
+    parser.add_argument('--admission', choices=['none', 'tinylfu'], default='none',
+                        help="Admission filter in front of every router's replacement policy")
+    parser.add_argument('--results', default='Simulation_Results/policy_comparison.csv',
+                        help="Results file, streamed while the simulation runs (.csv, or .parquet with pyarrow)")
+    parser.add_argument('--results-buffer', type=int, default=10_000,
+                        help="Result rows held in memory before they are appended to the results file")
+    parser.add_argument('--checkpoint', default='Checkpoints/simulation.ckpt',
+                        help="Checkpoint file (default: Checkpoints/simulation.ckpt)")
+    parser.add_argument('--checkpoint-every', type=int, default=1000,
+                        help="Save a checkpoint every N iterations and after each policy (0 disables; CSV results only)")
+    parser.add_argument('--assignment', choices=['none', 'static', 'tier', 'learned'], default='none',
+                        help="Also run a mixed deployment with per-router policies: a static map, "
+                             "CMBA centrality tiers, or a bandit learned per router")
+    parser.add_argument('--assignment-map', default=None,
+                        help="JSON file {router name: policy} for --assignment static")
+    parser.add_argument('--link-delay-range', type=float, nargs=2, default=[0.001, 0.01], metavar=('LOW', 'HIGH'),
+                        help="Give every link a fixed random propagation delay in [LOW, HIGH) seconds")
+    parser.add_argument('--link-delay-seed', type=int, default=0,
+                        help="Seed for the per-link delays (default: 0)")
+    parser.add_argument('--uniform-link-delay', action='store_true',
+                        help="Use one default delay for every link instead of per-link delays")
+    parser.add_argument('--on-path-caching', choices=['none', 'lce', 'lcd', 'probcache', 'cmba'], default='none',
+                        help="Deliver data back along the interest path and cache on it: leave copy everywhere, "
+                             "leave copy down, ProbCache, or the highest-CMBA router (default: only the "
+                             "publisher's router caches)")
+    parser.add_argument('--topology', choices=['ba', 'waxman', 'tree', 'fat-tree', 'grid', 'file'], default=None,
+                        help="Generate the network instead of prompting for it, with shortest-path FIBs")
+    parser.add_argument('--routers', type=int, default=100,
+                        help="Approximate router count of a generated topology (default: 100)")
+    parser.add_argument('--subscribers', type=int, default=10,
+                        help="Subscribers in a generated topology (default: 10)")
+    parser.add_argument('--topology-file', default=None,
+                        help="Edge list for --topology file: one 'a b [weight]' link per line")
+    parser.add_argument('--publisher-placement', choices=['core', 'edge', 'random'], default='core',
+                        help="Routers that host the publishers of a generated topology (default: core)")
+    parser.add_argument('--publisher-replicas', type=int, default=1,
+                        help="Publishers per content folder in a generated topology (default: 1)")
+    parser.add_argument('--subscriber-placement', choices=['edge', 'uniform', 'random'], default='edge',
+                        help="Routers the subscribers of a generated topology attach to (default: edge)")
+    parser.add_argument('--topology-seed', type=int, default=None,
+                        help="Random seed for the generated graph and placements")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue the run saved in --checkpoint (and its results file) instead of starting a new one")
+    return parser.parse_args(argv)
+
+
+def expected_cache_items(publishers, cache_bytes=None):
+    """Objects a Content Store holds: CACHE_LIMIT, or a byte capacity over the catalogue's mean object size."""
+    if cache_bytes is None:
+        return Router.CACHE_LIMIT
+    sizes = [os.path.getsize(path) for publisher in publishers for path in publisher.images.values()
+             if os.path.exists(path)]
+    if not sizes:
+        return Router.CACHE_LIMIT
+    return max(1, int(cache_bytes // (sum(sizes) / len(sizes))))
+
+
+def make_latency_model(routers, args):
+    """The latency model shared by all policy runs, with seeded per-link delays unless --uniform-link-delay."""
+    latency_model = LatencyModel()
+    if not args.uniform_link_delay:
+        low, high = args.link_delay_range
+        latency_model.assign_link_delays(routers, low, high, seed=args.link_delay_seed)
+    return latency_model
+
+
+def main(argv=None):
+    from on_path_caching import make_on_path_caching
+    from policy_assignment import make_assignment, router_breakdown, save_router_breakdown
+
+    args = parse_args(argv)
+    profiling = args.profile or args.cprofile or args.tracemalloc
+    if profiling:
+        instrumentation.enable(cprofile=args.cprofile, trace_memory=args.tracemalloc)
+
+    if args.resume:
+        # Continue an interrupted run: the whole simulation state comes from the checkpoint
+        from checkpoint import load_checkpoint, resume_results
+
+        state = load_checkpoint(args.checkpoint)
+        snapshot = state['snapshot']
+        selection_system = state['selection_system']
+        metrics = state['metrics']
+        aggregator = state['aggregator']
+        policy_rankings = state['policy_rankings']
+        policies_done = state['policies_done']
+        iterations = state['iterations']
+        ContentIDManager.restore(state['content_ids'])
+        run_state = state['run']
+        router_rows = state.get('router_rows', [])
+        latency_model = state.get('latency_model') or make_latency_model(snapshot.routers, args)
+        sink = resume_results(state, buffer_rows=args.results_buffer)
+        print(f"Resuming from {args.checkpoint}: {len(policies_done)} policies done"
+              + (f", {run_state['run_label']} at iteration {run_state['completed']}" if run_state else ""))
+    else:
+        # Generate, load or create the network
+        if args.topology:
+            routers, publishers, subscribers = generate_network(args)
+        else:
+            routers, publishers, subscribers = setup_network()
+        cache_items = expected_cache_items(publishers, args.cache_bytes)
+        for router in routers:
+            router.cache_capacity_bytes = args.cache_bytes
+            router.max_object_bytes = args.max_object_bytes
+            if args.admission == 'tinylfu':
+                from admission import TinyLFUAdmission
+                router.admission = TinyLFUAdmission.for_cache(cache_items)
+        snapshot = NetworkSnapshot(routers, publishers, subscribers)
+        selection_system = RouterSelectionSystem()
+        latency_model = make_latency_model(routers, args)
+
+        # Plot the network topology at the beginning (drawing large networks takes far longer than simulating them)
+        if len(routers) <= NETWORK_PLOT_LIMIT:
+            plot_network_graph(routers, publishers, subscribers)
+        else:
+            print(f"Skipping the network plot for {len(routers)} routers (limit {NETWORK_PLOT_LIMIT}).")
+
+        # Get the number of iterations for the simulation
+        iterations = int(input("Enter the number of content requests in the simulation: "))
+
+        # Run the simulation for all policies, streaming every iteration to the results file
+        sink = ResultsSink(args.results, buffer_rows=args.results_buffer)
+        policy_rankings = []  # network-wide heavy hitters of every policy run
+        aggregator = PopularityAggregator()  # popularity of every router for every policy
+        metrics = MetricsRegistry(keep_history=False)  # rows are streamed to the results sink instead
+        policies_done = []
+        run_state = None
+        router_rows = []  # per-router policy and results of every run
+
+    checkpoint = None
+    if args.checkpoint_every and sink.format == 'csv':
+        from checkpoint import Checkpointer
+
+        checkpoint = Checkpointer(args.checkpoint, every=args.checkpoint_every, sink=sink)
+        checkpoint.context.update(snapshot=snapshot, selection_system=selection_system, metrics=metrics,
+                                  aggregator=aggregator, policy_rankings=policy_rankings,
+                                  policies_done=policies_done, iterations=iterations, router_rows=router_rows,
+                                  content_ids=ContentIDManager.snapshot(), latency_model=latency_model)
+
+    # The caching policies to be tested
+    policies = list(args.policies)
+
+    # Load the trained Random Forest model only if that policy still has to run
+    random_forest_model = None
+    if 'RandomForest' in policies and 'RandomForest' not in policies_done:
+        random_forest_model = get_random_forest_model()  # Load the trained model (cached)
+
+    # Optionally add a mixed deployment where every router runs its own policy
+    assignment = make_assignment(args.assignment, args.assignment_map)
+    if assignment is not None:
+        policies.append(f'Mixed-{args.assignment}')
+    on_path_caching = make_on_path_caching(args.on_path_caching)
 
     # Run the simulation for each policy and collect results
     for policy in policies:
-        routers, publishers, subscribers = load_network()  # Reload network for each policy
+        if policy in policies_done:
+            continue
+        if run_state is not None:
+            routers, publishers, subscribers = snapshot.routers, snapshot.publishers, snapshot.subscribers
+        else:
+            routers, publishers, subscribers = snapshot.restore()  # Reset network to its pristine state for each policy
 
         print(f"\nRunning simulation for {policy} policy...")
 
         # Modify `run_simulation` to handle the Random Forest policy dynamically
         if policy == 'RandomForest':
-            stats = run_simulation(
+            run_simulation(
                 routers,
                 publishers,
                 subscribers,
                 policy,
                 iterations,
                 random_forest_model,
-                selection_system=selection_system
+                selection_system=selection_system,
+                metrics=metrics,
+                sink=sink,
+                checkpoint=checkpoint,
+                resume_state=run_state,
+                latency_model=latency_model,
+                on_path_caching=on_path_caching
             )
         else:
-            stats = run_simulation(
+            run_simulation(
                 routers,
                 publishers,
                 subscribers,
                 policy,
                 iterations,
-                selection_system=selection_system
+                selection_system=selection_system,
+                metrics=metrics,
+                sink=sink,
+                checkpoint=checkpoint,
+                resume_state=run_state,
+                selector=assignment if policy.startswith('Mixed-') else None,
+                latency_model=latency_model,
+                on_path_caching=on_path_caching
             )
 
-        # Collect policy stats and add them to the list
-        policy_stats.extend([
-            {
-                "Policy": policy,
-                "Iteration": i + 1,
-                "No of Clients": stat[1],    # Number of clients
-                "Cache Hit Ratio": stat[4],  # Cache Hit Ratio
-                "Latency": stat[5],          # Latency
-                "Hop Reduction": stat[3],    # Hop Reduction
-            }
-            for i, stat in enumerate(stats)
-        ])
+        policy_rankings.append(network_ranking(routers))
+        aggregator.add(routers, policy)
+        router_rows.extend(router_breakdown(routers, policy))
+        policies_done.append(policy)
+        run_state = None
+        if checkpoint is not None:
+            checkpoint.save()
 
-    # Save the results for all policies to a CSV file
-    save_results(policy_stats)
+    # Write out the last buffered rows of the results file, and the per-router breakdown
+    sink.close()
+    save_router_breakdown(router_rows, append=False)
 
-    # Plot the comparison of all policies in individual and merged graphs
-    plot_policy_comparison(policy_stats)
-    plot_merged_graph(policy_stats)  # New merged graph plot
+    # Plot the comparison of all policies in individual and merged graphs (read back from the results file)
+    plot_policy_comparison(sink.path)
+    plot_merged_graph(sink.path)  # New merged graph plot
 
     # Generate Global Popularity Table after all policies are simulated
-    generate_global_ptable()
+    aggregator.save()
+    generate_global_ptable(aggregator)
+    save_ranking(SpaceSaving.merge_all(policy_rankings), 'Popularity_Table/Global/Global_HeavyHitters.csv')
     # --- Auto-run centrality computations and analyses (added by assistant) ---
     try:
         # 'routers' variable is expected to be the list of router objects in scope
@@ -1688,11 +2338,11 @@ def main():
             except Exception as _e:
                 print("[auto-centrality] save_cmba_selection failed:", _e)
             try:
-                create_comparison_plots(outdir="Graphs/Centrality", baseline_csv="Simulation_Results/policy_comparison.csv")
+                create_comparison_plots(outdir="Graphs/Centrality", baseline_csv=sink.path)
             except Exception as _e:
                 print("[auto-centrality] create_comparison_plots failed:", _e)
             try:
-                create_iterative_comparison_plots(outdir="Graphs/Centrality", results_csv="Simulation_Results/policy_comparison.csv", baseline_policy="Rdm")
+                create_iterative_comparison_plots(outdir="Graphs/Centrality", results_csv=sink.path, baseline_policy="Rdm")
             except Exception as _e:
                 print("[auto-centrality] create_iterative_comparison_plots failed:", _e)
         else:
@@ -1717,7 +2367,13 @@ def main():
     except Exception as graph_exc:
         print(f"[combined-graph] generation skipped: {graph_exc}")
 
+    if profiling:
+        instrumentation.write_report(args.profile_dir)
+
 
 if __name__ == "__main__":
+    # Helper modules import from `main`; make that this module rather than a second copy
+    # whose Router class would not match the routers built here
+    sys.modules.setdefault('main', sys.modules[__name__])
     main()
 
@@ -0,0 +1,103 @@
+import collections
+import datetime
+
+
+class MetricsRegistry:
+    """
+    Network-wide simulation metrics maintained incrementally.
+
+    Routers and subscribers push counter deltas as events happen (cache hit, cache miss,
+    completed interest), so every aggregate below is updated in O(1) instead of being
+    recomputed by summing over all routers and subscribers after each request.
+    """
+
+    def __init__(self, keep_history=True):
+        self.keep_history = keep_history
+        self.time_series = collections.defaultdict(list)  # policy -> list of iteration rows
+        self.begin_run(None)
+
+    def begin_run(self, policy):
+        """Reset the running aggregates for a new simulation run of `policy`."""
+        self.policy = policy
+        self.cache_hits = 0
+        self.publisher_hits = 0
+        self.latency_sum = 0.0
+        self.latency_count = 0
+        self.hop_reduction_sum = 0.0
+        self.bytes_requested = 0
+        self.bytes_from_cache = 0
+        self._last_hop_reduction = {}  # subscriber -> reduction ratio of its latest interest
+
+    # ----- events -----
+    def record_cache_hit(self, router_name):
+        self.cache_hits += 1
+
+    def record_cache_miss(self, router_name):
+        self.publisher_hits += 1
+
+    def record_latency(self, latency):
+        self.latency_sum += latency
+        self.latency_count += 1
+
+    def record_delivery(self, size, from_cache):
+        """Count the bytes of a served request, split by whether a cache answered it."""
+        self.bytes_requested += size
+        if from_cache:
+            self.bytes_from_cache += size
+
+    def record_interest(self, subscriber_name, original_hop_count, actual_hop_count):
+        """Replace the hop reduction ratio of the subscriber's previous interest with this one."""
+        previous = self._last_hop_reduction.pop(subscriber_name, None)
+        if previous is not None:
+            self.hop_reduction_sum -= previous
+        if original_hop_count > 0:
+            reduction = (original_hop_count - actual_hop_count) / original_hop_count
+            self._last_hop_reduction[subscriber_name] = reduction
+            self.hop_reduction_sum += reduction
+
+    # ----- aggregates -----
+    @property
+    def total_requests(self):
+        return self.cache_hits + self.publisher_hits
+
+    @property
+    def cache_hit_ratio(self):
+        """Cache hit ratio in percent."""
+        total = self.total_requests
+        return (self.cache_hits / total) * 100 if total > 0 else 0
+
+    @property
+    def byte_hit_ratio(self):
+        """Share of requested bytes served from a cache, in percent."""
+        return (self.bytes_from_cache / self.bytes_requested) * 100 if self.bytes_requested > 0 else 0
+
+    @property
+    def hop_reduction(self):
+        """Average hop reduction over the latest interest of every subscriber."""
+        count = len(self._last_hop_reduction)
+        return self.hop_reduction_sum / count if count else 0
+
+    @property
+    def mean_latency(self):
+        return self.latency_sum / self.latency_count if self.latency_count else 0
+
+    def iteration_row(self, active_clients, latency):
+        """
+        Build the per-iteration row used by run_simulation:
+        [Simulation Time, No of Clients, Total Requests, Hop Reduction, Cache Hit Ratio, Latency, Byte Hit Ratio]
+
+        `latency` is the end-to-end latency of the iteration's request, or None when no
+        request was served (it is then reported as 0 and left out of mean_latency).
+        """
+        if latency is not None:
+            self.record_latency(latency)
+        row = [datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+               active_clients,
+               self.total_requests,
+               self.hop_reduction,
+               self.cache_hit_ratio,
+               latency if latency is not None else 0,
+               self.byte_hit_ratio]
+        if self.keep_history:
+            self.time_series[self.policy].append(row)
+        return row
@@ -0,0 +1,100 @@
+"""
+On-path caching strategies for reverse-path data delivery.
+
+By default only the router next to the publisher caches what it fetches. With a strategy,
+data travels back along the interest's path (the PIT entries of the routers it crossed)
+and every router on the way asks the strategy whether to keep a copy. The router's own
+caching policy then decides what to evict. Pass a strategy to run_simulation as
+`on_path_caching`:
+
+  - LeaveCopyEverywhere (LCE): every router between the source and the subscriber caches.
+  - LeaveCopyDown (LCD): only the router one hop downstream of the source caches, so
+    popular content moves one hop towards the subscribers on every hit.
+  - ProbCache: router x hops from the source, on a path of c hops, caches with probability
+    TimesIn * x / c, where TimesIn is the cache capacity left on the path towards the
+    subscriber over `target_window` times the router's own capacity (Psaras et al.).
+  - CentralityCaching: only the router with the highest CMBA score (0.3 degree +
+    0.4 betweenness + 0.3 closeness) between the source and the subscriber caches.
+
+The source is the router that answered from its Content Store, or the publisher. Every
+strategy has start(routers), called at the beginning of a run, and caches(router,
+interest_packet, distance, hops), where `distance` is the router's number of hops from the
+source and `hops` that of the subscriber's router.
+"""
+
+import random
+
+
+class LeaveCopyEverywhere:
+    name = 'lce'
+
+    def start(self, routers):
+        pass
+
+    def caches(self, router, interest_packet, distance, hops):
+        return distance >= 1
+
+
+class LeaveCopyDown(LeaveCopyEverywhere):
+    name = 'lcd'
+
+    def caches(self, router, interest_packet, distance, hops):
+        return distance == 1
+
+
+class ProbCache(LeaveCopyEverywhere):
+    name = 'probcache'
+
+    def __init__(self, target_window=10, seed=None):
+        self.target_window = target_window  # T_tw: seconds of traffic the path should be able to hold
+        self.rng = random.Random(seed)  # own stream, so request sequences match the other strategies
+        self.capacity = {}
+
+    def start(self, routers):
+        self.capacity = {router.name: router.cache_capacity_bytes or router.CACHE_LIMIT for router in routers}
+
+    def caches(self, router, interest_packet, distance, hops):
+        if distance < 1:
+            return False
+        own = self.capacity.get(router.name, router.CACHE_LIMIT)
+        downstream = interest_packet.path[:hops - distance + 1]  # this router and those towards the subscriber
+        times_in = sum(self.capacity.get(name, own) for name in downstream) / (self.target_window * own)
+        return self.rng.random() < times_in * distance / hops
+
+
+class CentralityCaching(LeaveCopyEverywhere):
+    name = 'cmba'
+
+    def __init__(self):
+        self.scores = {}
+
+    def start(self, routers):
+        from main import compute_network_metrics
+        from router_selection_system import RouterSelectionSystem
+
+        network_metrics = compute_network_metrics(routers)
+        selection = RouterSelectionSystem()
+        self.scores = {router.name: selection.calculate_cmba_score(router, network_metrics) for router in routers}
+        if self.scores:
+            top = max(self.scores, key=self.scores.get)
+            print(f"[on-path-caching] cmba: {top} has the highest CMBA score ({self.scores[top]:.3f})")
+
+    def caches(self, router, interest_packet, distance, hops):
+        if distance < 1:
+            return False
+        path = interest_packet.path
+        # Ties go to the router closest to the subscriber
+        best = max(range(hops), key=lambda position: (self.scores.get(path[position], 0.0), -position))
+        return best == hops - distance
+
+
+STRATEGIES = {strategy.name: strategy for strategy in (LeaveCopyEverywhere, LeaveCopyDown, ProbCache, CentralityCaching)}
+
+
+def make_on_path_caching(kind, seed=None):
+    """Strategy for the --on-path-caching option ('lce', 'lcd', 'probcache', 'cmba'), or None."""
+    if kind in (None, 'none'):
+        return None
+    if kind not in STRATEGIES:
+        raise ValueError(f"Unknown on-path caching strategy '{kind}'")
+    return ProbCache(seed=seed) if kind == 'probcache' else STRATEGIES[kind]()
@@ -0,0 +1,105 @@
+"""
+Cached FIB path lookups for the router selection processes.
+
+Router FIBs are ForwardingTables: dicts that bump a network-wide `generation` counter
+whenever any FIB entry is added, changed or removed. A PathIndex remembers, for one list of
+routers, the router path of every (ingress router, content name) it has traced. The cache
+is kept until a FIB changes, so repeated traces for the same content are a dict lookup
+whatever the size of the network. FIB entries match content names exactly, so the content
+name is the key (there is no prefix matching to index).
+"""
+
+
+class ForwardingTable(dict):
+    """Forwarding Information Base: content name -> next hop, with change tracking."""
+
+    generation = 0  # bumped on every change to any ForwardingTable
+
+    @staticmethod
+    def _changed():
+        ForwardingTable.generation += 1
+
+    def __setitem__(self, name, next_hop):
+        super().__setitem__(name, next_hop)
+        self._changed()
+
+    def __delitem__(self, name):
+        super().__delitem__(name)
+        self._changed()
+
+    def __ior__(self, other):
+        result = super().__ior__(other)
+        self._changed()
+        return result
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._changed()
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+    def pop(self, *args):
+        result = super().pop(*args)
+        self._changed()
+        return result
+
+    def popitem(self):
+        result = super().popitem()
+        self._changed()
+        return result
+
+    def setdefault(self, name, next_hop=None):
+        result = super().setdefault(name, next_hop)
+        self._changed()
+        return result
+
+
+class PathIndex:
+    def __init__(self):
+        self._key = None  # (routers list identity, router count, FIB generation) the cache is valid for
+        self._routers_by_name = {}
+        self._paths = {}
+
+    def __getstate__(self):
+        # Cached paths are tied to object identities of this process; rebuild them after unpickling
+        return {}
+
+    def __setstate__(self, state):
+        self.__init__()
+
+    def _refresh(self, routers):
+        key = (id(routers), len(routers), ForwardingTable.generation)
+        if key != self._key:
+            self._key = key
+            self._routers_by_name = {router.name: router for router in reversed(routers)}  # first match wins
+            self._paths = {}
+
+    def router(self, routers, name):
+        """The router called `name` in `routers`, or None."""
+        self._refresh(routers)
+        return self._routers_by_name.get(name)
+
+    def path(self, routers, content_request, ingress=None):
+        """
+        Names of the routers an Interest for `content_request` crosses from `ingress`
+        (default: the first router) following the FIBs, at most len(routers) hops.
+        """
+        self._refresh(routers)
+        if ingress is None:
+            ingress = routers[0] if routers else None
+        key = (ingress.name if ingress is not None else None, content_request)
+        path = self._paths.get(key)
+        if path is None:
+            path = []
+            current_router = ingress
+            while current_router and len(path) < len(routers):
+                path.append(current_router.name)
+                next_hop = current_router.fib.get(content_request)
+                if next_hop and hasattr(next_hop, 'name'):
+                    current_router = self._routers_by_name.get(next_hop.name)
+                else:
+                    break
+            self._paths[key] = path = tuple(path)
+        return list(path)
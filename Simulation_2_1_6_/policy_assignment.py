@@ -0,0 +1,114 @@
+"""
+Per-router caching policies.
+
+An assignment strategy gives each router its own caching policy for a run, instead of one
+global policy. Pass it to run_simulation as `assignment`:
+
+  - StaticAssignment: a fixed {router name: policy} map (e.g. loaded from JSON), with a default.
+  - CentralityTierAssignment: routers ranked by CMBA (0.3 degree + 0.4 betweenness +
+    0.3 closeness) and split into equal tiers, core to edge: by default LFU for the core,
+    FACR in the middle and LRU at the edge.
+  - LearnedAssignment: one LinUCB bandit per router, re-choosing that router's policy every
+    epoch from its own hit ratio (see policy_bandit).
+
+Every strategy has the selector interface used by run_simulation: start() at the beginning of
+the run, and step() every `epoch` iterations (epoch=None means the assignment is fixed).
+router_breakdown() lists each router's policy and results for the per-router exports.
+"""
+
+import csv
+import json
+import os
+
+from policy_bandit import BanditPolicySelector
+
+BREAKDOWN_PATH = 'Simulation_Results/router_breakdown.csv'
+BREAKDOWN_COLUMNS = ['Run', 'Router', 'Policy', 'Requests', 'Cache Hits', 'Cache Hit Ratio',
+                     'Evictions', 'Mean Latency']
+
+
+class StaticAssignment:
+    epoch = None
+
+    def __init__(self, mapping, default='LRU'):
+        self.mapping = dict(mapping)
+        self.default = default
+
+    @classmethod
+    def from_json(cls, path, default='LRU'):
+        with open(path) as file:
+            return cls(json.load(file), default=default)
+
+    def policies(self, routers):
+        return {router.name: self.mapping.get(router.name, self.default) for router in routers}
+
+    def start(self, routers, latency_model=None):
+        policies = self.policies(routers)
+        for router in routers:
+            router.caching_policy = policies[router.name]
+
+    def step(self, routers, latency_model=None):
+        pass
+
+
+class CentralityTierAssignment(StaticAssignment):
+    def __init__(self, tiers=('LFU', 'FACR', 'LRU')):
+        super().__init__({}, default=tiers[-1])
+        self.tiers = tuple(tiers)
+        self.scores = {}
+
+    def policies(self, routers):
+        from main import compute_network_metrics
+        from router_selection_system import RouterSelectionSystem
+
+        network_metrics = compute_network_metrics(routers)
+        selection = RouterSelectionSystem()
+        self.scores = {router.name: selection.calculate_cmba_score(router, network_metrics) for router in routers}
+        ranked = sorted(routers, key=lambda router: (-self.scores[router.name], router.name))
+        # Equal-sized tiers from the most central (core) to the least central (edge) routers
+        return {router.name: self.tiers[position * len(self.tiers) // len(ranked)]
+                for position, router in enumerate(ranked)}
+
+
+class LearnedAssignment(BanditPolicySelector):
+    def __init__(self, **kwargs):
+        kwargs.setdefault('shared', False)
+        super().__init__(**kwargs)
+
+
+def router_breakdown(routers, run_label, latency_model=None):
+    """One row per router (BREAKDOWN_COLUMNS) with the policy it ended the run with."""
+    rows = []
+    for router in routers:
+        model = latency_model if latency_model is not None else getattr(router, 'latency_model', None)
+        count = model.router_latency_count.get(router.name, 0) if model is not None else 0
+        mean_latency = model.router_latency_sum[router.name] / count if count else 0.0
+        requests = router.total_requests
+        rows.append([run_label, router.name, router.caching_policy, requests, router.cache_hits,
+                     router.cache_hits / requests if requests else 0.0, router.cache_evictions, mean_latency])
+    return rows
+
+
+def save_router_breakdown(rows, path=BREAKDOWN_PATH, append=True):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    write_header = not (append and os.path.exists(path))
+    with open(path, 'a' if append else 'w', newline='') as file:
+        writer = csv.writer(file)
+        if write_header:
+            writer.writerow(BREAKDOWN_COLUMNS)
+        writer.writerows(rows)
+
+
+def make_assignment(kind, mapping_path=None):
+    """Assignment strategy for the --assignment option ('static', 'tier', 'learned'), or None."""
+    if kind in (None, 'none'):
+        return None
+    if kind == 'static':
+        if not mapping_path:
+            raise ValueError("--assignment static needs --assignment-map (JSON {router: policy})")
+        return StaticAssignment.from_json(mapping_path)
+    if kind == 'tier':
+        return CentralityTierAssignment()
+    if kind == 'learned':
+        return LearnedAssignment()
+    raise ValueError(f"Unknown assignment strategy '{kind}'")
@@ -0,0 +1,155 @@
+"""
+Online caching-policy selection with a contextual bandit (discounted LinUCB).
+
+Every `epoch` iterations, BanditPolicySelector.step() scores the policy each router used
+during the epoch that just ended. The reward is the router's cache hit ratio, or a
+latency-based score. The selector then picks the next policy per router from the router's
+context:
+
+    [1, previous hit ratio, share of the epoch's requests, cache occupancy, eviction rate]
+
+LinUCB keeps A^-1 and b per arm and updates them with Sherman-Morrison, so each update
+costs O(d^2) with no offline training. Old observations are discounted by `discount` per
+update, so the estimates follow workload shifts within a few epochs. A small ridge term
+is re-added one coordinate at a time, which keeps A^-1 bounded at the same O(d^2) cost.
+The ridge prior (A = I, b = 0) gives every arm a finite bound before its first pull, so
+arms are chosen by UCB from the start; equal bounds (e.g. all arms untried) are broken at
+random, so routers sharing a model do not all start on the same arm.
+"""
+
+import numpy as np
+
+DEFAULT_ARMS = ('LRU', 'LFU', 'FIFO', 'MRU', 'FACR', 'Rdm')
+
+
+class LinUCB:
+    def __init__(self, arms, n_features, alpha=0.5, discount=0.9, ridge=1.0, rng=None):
+        self.arms = list(arms)
+        self.rng = rng if rng is not None else np.random.default_rng(0)  # tie-breaking
+        self.alpha = alpha
+        self.discount = discount
+        self.ridge = ridge
+        self.A_inv = {arm: np.eye(n_features) / ridge for arm in self.arms}
+        self.b = {arm: np.zeros(n_features) for arm in self.arms}
+        self._refresh_axis = {arm: 0 for arm in self.arms}
+        self.pulls = {arm: 0 for arm in self.arms}
+        self.updates = 0
+
+    def scores(self, x):
+        """Upper confidence bound of every arm for context `x`."""
+        result = {}
+        for arm in self.arms:
+            A_inv = self.A_inv[arm]
+            theta = A_inv @ self.b[arm]
+            result[arm] = float(theta @ x + self.alpha * np.sqrt(max(x @ A_inv @ x, 0.0)))
+        return result
+
+    def select(self, x):
+        scores = self.scores(x)
+        best = max(scores.values())
+        tied = [arm for arm in self.arms if scores[arm] >= best - 1e-12]
+        return tied[0] if len(tied) == 1 else tied[self.rng.integers(len(tied))]
+
+    @staticmethod
+    def _rank_one(A_inv, v, weight=1.0):
+        """Sherman-Morrison: (A + weight * v v^T)^-1 from A^-1."""
+        Av = A_inv @ v
+        return A_inv - weight * np.outer(Av, Av) / (1.0 + weight * (v @ Av))
+
+    def update(self, arm, x, reward):
+        # Discount the arm's history: A <- discount * A, b <- discount * b
+        A_inv = self.A_inv[arm] / self.discount
+        A_inv = self._rank_one(A_inv, x)
+        # Re-add the ridge lost to discounting, one axis per update (keeps A^-1 bounded)
+        n = len(x)
+        axis = self._refresh_axis[arm]
+        self._refresh_axis[arm] = (axis + 1) % n
+        A_inv = self._rank_one(A_inv, np.eye(n)[axis], weight=(1.0 - self.discount) * self.ridge * n)
+        self.A_inv[arm] = A_inv
+        self.b[arm] = self.discount * self.b[arm] + reward * x
+        self.pulls[arm] += 1
+        self.updates += 1
+
+
+class BanditPolicySelector:
+    """Picks a caching policy per router per epoch inside run_simulation (policy 'Bandit')."""
+
+    N_FEATURES = 5
+
+    def __init__(self, arms=DEFAULT_ARMS, epoch=20, reward='hit_ratio', alpha=0.5, discount=0.9,
+                 shared=True, latency_scale=0.05, seed=0):
+        if reward not in ('hit_ratio', 'latency'):
+            raise ValueError("reward must be 'hit_ratio' or 'latency'")
+        self.arms = tuple(arms)
+        self.epoch = epoch
+        self.reward = reward
+        self.alpha = alpha
+        self.discount = discount
+        self.shared = shared  # one model for all routers (the context tells them apart) or one per router
+        self.latency_scale = latency_scale
+        self.rng = np.random.default_rng(seed)  # own stream, so the request sequence is unaffected
+        self.models = {}
+        self.history = []  # (epoch, router name, policy, reward)
+        self.epochs = 0
+        self._last = {}  # router name -> (arm, context, counters at epoch start)
+
+    def _model(self, router_name):
+        key = None if self.shared else router_name
+        if key not in self.models:
+            self.models[key] = LinUCB(self.arms, self.N_FEATURES, alpha=self.alpha, discount=self.discount,
+                                      rng=self.rng)
+        return self.models[key]
+
+    @staticmethod
+    def _counters(router, latency_model):
+        latency_sum = latency_model.router_latency_sum.get(router.name, 0.0) if latency_model is not None else 0.0
+        latency_count = latency_model.router_latency_count.get(router.name, 0) if latency_model is not None else 0
+        return (router.total_requests, router.cache_hits, router.cache_evictions, latency_sum, latency_count)
+
+    def start(self, routers, latency_model=None):
+        """Choose every router's first policy (no observations yet)."""
+        self.epochs = 0
+        self._last = {}
+        for router in routers:
+            self._assign(router, np.array([1.0, 0.0, 1.0 / max(len(routers), 1), 0.0, 0.0]), latency_model)
+
+    def _assign(self, router, context, latency_model):
+        arm = self._model(router.name).select(context)
+        router.caching_policy = arm
+        self._last[router.name] = (arm, context, self._counters(router, latency_model))
+
+    def step(self, routers, latency_model=None):
+        """Reward the policies of the epoch that just ended and choose the next ones."""
+        self.epochs += 1
+        deltas = {}
+        for router in routers:
+            before = self._last[router.name][2]
+            deltas[router.name] = [now - then for now, then in zip(self._counters(router, latency_model), before)]
+        epoch_requests = sum(delta[0] for delta in deltas.values()) or 1
+
+        for router in routers:
+            arm, context, _ = self._last[router.name]
+            requests, hits, evictions, latency_sum, latency_count = deltas[router.name]
+            hit_ratio = hits / requests if requests else 0.0
+            if requests:
+                if self.reward == 'latency' and latency_count:
+                    reward = 1.0 / (1.0 + (latency_sum / latency_count) / self.latency_scale)
+                else:
+                    reward = hit_ratio
+                self._model(router.name).update(arm, context, reward)
+                self.history.append((self.epochs, router.name, arm, reward))
+            if router.cache_capacity_bytes:
+                occupancy = router.cs_bytes / router.cache_capacity_bytes
+            else:
+                occupancy = len(router.cs) / router.CACHE_LIMIT if router.CACHE_LIMIT else 0.0
+            next_context = np.array([1.0, hit_ratio, requests / epoch_requests, min(occupancy, 1.0),
+                                     evictions / requests if requests else 0.0])
+            self._assign(router, next_context, latency_model)
+
+    def summary(self):
+        """Epochs each policy was chosen (with an observed reward) and its mean reward."""
+        summary = {}
+        for _, _, arm, reward in self.history:
+            count, total = summary.get(arm, (0, 0.0))
+            summary[arm] = (count + 1, total + reward)
+        return {arm: {'epochs': count, 'mean_reward': total / count} for arm, (count, total) in summary.items()}
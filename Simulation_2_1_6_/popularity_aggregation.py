@@ -0,0 +1,142 @@
+"""
+Popularity aggregation across routers and policies.
+
+After each policy run, PopularityAggregator.add() copies every router's popularity table
+(EWMA score) and request counts out of memory as flat arrays. rankings() then builds the
+per-router, per-policy and global rankings with grouped pandas operations, and save()
+writes them to one consolidated long-format table:
+
+    Scope (Router / Policy / Global), Policy, Router, Content Name, Requests, Popularity, Rank
+
+Per-policy and global rows sum the scores and requests of all routers (and policies).
+"""
+
+import os
+
+AGGREGATE_PATH = 'Popularity_Table/Global/Popularity_Aggregate.csv'
+COLUMNS = ['Scope', 'Policy', 'Router', 'Content Name', 'Requests', 'Popularity', 'Rank']
+
+
+class PopularityAggregator:
+    def __init__(self):
+        # Names, routers and policies are stored as integer codes so grouping stays numeric
+        self.names, self.routers, self.policies = {}, {}, {}
+        self._rows = []  # (policy code, router code, name codes, requests, popularity) per router view
+
+    @staticmethod
+    def _code(table, key):
+        return table.setdefault(key, len(table))
+
+    def add(self, routers, policy):
+        """Record the current popularity state of `routers` for `policy`."""
+        import numpy as np
+
+        policy_code = self._code(self.policies, policy)
+        for router in routers:
+            table = router.popularity_table
+            names = table['Content Name'].tolist()
+            popularity = table['Popularity'].to_numpy(dtype=float)
+            counts = router.content_popularity
+            # Names seen by the request counter but absent from the table (e.g. trimmed) keep score 0
+            known = set(names)
+            extra = [name for name in counts.counts if name not in known]
+            if extra:
+                names = names + extra
+                popularity = np.concatenate([popularity, np.zeros(len(extra))])
+            codes = np.fromiter((self._code(self.names, name) for name in names), dtype=np.int64, count=len(names))
+            requests = np.fromiter((counts[name] for name in names), dtype=np.int64, count=len(names))
+            self._rows.append((policy_code, self._code(self.routers, router.name), codes, requests, popularity))
+
+    def _arrays(self):
+        import numpy as np
+
+        lengths = np.array([len(row[2]) for row in self._rows], dtype=np.int64)
+        policy = np.repeat(np.array([row[0] for row in self._rows], dtype=np.int64), lengths)
+        router = np.repeat(np.array([row[1] for row in self._rows], dtype=np.int64), lengths)
+        if self._rows:
+            name = np.concatenate([row[2] for row in self._rows])
+            requests = np.concatenate([row[3] for row in self._rows])
+            popularity = np.concatenate([row[4] for row in self._rows])
+        else:
+            name, requests, popularity = (np.array([], dtype=np.int64),) * 2 + (np.array([]),)
+        return policy, router, name, requests, popularity
+
+    @staticmethod
+    def _labels(table):
+        import numpy as np
+
+        labels = np.empty(len(table), dtype=object)
+        labels[list(table.values())] = list(table.keys())
+        return labels
+
+    def frame(self):
+        """One row per (policy, router, content)."""
+        import pandas as pd
+
+        policy, router, name, requests, popularity = self._arrays()
+        return pd.DataFrame({
+            'Policy': self._labels(self.policies)[policy],
+            'Router': self._labels(self.routers)[router],
+            'Content Name': self._labels(self.names)[name],
+            'Requests': requests,
+            'Popularity': popularity,
+        })
+
+    def rankings(self):
+        """Per-router, per-policy and global rankings as one DataFrame (COLUMNS)."""
+        import numpy as np
+        import pandas as pd
+
+        policy, router, name, requests, popularity = self._arrays()
+        df = pd.DataFrame({'Policy': policy, 'Router': router, 'Content Name': name,
+                           'Requests': requests, 'Popularity': popularity})
+
+        per_router = df.assign(Scope=0)
+        per_router['Rank'] = per_router.groupby(['Policy', 'Router'])['Popularity'].rank(method='min', ascending=False)
+
+        per_policy = df.groupby(['Policy', 'Content Name'], as_index=False)[['Requests', 'Popularity']].sum()
+        per_policy['Scope'] = 1
+        per_policy['Router'] = -1
+        per_policy['Rank'] = per_policy.groupby('Policy')['Popularity'].rank(method='min', ascending=False)
+
+        overall = df.groupby('Content Name', as_index=False)[['Requests', 'Popularity']].sum()
+        overall['Scope'] = 2
+        overall['Policy'] = -1
+        overall['Router'] = -1
+        overall['Rank'] = overall['Popularity'].rank(method='min', ascending=False)
+
+        result = pd.concat([overall, per_policy, per_router], ignore_index=True)
+        result['Rank'] = result['Rank'].astype(np.int64)
+        result.sort_values(['Scope', 'Policy', 'Router', 'Rank'], ascending=[False, True, True, True],
+                           kind='stable', inplace=True, ignore_index=True)
+
+        # Back from integer codes to labels ('' where a level does not apply)
+        scope = np.array(['Router', 'Policy', 'Global'], dtype=object)
+        result['Scope'] = scope[result['Scope'].to_numpy()]
+        for column, table in (('Policy', self.policies), ('Router', self.routers)):
+            labels = np.append(self._labels(table), '')  # code -1 picks the trailing ''
+            result[column] = labels[result[column].to_numpy()]
+        result['Content Name'] = self._labels(self.names)[result['Content Name'].to_numpy()]
+        result['Popularity'] = result['Popularity'].round(4)
+        return result[COLUMNS]
+
+    def global_ranking(self):
+        """Content Name, Aggregated Popularity, Rank across every router and policy."""
+        import numpy as np
+        import pandas as pd
+
+        _, _, name, _, popularity = self._arrays()
+        totals = np.bincount(name, weights=popularity, minlength=len(self.names))
+        order = np.argsort(-totals, kind='stable')
+        return pd.DataFrame({
+            'Content Name': self._labels(self.names)[order],
+            'Aggregated Popularity': totals[order],
+            'Rank': np.arange(1, len(order) + 1),
+        })
+
+    def save(self, path=AGGREGATE_PATH):
+        rankings = self.rankings()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        rankings.to_csv(path, index=False)
+        print(f"Aggregated popularity ({len(rankings)} rows) saved to {path}")
+        return rankings
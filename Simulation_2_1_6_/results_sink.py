@@ -0,0 +1,120 @@
+"""
+Streaming results storage.
+
+ResultsSink appends per-iteration result rows to disk while the simulation runs, holding
+at most `buffer_rows` rows in memory. A crash loses at most one buffer, and memory no
+longer grows with the number of iterations. CSV files are appended in chunks; Parquet
+files (needs pyarrow) get one row group per flush.
+
+The readers (load_results, iter_results, policy_means) load only the columns and chunks
+they need, so plots and comparisons can work straight from the file.
+"""
+
+import csv
+import os
+
+RESULTS_PATH = 'Simulation_Results/policy_comparison.csv'
+RESULT_COLUMNS = ["Policy", "Iteration", "Cache Hit Ratio", "Latency", "Hop Reduction", "Byte Hit Ratio"]
+
+
+def _format(path):
+    return 'parquet' if path.endswith('.parquet') else 'csv'
+
+
+class ResultsSink:
+    def __init__(self, path=RESULTS_PATH, buffer_rows=10_000, append=False):
+        self.path = path
+        self.format = _format(path)
+        self.buffer_rows = max(1, buffer_rows)
+        self.rows_written = 0
+        self._buffer = []
+        self._writer = None  # pyarrow ParquetWriter, opened on the first flush
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if self.format == 'parquet':
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError as exc:
+                raise ImportError("Parquet results need pyarrow (pip install pyarrow)") from exc
+            if append:
+                raise ValueError("Parquet results cannot be appended to; use a .csv path")
+        elif not (append and os.path.exists(path)):
+            with open(path, 'w', newline='') as file:
+                csv.writer(file).writerow(RESULT_COLUMNS)
+
+    def add(self, policy, iteration, row):
+        """Buffer one MetricsRegistry.iteration_row for `policy`, flushing when the buffer is full."""
+        self._buffer.append((policy, iteration, row[4], row[5], row[3], row[6]))
+        if len(self._buffer) >= self.buffer_rows:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        if self.format == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pylist([dict(zip(RESULT_COLUMNS, row)) for row in self._buffer])
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            with open(self.path, 'a', newline='') as file:
+                csv.writer(file).writerows(self._buffer)
+        self.rows_written += len(self._buffer)
+        self._buffer.clear()
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        print(f"Results saved to {self.path} ({self.rows_written} rows).")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def iter_results(path=RESULTS_PATH, columns=None, chunksize=100_000):
+    """Yield the results file as DataFrames of at most `chunksize` rows."""
+    import pandas as pd
+
+    if _format(path) == 'parquet':
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
+
+
+def load_results(source=RESULTS_PATH, columns=None):
+    """
+    Results as a DataFrame: `source` is a results file path (only `columns` are read) or
+    an in-memory list of per-iteration dicts.
+    """
+    import pandas as pd
+
+    if not isinstance(source, str):
+        df = pd.DataFrame(source)
+        return df[columns] if columns else df
+    if _format(source) == 'parquet':
+        return pd.read_parquet(source, columns=columns)
+    return pd.read_csv(source, usecols=columns)
+
+
+def policy_means(source=RESULTS_PATH, column="Cache Hit Ratio", chunksize=100_000):
+    """Mean of `column` per policy, accumulated chunk by chunk."""
+    import pandas as pd
+
+    if not isinstance(source, str):
+        return load_results(source, ["Policy", column]).groupby('Policy', sort=True)[column].mean()
+    sums, counts = pd.Series(dtype=float), pd.Series(dtype=float)
+    for chunk in iter_results(source, ["Policy", column], chunksize):
+        grouped = chunk.groupby('Policy')[column]
+        sums = sums.add(grouped.sum(), fill_value=0)
+        counts = counts.add(grouped.count(), fill_value=0)
+    return (sums / counts).sort_index()
@@ -1,42 +1,37 @@
 import os
 import glob
-import pandas as pd
-import numpy as np
-import networkx as nx
-import matplotlib.pyplot as plt
-from sklearn.ensemble import RandomForestClassifier, VotingClassifier
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import cross_val_score
-from sklearn.metrics import accuracy_score
 import pickle
 import datetime
 import csv
 from collections import defaultdict
-import random
+
+from path_index import PathIndex
 
 class RouterSelectionSystem:
     """
     Comprehensive router selection system implementing both manual and AI recommender processes.
     """
     
-    def __init__(self, network_topology=None):
+    def __init__(self, network_topology=None, latency_model=None):
         self.network_topology = network_topology
+        self.latency_model = latency_model  # LatencyModel; falls back to the one attached to the routers
         self.router_performance_data = {}
         self.manual_selection_history = []
         self.ai_recommendation_history = []
         self.ensemble_model = None
         self.task_migration_leader = None
         self.data_tables = {}
+        self.path_index = PathIndex()  # FIB paths and router lookups, cached until a FIB changes
         
-    def calculate_router_performance(self, router, network_metrics):
+    def calculate_router_performance(self, router, network_metrics, cache_occupancy=None):
         """
         Calculate comprehensive router performance metrics:
         CO (Cache Occupancy), cmBA (Centrality-based Multi-metric Balanced Assessment), 
         Latency, CHR (Cache Hit Ratio)
         """
-        # Cache Occupancy (CO) - percentage of cache used
-        cache_occupancy = (len(router.cs) / router.CACHE_LIMIT) * 100
+        # Cache Occupancy (CO) - percentage of cache used (from the run's CacheOccupancy if given)
+        if cache_occupancy is None:
+            cache_occupancy = (len(router.cs) / router.CACHE_LIMIT) * 100
         
         network_metrics = network_metrics or {}
         degree_metrics = network_metrics.get('degree_centrality', {})
@@ -69,7 +64,33 @@ class RouterSelectionSystem:
         return performance_data
 
     def _get_router_by_name(self, routers, router_name):
-        return next((router for router in routers if router.name == router_name), None)
+        return self.path_index.router(routers, router_name)
+
+    def _path_performance(self, routers, traced_path, network_metrics, content_request, occupancy=None):
+        """
+        Performance metrics of every router on `traced_path`. With a CacheOccupancy, CO is
+        read from it (bytes under a byte capacity) and each entry records whether the router
+        already holds `content_request`.
+        """
+        fill, holders = {}, set()
+        if occupancy is not None:
+            fill = dict(zip(traced_path, occupancy.occupancy(traced_path) * 100))
+            holders = set(occupancy.holders(content_request, traced_path))
+
+        path_router_metrics = []
+        for router_name in traced_path:
+            router = self._get_router_by_name(routers, router_name)
+            if not router:
+                continue
+            performance = self.calculate_router_performance(router, network_metrics, fill.get(router_name))
+            performance['holds_content'] = router_name in holders
+            path_router_metrics.append(performance)
+        return path_router_metrics
+
+    @staticmethod
+    def _caching_candidates(path_router_metrics):
+        """Routers that could take a new copy: those not caching the content yet (all if every one does)."""
+        return [m for m in path_router_metrics if not m.get('holds_content')] or path_router_metrics
 
     def _calculate_manual_score(self, metrics):
         """
@@ -179,22 +200,19 @@ class RouterSelectionSystem:
 
         return filename
 
-    def process_manual_path(self, routers, traced_path, network_metrics, iteration, policy, content_request):
+    def process_manual_path(self, routers, traced_path, network_metrics, iteration, policy, content_request,
+                            occupancy=None):
         """
         Process manual metrics for routers along a traced path,
         save per-iteration CSV, and return the best router.
+        With a CacheOccupancy, routers already caching the content are only chosen if all do.
         """
         if not traced_path:
             return None
 
-        path_router_metrics = []
-        for router_name in traced_path:
-            router = self._get_router_by_name(routers, router_name)
-            if not router:
-                continue
-            performance = self.calculate_router_performance(router, network_metrics)
+        path_router_metrics = self._path_performance(routers, traced_path, network_metrics, content_request, occupancy)
+        for performance in path_router_metrics:
             performance['manual_score'] = self._calculate_manual_score(performance)
-            path_router_metrics.append(performance)
 
         if not path_router_metrics:
             return None
@@ -211,7 +229,7 @@ class RouterSelectionSystem:
         )
 
         avg_cmba = sum(metric['cmba_score'] for metric in path_router_metrics) / len(path_router_metrics)
-        selected_router = max(path_router_metrics, key=lambda m: m['manual_score'])
+        selected_router = max(self._caching_candidates(path_router_metrics), key=lambda m: m['manual_score'])
 
         manual_selection_data = {
             'timestamp': datetime.datetime.now(),
@@ -231,21 +249,17 @@ class RouterSelectionSystem:
             'avg_cmba': avg_cmba
         }
 
-    def process_ai_path(self, routers, traced_path, network_metrics, iteration, policy, content_request):
+    def process_ai_path(self, routers, traced_path, network_metrics, iteration, policy, content_request,
+                        occupancy=None):
         """
         Process AI recommender metrics for routers along a traced path,
         apply ensemble learning with pruning, persist CSV, and return the best router.
+        With a CacheOccupancy, routers already caching the content are only chosen if all do.
         """
         if not traced_path:
             return None
 
-        path_router_metrics = []
-        for router_name in traced_path:
-            router = self._get_router_by_name(routers, router_name)
-            if not router:
-                continue
-            performance = self.calculate_router_performance(router, network_metrics)
-            path_router_metrics.append(performance)
+        path_router_metrics = self._path_performance(routers, traced_path, network_metrics, content_request, occupancy)
 
         if not path_router_metrics:
             return None
@@ -264,7 +278,7 @@ class RouterSelectionSystem:
             network_metrics=network_metrics
         )
 
-        best_router = max(scored_metrics, key=lambda m: m['ensemble_score'])
+        best_router = max(self._caching_candidates(scored_metrics), key=lambda m: m['ensemble_score'])
         self.task_migration_leader = best_router['router_name']
 
         ai_recommendation_data = {
@@ -301,18 +315,14 @@ class RouterSelectionSystem:
     
     def calculate_latency(self, router, network_metrics):
         """
-        Calculate latency based on router position and network load
+        Latency from this router to the data source and back, as observed by the latency
+        model on the paths of served requests (estimated from the hit ratio if none yet).
         """
-        base_latency = random.uniform(0.01, 0.1)  # Base latency in seconds
-        
-        # Adjust based on cache hit ratio (higher CHR = lower latency)
-        chr_factor = 1 - (router.cache_hits / max(router.cache_hits + router.publisher_hits, 1))
-        
-        # Adjust based on network position (central routers have lower latency)
-        centrality_factor = network_metrics.get('degree_centrality', {}).get(router.name, 0.5)
-        
-        latency = base_latency * chr_factor * (2 - centrality_factor)
-        return latency
+        model = self.latency_model or getattr(router, 'latency_model', None)
+        if model is None:
+            from latency_model import LatencyModel
+            model = self.latency_model = LatencyModel()
+        return model.router_latency(router)
     
     def manual_router_selection(self, routers, network_metrics, content_request):
         """
@@ -361,21 +371,8 @@ class RouterSelectionSystem:
         """
         Trace the path that content request would take through the network
         """
-        path = []
-        current_router = routers[0]  # Start from first router
-        
-        while current_router and len(path) < len(routers):
-            path.append(current_router.name)
-            
-            # Find next hop for this content
-            next_hop = current_router.fib.get(content_request)
-            if next_hop and hasattr(next_hop, 'name'):
-                # Find the router object
-                current_router = next((r for r in routers if r.name == next_hop.name), None)
-            else:
-                break
-                
-        return path
+        # Start from the first router; the path is cached until a FIB changes
+        return self.path_index.path(routers, content_request)
     
     def select_best_router_manual(self, router_metrics):
         """
@@ -439,6 +436,8 @@ class RouterSelectionSystem:
         """
         Prepare features for AI model input
         """
+        import numpy as np
+
         features = []
         for metrics in router_metrics:
             feature_vector = [
@@ -455,6 +454,10 @@ class RouterSelectionSystem:
         """
         Create ensemble learning model with pruning
         """
+        from sklearn.ensemble import RandomForestClassifier, VotingClassifier
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.tree import DecisionTreeClassifier
+
         # Create base models
         rf_model = RandomForestClassifier(n_estimators=100, random_state=42)
         dt_model = DecisionTreeClassifier(random_state=42)
@@ -646,6 +649,8 @@ class RouterSelectionSystem:
         print("Network topology updated for router selection system")
 
     def _load_process_dataframe(self, mode):
+        import pandas as pd
+
         mode = mode.capitalize()
         base_dir = f"Data_Tables/{mode}_Process"
         if not os.path.isdir(base_dir):
@@ -670,6 +675,9 @@ class RouterSelectionSystem:
         return combined
 
     def _plot_metric_lines(self, df, metric, title, ylabel, output_path):
+        import matplotlib.pyplot as plt
+        import pandas as pd
+
         if metric not in df.columns:
             return
         metric_df = df[['Iteration', 'Router', metric]].copy()
@@ -730,6 +738,8 @@ class RouterSelectionSystem:
         """
         Generate combined line graphs comparing Manual vs AI PATH averages for each metric.
         """
+        import matplotlib.pyplot as plt
+
         manual_df = self._load_process_dataframe("Manual")
         ai_df = self._load_process_dataframe("AI")
 
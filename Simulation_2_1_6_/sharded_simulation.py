@@ -0,0 +1,400 @@
+"""
+Sharded multi-process simulation of a single topology.
+
+The router graph is split into contiguous partitions (DFS order over the links, so
+neighbouring routers tend to share a shard) and every partition is simulated by its own
+worker process. Routers owned by another shard are replaced by RemoteRouter stand-ins:
+forwarding an interest to one queues a message instead of recursing, and data for a
+subscriber attached to another shard is queued the same way.
+
+Synchronisation is conservative and lock-step: the simulation advances in rounds, a
+message produced in round r is delivered in round r + 1 (one hop of lookahead), and every
+worker exchanges exactly one batch per peer per round over multiprocessing queues before
+it may start the next round. The run ends in the first round after the last injection in
+which no shard sent anything. Per-shard results are merged into global metrics at the end.
+"""
+
+import argparse
+import collections
+import contextlib
+import csv
+import io
+import multiprocessing
+import os
+import random
+import time
+
+from main import Router, Publisher, Subscriber, InterestPacket, DataPacket, ContentIDManager, TOPOLOGY_FORMAT_VERSION
+from metrics_registry import MetricsRegistry
+
+
+# ----- partitioning -----
+def _adjacency(topology):
+    adj = {r['name']: set() for r in topology['routers']}
+    for a, b in topology['links']:
+        if a in adj and b in adj:
+            adj[a].add(b)
+            adj[b].add(a)
+    return adj
+
+
+def partition_routers(topology, num_shards):
+    """Map every router name to a shard index, cutting a DFS ordering into equal contiguous blocks."""
+    adj = _adjacency(topology)
+    order, seen = [], set()
+    for start in (r['name'] for r in topology['routers']):
+        if start in seen:
+            continue
+        stack = [start]
+        while stack:
+            name = stack.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            order.append(name)
+            stack.extend(sorted(adj[name] - seen, reverse=True))
+
+    block = -(-len(order) // num_shards) if order else 1
+    return {name: position // block for position, name in enumerate(order)}
+
+
+def synthetic_topology(num_routers, branching=3, content_folders=('cats', 'dogs'), publisher_depth=1):
+    """
+    A k-ary router tree with one subscriber per leaf router. Every router down to
+    `publisher_depth` has its own publisher replica per content folder; deeper routers
+    forward all content towards their parent.
+    """
+    names = [f"Router{i}" for i in range(1, num_routers + 1)]
+    parent = {names[i]: names[(i - 1) // branching] for i in range(1, num_routers)}
+    depth = {names[0]: 0} if names else {}
+    for name in names[1:]:
+        depth[name] = depth[parent[name]] + 1
+
+    contents = {}
+    for folder in content_folders:
+        contents[folder] = sorted(
+            f for f in os.listdir(folder) if os.path.isfile(os.path.join(folder, f))) if os.path.isdir(folder) else []
+    all_contents = [c for items in contents.values() for c in items]
+
+    publishers, fib = [], {}
+    for name in names:
+        if depth[name] <= publisher_depth:
+            fib[name] = []
+            for folder, items in contents.items():
+                publisher = f"Publisher{len(publishers) + 1}"
+                publishers.append({'name': publisher, 'folder': folder})
+                fib[name].append([publisher, items])
+        else:
+            fib[name] = [[parent[name], all_contents]]
+
+    leaves = [name for name in names if name not in set(parent.values())] or names[:1]
+    return {
+        'format': 'ndn-topology',
+        'version': TOPOLOGY_FORMAT_VERSION,
+        'routers': [{'name': name, 'caching_policy': 'LRU', 'alpha': 0.9} for name in names],
+        'publishers': publishers,
+        'subscribers': [{'name': f"Subscriber{i}", 'router': leaf} for i, leaf in enumerate(leaves, 1)],
+        'links': [sorted((child, up)) for child, up in parent.items()],
+        'fib': fib,
+    }
+
+
+# ----- proxies for nodes owned by other shards -----
+class RemoteRouter(Router):
+    """Stand-in for a router owned by another shard; interests forwarded to it are queued."""
+
+    def __init__(self, name, shard, outbox):
+        self.name = name
+        self.shard = shard
+        self.outbox = outbox
+
+    def receive_interest(self, interest_packet, subscriber):
+        interest_packet.forwarded_remote = True
+        self.outbox[self.shard].append((
+            'interest', self.name, interest_packet.name, interest_packet.nonce,
+            list(interest_packet.path),
+            interest_packet.original_hop_count, interest_packet.seq, subscriber.name,
+        ))
+
+
+class RemoteSubscriber:
+    """Stand-in for a subscriber attached to a router of another shard; data for it is queued."""
+
+    def __init__(self, name, shard, outbox):
+        self.name = name
+        self.shard = shard
+        self.outbox = outbox
+
+    def receive_data(self, data_packet):
+        self.outbox[self.shard].append(('data', self.name, data_packet.name))
+
+
+# ----- worker -----
+def _request_schedule(topology, contents, iterations, seed, active_prob=0.9):
+    """The global request sequence [(seq, subscriber name, content)], identical in every shard."""
+    rng = random.Random(seed)
+    subscribers = [s['name'] for s in topology['subscribers'] if s['router'] is not None]
+    schedule = []
+    for seq in range(iterations):
+        if not subscribers or rng.random() >= active_prob:
+            continue
+        schedule.append((seq, rng.choice(subscribers), rng.choice(contents)))
+    return schedule
+
+
+class ShardWorker:
+    """Simulates the routers of one shard and exchanges boundary messages with its peers."""
+
+    def __init__(self, shard, num_shards, topology, assignment, inboxes, policy, cache_limit):
+        self.shard = shard
+        self.num_shards = num_shards
+        self.assignment = assignment
+        self.inboxes = inboxes
+        self.outbox = collections.defaultdict(list)
+        self.metrics = MetricsRegistry(keep_history=False)
+        self.metrics.begin_run(policy)
+        self.completions = {}  # subscriber -> (seq, original hops, actual hops) of its latest completed interest
+        self.messages_sent = 0
+        self.messages_received = 0
+        Router.CACHE_LIMIT = cache_limit
+
+        owned = {name for name, owner in assignment.items() if owner == shard}
+        self.routers = {r['name']: Router(r['name'], caching_policy=policy, alpha=r['alpha'])
+                        for r in topology['routers'] if r['name'] in owned}
+        publishers = [Publisher(p['name'], p['folder']) for p in topology['publishers']]
+        ContentIDManager.initialize_index(publishers)
+        nodes = {p.name: p for p in publishers}
+        nodes.update(self.routers)
+
+        remote = {}
+        for router in self.routers.values():
+            router.metrics = self.metrics
+            for hop_name, names in topology['fib'].get(router.name, []):
+                next_hop = nodes.get(hop_name)
+                if next_hop is None and hop_name in assignment:
+                    next_hop = remote.setdefault(hop_name, RemoteRouter(hop_name, assignment[hop_name], self.outbox))
+                router.fib.update(dict.fromkeys(names, next_hop))
+
+        self.subscriber_shard = {s['name']: assignment.get(s['router']) for s in topology['subscribers']}
+        self.subscribers = {}
+        self._remote_subscribers = {}
+        for entry in topology['subscribers']:
+            if entry['router'] in self.routers:
+                subscriber = Subscriber(entry['name'])
+                subscriber.connected_router = self.routers[entry['router']]
+                self.subscribers[entry['name']] = subscriber
+        self.original_hop_count = len(topology['routers'])
+
+    def _subscriber(self, name):
+        if name in self.subscribers:
+            return self.subscribers[name]
+        if name not in self._remote_subscribers:
+            self._remote_subscribers[name] = RemoteSubscriber(name, self.subscriber_shard[name], self.outbox)
+        return self._remote_subscribers[name]
+
+    def _forward(self, router, packet, subscriber_name):
+        """Hand `packet` to a local router and record the interest if it finished in this shard."""
+        router.receive_interest(packet, self._subscriber(subscriber_name))
+        if not getattr(packet, 'forwarded_remote', False):
+            previous = self.completions.get(subscriber_name)
+            if previous is None or previous[0] < packet.seq:
+                self.completions[subscriber_name] = (packet.seq, packet.original_hop_count, len(packet.path))
+
+    def inject(self, seq, subscriber_name, content):
+        subscriber = self.subscribers[subscriber_name]
+        packet = InterestPacket(content)
+        packet.original_hop_count = self.original_hop_count
+        packet.seq = seq
+        self._forward(subscriber.connected_router, packet, subscriber_name)
+
+    def deliver(self, message):
+        self.messages_received += 1
+        if message[0] == 'interest':
+            _, target, content, nonce, path, original, seq, subscriber_name = message
+            packet = InterestPacket(content)
+            packet.nonce = nonce
+            packet.path = path
+            packet.original_hop_count = original
+            packet.seq = seq
+            self._forward(self.routers[target], packet, subscriber_name)
+        else:
+            _, subscriber_name, content = message
+            self.subscribers[subscriber_name].receive_data(DataPacket(content, content))
+
+    def run(self, schedule, requests_per_round):
+        """Lock-step rounds: deliver last round's messages, inject this round's requests, exchange batches."""
+        by_round = collections.defaultdict(list)
+        for position, (seq, subscriber_name, content) in enumerate(schedule):
+            if subscriber_name in self.subscribers:
+                by_round[position // requests_per_round].append((seq, subscriber_name, content))
+        last_injection_round = (len(schedule) - 1) // requests_per_round if schedule else 0
+
+        pending = collections.defaultdict(list)  # round -> batches received early
+        inbox = []
+        round_no = 0
+        busy = wait = 0.0
+        while True:
+            start = time.perf_counter()
+            for message in inbox:
+                self.deliver(message)
+            for request in by_round.pop(round_no, []):
+                self.inject(*request)
+
+            sent = sum(len(messages) for messages in self.outbox.values())
+            self.messages_sent += sent
+            for peer in range(self.num_shards):
+                if peer != self.shard:
+                    self.inboxes[peer].put((round_no, self.shard, sent, self.outbox.pop(peer, [])))
+            self.outbox.clear()
+            busy += time.perf_counter() - start
+
+            start = time.perf_counter()
+            while len(pending[round_no]) < self.num_shards - 1:
+                batch = self.inboxes[self.shard].get()
+                pending[batch[0]].append(batch)
+            wait += time.perf_counter() - start
+
+            batches = sorted(pending.pop(round_no), key=lambda batch: batch[1])
+            global_sent = sent + sum(batch[2] for batch in batches)
+            inbox = [message for batch in batches for message in batch[3]]
+            if round_no >= last_injection_round and global_sent == 0:
+                break
+            round_no += 1
+
+        return {
+            'shard': self.shard,
+            'routers': len(self.routers),
+            'rounds': round_no + 1,
+            'cache_hits': self.metrics.cache_hits,
+            'publisher_hits': self.metrics.publisher_hits,
+            'completions': self.completions,
+            'messages_sent': self.messages_sent,
+            'messages_received': self.messages_received,
+            'busy_time': busy,
+            'wait_time': wait,
+            'router_stats': {name: (r.cache_hits, r.publisher_hits, r.cache_evictions) for name, r in self.routers.items()},
+        }
+
+
+def _worker_main(shard, num_shards, topology, assignment, inboxes, results, config):
+    workdir = os.path.join(config['output_dir'], f"shard_{shard}")
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+    random.seed(config['seed'] + shard)
+    output = io.StringIO() if config['quiet'] else None
+    with contextlib.redirect_stdout(output) if output is not None else contextlib.nullcontext():
+        worker = ShardWorker(shard, num_shards, topology, assignment, inboxes, config['policy'], config['cache_limit'])
+        results.put(worker.run(config['schedule'], config['requests_per_round']))
+
+
+# ----- coordinator -----
+def merge_results(shard_results):
+    """Combine per-shard counters into global metrics."""
+    cache_hits = sum(r['cache_hits'] for r in shard_results)
+    publisher_hits = sum(r['publisher_hits'] for r in shard_results)
+    latest = {}
+    for result in shard_results:
+        for subscriber, completion in result['completions'].items():
+            if subscriber not in latest or latest[subscriber][0] < completion[0]:
+                latest[subscriber] = completion
+    reductions = [(original - actual) / original for _, original, actual in latest.values() if original > 0]
+    total = cache_hits + publisher_hits
+    return {
+        'Total Requests': total,
+        'Cache Hits': cache_hits,
+        'Publisher Hits': publisher_hits,
+        'Cache Hit Ratio': (cache_hits / total) * 100 if total else 0,
+        'Hop Reduction': sum(reductions) / len(reductions) if reductions else 0,
+        'Cross-shard Messages': sum(r['messages_sent'] for r in shard_results),
+        'Rounds': max((r['rounds'] for r in shard_results), default=0),
+    }
+
+
+def run_sharded_simulation(topology, num_shards, iterations, policy='LRU', requests_per_round=8, seed=0,
+                           cache_limit=None, output_dir='Sharded_Run', quiet=True):
+    """Simulate `iterations` requests on `topology` split over `num_shards` worker processes."""
+    topology = dict(topology)
+    topology['publishers'] = [dict(p, folder=os.path.abspath(p['folder'])) for p in topology['publishers']]
+    contents = sorted({name for entries in topology['fib'].values() for _, names in entries for name in names})
+    assignment = partition_routers(topology, num_shards)
+    config = {
+        'policy': policy,
+        'seed': seed,
+        'quiet': quiet,
+        'cache_limit': cache_limit or Router.CACHE_LIMIT,
+        'requests_per_round': max(1, requests_per_round),
+        'schedule': _request_schedule(topology, contents, iterations, seed),
+        'output_dir': os.path.abspath(os.path.join(output_dir, f"{num_shards}_shards")),
+    }
+
+    ctx = multiprocessing.get_context()
+    inboxes = [ctx.Queue() for _ in range(num_shards)]
+    results = ctx.Queue()
+    start = time.perf_counter()
+    workers = [ctx.Process(target=_worker_main, args=(k, num_shards, topology, assignment, inboxes, results, config))
+               for k in range(num_shards)]
+    for process in workers:
+        process.start()
+    shard_results = sorted((results.get() for _ in workers), key=lambda r: r['shard'])
+    for process in workers:
+        process.join()
+    elapsed = time.perf_counter() - start
+
+    summary = merge_results(shard_results)
+    summary['Shards'] = num_shards
+    summary['Wall Time'] = elapsed
+    summary['Max Busy Time'] = max(r['busy_time'] for r in shard_results)
+    summary['Max Wait Time'] = max(r['wait_time'] for r in shard_results)
+    return summary, shard_results
+
+
+def measure_scaling(topology, shard_counts, iterations, **kwargs):
+    """Run the same workload with increasing shard counts; efficiency = T(1) / (n * T(n))."""
+    rows = []
+    baseline = None
+    for num_shards in shard_counts:
+        summary, _ = run_sharded_simulation(topology, num_shards, iterations, **kwargs)
+        baseline = baseline or summary['Wall Time'] * summary['Shards']
+        summary['Speedup'] = baseline / summary['Wall Time']
+        summary['Efficiency'] = summary['Speedup'] / num_shards
+        rows.append(summary)
+        print(f"{num_shards:>3} shard(s): {summary['Wall Time']:8.2f}s  speedup {summary['Speedup']:5.2f}  "
+              f"efficiency {summary['Efficiency']:5.2f}  hit ratio {summary['Cache Hit Ratio']:6.2f}%  "
+              f"cross-shard messages {summary['Cross-shard Messages']}")
+    return rows
+
+
+def save_scaling_report(rows, path='Simulation_Results/sharded_scaling.csv'):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Scaling report saved to {path}")
+
+
+def main(argv=None):
+    from main import load_topology
+
+    parser = argparse.ArgumentParser(description="Run one topology sharded across worker processes.")
+    parser.add_argument('--topology', help="Topology JSON written by save_topology (default: synthetic tree)")
+    parser.add_argument('--routers', type=int, default=1000, help="Routers in the synthetic tree topology")
+    parser.add_argument('--branching', type=int, default=3)
+    parser.add_argument('--publisher-depth', type=int, default=1,
+                        help="Routers down to this depth of the synthetic tree get their own publisher replicas")
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--requests-per-round', type=int, default=8)
+    parser.add_argument('--policy', default='LRU')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='Simulation_Results/sharded_scaling.csv')
+    args = parser.parse_args(argv)
+
+    topology = load_topology(args.topology) if args.topology else synthetic_topology(args.routers, args.branching, publisher_depth=args.publisher_depth)
+    rows = measure_scaling(topology, args.shards, args.iterations, policy=args.policy,
+                           requests_per_round=args.requests_per_round, seed=args.seed)
+    save_scaling_report(rows, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import numpy as np
+
+
+class SubscriberPopulation:
+    """
+    Array-backed state for the subscribers of a simulation.
+
+    Activity, attachment router index and last-hop statistics live in NumPy arrays so that
+    sampling the active clients of an iteration does not loop over Subscriber objects. The
+    Subscriber objects stay around as thin views (see Subscriber.active) for the
+    send_interest / receive_data API.
+
+    Sampling modes:
+      - 'bernoulli': draw the whole activity mask as one Bernoulli vector, then pick one
+        active subscriber (O(n) but vectorised).
+      - 'direct': draw the number of active subscribers from Binomial(n, p) and pick the
+        requester uniformly. Every subscriber is equally likely to be active, so a uniform
+        pick among the active ones is a uniform pick over everyone; this is O(1) per
+        iteration and leaves the activity mask untouched.
+    """
+
+    SAMPLING_MODES = ('bernoulli', 'direct')
+
+    def __init__(self, subscribers, routers, active_prob=0.9, sampling='direct', seed=None):
+        if sampling not in self.SAMPLING_MODES:
+            raise ValueError(f"Unknown sampling mode '{sampling}', expected one of {self.SAMPLING_MODES}")
+
+        self.subscribers = list(subscribers)
+        self.active_prob = active_prob
+        self.sampling = sampling
+        self.rng = np.random.default_rng(seed)
+
+        size = len(self.subscribers)
+        router_positions = {router.name: i for i, router in enumerate(routers)}
+        self.router_index = np.array(
+            [router_positions.get(getattr(s.connected_router, 'name', None), -1) for s in self.subscribers],
+            dtype=np.int32,
+        )
+        self.active = np.ones(size, dtype=bool)
+        self.last_original_hops = np.zeros(size, dtype=np.int32)
+        self.last_actual_hops = np.zeros(size, dtype=np.int32)
+        self.interest_count = np.zeros(size, dtype=np.int64)
+
+        for index, subscriber in enumerate(self.subscribers):
+            subscriber.population = self
+            subscriber.index = index
+
+    def __len__(self):
+        return len(self.subscribers)
+
+    def sample(self):
+        """Sample this iteration's activity; return (number of active subscribers, requester index or None)."""
+        size = len(self.subscribers)
+        if size == 0:
+            return 0, None
+
+        if self.sampling == 'bernoulli':
+            self.active = self.rng.random(size) < self.active_prob
+            active_indices = np.flatnonzero(self.active)
+            if active_indices.size == 0:
+                return 0, None
+            return int(active_indices.size), int(active_indices[self.rng.integers(active_indices.size)])
+
+        active_count = int(self.rng.binomial(size, self.active_prob))
+        if active_count == 0:
+            return 0, None
+        return active_count, int(self.rng.integers(size))
+
+    def record_hops(self, index, original_hop_count, actual_hop_count):
+        """Store the hop counts of the latest interest sent by subscriber `index`."""
+        self.last_original_hops[index] = original_hop_count
+        self.last_actual_hops[index] = actual_hop_count
+        self.interest_count[index] += 1
+
+    def hop_reduction(self):
+        """Average hop reduction over the latest interest of every subscriber that sent one."""
+        mask = (self.interest_count > 0) & (self.last_original_hops > 0)
+        if not mask.any():
+            return 0
+        original = self.last_original_hops[mask]
+        return float(np.mean((original - self.last_actual_hops[mask]) / original))
+
+    def subscribers_at(self, router_position):
+        """Subscribers attached to the router at `router_position` in the routers list."""
+        return [self.subscribers[i] for i in np.flatnonzero(self.router_index == router_position)]
@@ -0,0 +1,312 @@
+"""
+Topology generators with shortest-path FIBs.
+
+generate_topology() builds a router graph, places publishers and subscribers by rule, and
+fills every router's FIB. It returns the same 'ndn-topology' dict that save_topology
+writes, so main.build_network() turns it into a network.
+
+Graphs (all undirected; routers are Router1..RouterN):
+    barabasi_albert(n, m)        preferential attachment, m links per new router
+    waxman(n, alpha, beta)       random geometric graph; link weights are distances. O(n^2)
+    tree(n, branching)           k-ary tree
+    fat_tree(k)                  k-ary fat-tree switches: (k/2)^2 core, k pods of k/2 aggregation + k/2 edge
+    grid(rows, cols)             2-D mesh
+    load_edge_list(path)         "a b [weight]" per line, '#' comments
+
+FIBs are computed per content prefix (publisher folder). One multi-source shortest-path
+search runs from every router that hosts a replica of the prefix. It is a BFS when all
+links have unit weight and Dijkstra otherwise, so the total cost is O(P * E log V) for P
+prefixes. Each router forwards the prefix to its neighbour on a shortest path towards
+the nearest replica, and the replica's own router forwards to the publisher.
+"""
+
+import heapq
+import math
+import os
+import random
+from collections import deque
+
+CONTENT_FOLDERS = ('cats', 'dogs')
+GENERATORS = ('ba', 'waxman', 'tree', 'fat-tree', 'grid', 'file')
+
+
+class Graph:
+    """Adjacency lists over router indices 0..n-1, with optional link weights."""
+
+    def __init__(self, n, names=None):
+        self.n = n
+        self.names = names or [f"Router{i}" for i in range(1, n + 1)]
+        self.adj = [[] for _ in range(n)]
+        self.weights = None  # per-node list parallel to adj, or None for unit weights
+        self._edges = set()
+
+    def add_edge(self, a, b, weight=None):
+        if a == b or (min(a, b), max(a, b)) in self._edges:
+            return
+        self._edges.add((min(a, b), max(a, b)))
+        if weight is not None and self.weights is None:
+            self.weights = [[1.0] * len(neighbours) for neighbours in self.adj]
+        self.adj[a].append(b)
+        self.adj[b].append(a)
+        if self.weights is not None:
+            self.weights[a].append(1.0 if weight is None else weight)
+            self.weights[b].append(1.0 if weight is None else weight)
+
+    @property
+    def edges(self):
+        return sorted(self._edges)
+
+    def degree(self, node):
+        return len(self.adj[node])
+
+    def components(self):
+        label = [-1] * self.n
+        components = []
+        for start in range(self.n):
+            if label[start] >= 0:
+                continue
+            label[start] = len(components)
+            members, queue = [start], deque([start])
+            while queue:
+                node = queue.popleft()
+                for neighbour in self.adj[node]:
+                    if label[neighbour] < 0:
+                        label[neighbour] = len(components)
+                        members.append(neighbour)
+                        queue.append(neighbour)
+            components.append(members)
+        return components
+
+    def connect_components(self):
+        """Join every component to the first one with a single link."""
+        components = self.components()
+        for members in components[1:]:
+            self.add_edge(components[0][0], members[0], 1.0 if self.weights is not None else None)
+
+
+# ----- graph generators -----
+def barabasi_albert(n, m=2, rng=None):
+    rng = rng or random.Random()
+    graph = Graph(n)
+    m = max(1, min(m, n - 1))
+    targets = list(range(m))
+    repeated = []  # every node once per link end, so sampling is proportional to degree
+    for node in range(m, n):
+        for target in set(targets):
+            graph.add_edge(node, target)
+        repeated.extend(targets)
+        repeated.extend([node] * m)
+        targets = set()
+        while len(targets) < m:
+            targets.add(rng.choice(repeated))
+        targets = list(targets)
+    return graph
+
+
+def waxman(n, alpha=0.4, beta=0.1, rng=None):
+    """Routers uniform in the unit square; a link a-b exists with probability beta * exp(-d / (alpha * L))."""
+    rng = rng or random.Random()
+    graph = Graph(n)
+    points = [(rng.random(), rng.random()) for _ in range(n)]
+    scale = alpha * math.sqrt(2)
+    for a in range(n):
+        xa, ya = points[a]
+        for b in range(a + 1, n):
+            distance = math.hypot(xa - points[b][0], ya - points[b][1])
+            if rng.random() < beta * math.exp(-distance / scale):
+                graph.add_edge(a, b, distance)
+    if graph.weights is None:
+        graph.weights = [[] for _ in range(n)]
+    graph.connect_components()
+    return graph
+
+
+def tree(n, branching=3):
+    graph = Graph(n)
+    for node in range(1, n):
+        graph.add_edge(node, (node - 1) // branching)
+    return graph
+
+
+def fat_tree(k=4):
+    """Switch layer of a k-ary fat-tree (k even): core, aggregation and edge routers."""
+    if k < 2 or k % 2:
+        raise ValueError("fat-tree arity k must be an even number >= 2")
+    half = k // 2
+    core = [f"Core{i}" for i in range(1, half * half + 1)]
+    aggregation = [f"Agg{pod}_{i}" for pod in range(1, k + 1) for i in range(1, half + 1)]
+    edge = [f"Edge{pod}_{i}" for pod in range(1, k + 1) for i in range(1, half + 1)]
+    graph = Graph(len(core) + len(aggregation) + len(edge), core + aggregation + edge)
+    agg_base, edge_base = len(core), len(core) + len(aggregation)
+    for pod in range(k):
+        for i in range(half):
+            agg = agg_base + pod * half + i
+            for j in range(half):
+                graph.add_edge(agg, i * half + j)  # aggregation switch i reaches core group i
+                graph.add_edge(agg, edge_base + pod * half + j)
+    return graph
+
+
+def grid(rows, cols):
+    graph = Graph(rows * cols)
+    for row in range(rows):
+        for col in range(cols):
+            node = row * cols + col
+            if col + 1 < cols:
+                graph.add_edge(node, node + 1)
+            if row + 1 < rows:
+                graph.add_edge(node, node + cols)
+    return graph
+
+
+def load_edge_list(path):
+    """Graph from a whitespace-separated edge list: `a b` or `a b weight` per line."""
+    index, names, edges = {}, [], []
+    with open(path) as file:
+        for line in file:
+            fields = line.split('#', 1)[0].split()
+            if not fields:
+                continue
+            if len(fields) < 2:
+                raise ValueError(f"Bad edge list line in {path}: {line.strip()}")
+            ends = []
+            for name in fields[:2]:
+                if name not in index:
+                    index[name] = len(names)
+                    names.append(name)
+                ends.append(index[name])
+            edges.append((ends[0], ends[1], float(fields[2]) if len(fields) > 2 else None))
+    graph = Graph(len(names), names)
+    for a, b, weight in edges:
+        graph.add_edge(a, b, weight)
+    return graph
+
+
+# ----- placement -----
+def _ranked(graph, rule, rng):
+    nodes = list(range(graph.n))
+    if rule == 'core':
+        return sorted(nodes, key=lambda node: (-graph.degree(node), node))
+    if rule == 'edge':
+        return sorted(nodes, key=lambda node: (graph.degree(node), node))
+    if rule == 'random':
+        rng.shuffle(nodes)
+        return nodes
+    raise ValueError(f"Unknown placement rule '{rule}' (core, edge or random)")
+
+
+def place_publishers(graph, folders=CONTENT_FOLDERS, replicas=1, rule='core', rng=None):
+    """[(publisher name, folder, router index)]: `replicas` per folder on distinct routers where possible."""
+    ranked = _ranked(graph, rule, rng or random.Random())
+    placements = []
+    for replica in range(replicas):
+        for position, folder in enumerate(folders):
+            router = ranked[(replica * len(folders) + position) % len(ranked)]
+            placements.append((f"Publisher{len(placements) + 1}", folder, router))
+    return placements
+
+
+def place_subscribers(graph, count, rule='edge', rng=None):
+    """Router index of each subscriber. 'edge' spreads them over the least-connected quarter of the routers."""
+    rng = rng or random.Random()
+    if rule == 'uniform':
+        candidates = list(range(graph.n))
+    elif rule == 'random':
+        return [rng.randrange(graph.n) for _ in range(count)]
+    else:
+        ranked = _ranked(graph, rule, rng)
+        if rule == 'edge':
+            cutoff = graph.degree(ranked[max(graph.n // 4 - 1, 0)])
+            ranked = [node for node in ranked if graph.degree(node) <= cutoff]
+        candidates = ranked
+    return [candidates[i % len(candidates)] for i in range(count)]
+
+
+# ----- forwarding -----
+def shortest_path_next_hops(graph, sources):
+    """
+    Next hop of every router towards its nearest source (multi-source BFS, or Dijkstra with
+    link weights). Sources map to themselves; routers that cannot reach a source are absent.
+    """
+    next_hop = {source: source for source in sources}
+    if graph.weights is None:
+        queue = deque(sorted(next_hop))
+        while queue:
+            node = queue.popleft()
+            for neighbour in graph.adj[node]:
+                if neighbour not in next_hop:
+                    next_hop[neighbour] = node
+                    queue.append(neighbour)
+        return next_hop
+
+    distance = {source: 0.0 for source in sources}
+    heap = [(0.0, source, source) for source in sorted(sources)]
+    next_hop = {}
+    while heap:
+        cost, node, via = heapq.heappop(heap)
+        if node in next_hop:
+            continue
+        next_hop[node] = via
+        for neighbour, weight in zip(graph.adj[node], graph.weights[node]):
+            candidate = cost + weight
+            if neighbour not in next_hop and candidate < distance.get(neighbour, math.inf):
+                distance[neighbour] = candidate
+                heapq.heappush(heap, (candidate, neighbour, node))
+    return next_hop
+
+
+def catalog(folder):
+    return sorted(f for f in os.listdir(folder) if os.path.isfile(os.path.join(folder, f))) \
+        if os.path.isdir(folder) else []
+
+
+def make_graph(kind, routers=100, seed=None, path=None, m=2, branching=3, alpha=0.4, beta=0.1):
+    """Graph of about `routers` routers (fat-tree: the closest even arity; grid: the closest square)."""
+    rng = random.Random(seed)
+    if kind == 'ba':
+        return barabasi_albert(routers, m, rng)
+    if kind == 'waxman':
+        return waxman(routers, alpha, beta, rng)
+    if kind == 'tree':
+        return tree(routers, branching)
+    if kind == 'fat-tree':
+        k = max(2, 2 * round(math.sqrt(routers / 5)))  # 5k^2/4 switches
+        return fat_tree(k)
+    if kind == 'grid':
+        side = max(1, round(math.sqrt(routers)))
+        return grid(side, -(-routers // side))
+    if kind == 'file':
+        if not path:
+            raise ValueError("The 'file' topology needs an edge list path")
+        return load_edge_list(path)
+    raise ValueError(f"Unknown topology '{kind}' (choose from {', '.join(GENERATORS)})")
+
+
+def generate_topology(graph, subscribers=10, folders=CONTENT_FOLDERS, replicas=1, publisher_rule='core',
+                      subscriber_rule='edge', seed=None, caching_policy='LRU', alpha=0.9):
+    """Place publishers and subscribers on `graph` and compute every FIB; returns an 'ndn-topology' dict."""
+    from main import TOPOLOGY_FORMAT_VERSION
+
+    rng = random.Random(seed)
+    publishers = place_publishers(graph, folders, replicas, publisher_rule, rng)
+    attachments = place_subscribers(graph, subscribers, subscriber_rule, rng)
+
+    fib = {name: [] for name in graph.names}
+    for folder in folders:
+        names = catalog(folder)
+        hosts = {router: publisher for publisher, hosted, router in publishers if hosted == folder}
+        for router, via in shortest_path_next_hops(graph, hosts).items():
+            hop_name = hosts[router] if router == via else graph.names[via]
+            fib[graph.names[router]].append([hop_name, names])
+
+    return {
+        'format': 'ndn-topology',
+        'version': TOPOLOGY_FORMAT_VERSION,
+        'routers': [{'name': name, 'caching_policy': caching_policy, 'alpha': alpha} for name in graph.names],
+        'publishers': [{'name': name, 'folder': folder} for name, folder, _ in publishers],
+        'subscribers': [{'name': f"Subscriber{i}", 'router': graph.names[router]}
+                        for i, router in enumerate(attachments, 1)],
+        'links': [sorted((graph.names[a], graph.names[b])) for a, b in graph.edges]
+                 + [sorted((name, graph.names[router])) for name, _, router in publishers],
+        'fib': fib,
+    }
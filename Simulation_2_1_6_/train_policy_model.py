@@ -0,0 +1,221 @@
+"""
+Train the policy classifier used by the RandomForest policy in main.py.
+
+    python train_policy_model.py                 # search hyperparameters, save a new version
+    python train_policy_model.py --warm-start    # grow the latest forest with the new rows
+    python train_policy_model.py --publish       # also install it as models/random_forest_model.pkl
+
+Training data comes from the feature store (see Dataset Preprocessing.py), falling back to
+Processed_Features_with_Policy.csv. The search is cross-validated on every core (n_jobs).
+Fold assignments are cached in models/policy_classifier/folds.npz, keyed by a hash of each
+row's features and policy: rows that were already assigned keep their fold wherever they
+appear in the data (a rebuilt store or the legacy CSV may order rows differently), so
+growing data only needs folds for the new rows and scores stay comparable between versions.
+
+Every run writes models/policy_classifier/vNNNN/ with model.pkl and metadata.json, which
+records the hyperparameters, CV and hold-out accuracy, training time and inference latency.
+With --warm-start, the latest version's forest gets `--grow` extra trees fitted on the
+current data (RandomForest warm_start) instead of being retrained from zero.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+
+ARTIFACT_DIR = 'models/policy_classifier'
+PUBLISH_PATH = 'models/random_forest_model.pkl'
+LEGACY_DATAFILE = 'Processed_Features_with_Policy.csv'
+FEATURES = ['No of Clients', 'Total Requests', 'Hop Reduction', 'Cache Hit Ratio', 'Latency']
+TARGET = 'Policy'
+PARAM_GRID = {
+    'n_estimators': [100, 200, 400],
+    'max_depth': [None, 10, 20],
+    'min_samples_leaf': [1, 2, 4],
+    'max_features': ['sqrt', None],
+}
+
+
+def load_training_data(store_dir='Feature_Store'):
+    import pandas as pd
+    from feature_store import FeatureStore
+
+    if os.path.exists(os.path.join(store_dir, 'manifest.json')):
+        df = FeatureStore(store_dir).load(scaled=True)
+    elif os.path.exists(LEGACY_DATAFILE):
+        df = pd.read_csv(LEGACY_DATAFILE)
+    else:
+        raise FileNotFoundError("No training data found. Run 'Dataset Preprocessing.py' first.")
+    return df[FEATURES].to_numpy(dtype=float), df[TARGET].astype(str).to_numpy()
+
+
+def row_keys(X, y):
+    """64-bit hash of every (features, policy) row, so cached folds follow rows rather than positions."""
+    import pandas as pd
+
+    frame = pd.DataFrame(X)
+    frame[TARGET] = y
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def fold_assignments(y, keys, folds=5, seed=42, path=os.path.join(ARTIFACT_DIR, 'folds.npz')):
+    """Stratified fold id per row, reusing the cached ids of rows (by key) seen before."""
+    from sklearn.model_selection import StratifiedKFold
+
+    fold_ids = np.full(len(y), -1, dtype=np.int8)
+    if os.path.exists(path):
+        with np.load(path, allow_pickle=False) as data:
+            # Caches without row keys only matched rows by position; they cannot be trusted
+            if int(data['folds']) == folds and 'row_keys' in data:
+                known = dict(zip(data['row_keys'].tolist(), data['fold_ids'].tolist()))
+                fold_ids = np.array([known.get(key, -1) for key in keys.tolist()], dtype=np.int8)
+
+    new = fold_ids < 0
+    reused = len(y) - int(new.sum())
+    new_labels = y[new]
+    new_ids = np.arange(len(new_labels), dtype=np.int8) % folds
+    if len(new_labels):
+        counts = np.unique(new_labels, return_counts=True)[1]
+        if counts.min() >= folds:
+            splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed + reused)
+            for fold, (_, test_index) in enumerate(splitter.split(np.zeros(len(new_labels)), new_labels)):
+                new_ids[test_index] = fold
+        else:
+            np.random.default_rng(seed + reused).shuffle(new_ids)
+        fold_ids[new] = new_ids
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez(path, fold_ids=fold_ids, row_keys=keys, folds=folds)
+    return fold_ids
+
+
+def latest_version(artifact_dir=ARTIFACT_DIR):
+    versions = sorted(name for name in os.listdir(artifact_dir) if name.startswith('v')) \
+        if os.path.isdir(artifact_dir) else []
+    return os.path.join(artifact_dir, versions[-1]) if versions else None
+
+
+def inference_latency(model, X, repeats=200):
+    """Mean seconds for a single-row prediction (as in the simulation loop) and for a batch row."""
+    row = X[:1]
+    model.predict(row)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        model.predict(row)
+    single = (time.perf_counter() - start) / repeats
+    start = time.perf_counter()
+    model.predict(X)
+    batch = (time.perf_counter() - start) / max(len(X), 1)
+    return single, batch
+
+
+def save_artifact(model, metadata, artifact_dir=ARTIFACT_DIR):
+    previous = latest_version(artifact_dir)
+    number = int(os.path.basename(previous)[1:]) + 1 if previous else 1
+    version_dir = os.path.join(artifact_dir, f'v{number:04d}')
+    os.makedirs(version_dir)
+    with open(os.path.join(version_dir, 'model.pkl'), 'wb') as file:
+        pickle.dump(model, file)
+    metadata['version'] = number
+    with open(os.path.join(version_dir, 'metadata.json'), 'w') as file:
+        json.dump(metadata, file, indent=2)
+    return version_dir
+
+
+def train(X, y, n_jobs=-1, folds=5, n_iter=12, seed=42, warm_start=False, grow=50, artifact_dir=ARTIFACT_DIR):
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.model_selection import PredefinedSplit, RandomizedSearchCV
+
+    fold_ids = fold_assignments(y, row_keys(X, y), folds=folds, seed=seed, path=os.path.join(artifact_dir, 'folds.npz'))
+    # The last fold is the hold-out set; the others drive the search
+    holdout = fold_ids == folds - 1
+    X_train, y_train, X_test, y_test = X[~holdout], y[~holdout], X[holdout], y[holdout]
+    cv = PredefinedSplit(fold_ids[~holdout])
+
+    start = time.perf_counter()
+    previous = latest_version(artifact_dir)
+    model = None
+    if warm_start and previous:
+        with open(os.path.join(previous, 'model.pkl'), 'rb') as file:
+            model = pickle.load(file)
+        if set(model.classes_) != set(np.unique(y_train)):
+            print("The set of policies changed since the last version; running a full search instead.")
+            model = None
+    if model is not None:
+        # Keep the trees already grown and add `grow` new ones fitted on the current data
+        model.set_params(warm_start=True, n_jobs=n_jobs, n_estimators=model.n_estimators + grow)
+        model.fit(X_train, y_train)
+        params = {key: model.get_params()[key] for key in PARAM_GRID}
+        cv_score = None  # no search: the hold-out accuracy below is the comparable score
+        mode = f'warm-start from {os.path.basename(previous)}'
+    else:
+        search = RandomizedSearchCV(RandomForestClassifier(random_state=seed, n_jobs=1), PARAM_GRID,
+                                    n_iter=n_iter, cv=cv, n_jobs=n_jobs, random_state=seed, refit=True)
+        search.fit(X_train, y_train)
+        model = search.best_estimator_
+        params = search.best_params_
+        cv_score = float(search.best_score_)
+        mode = 'search'
+    training_time = time.perf_counter() - start
+
+    # Single-row predictions (as in the simulation loop) are faster without a worker pool
+    model.set_params(n_jobs=1, warm_start=False)
+    accuracy = float(model.score(X_test, y_test)) if len(y_test) else None
+    single, batch = inference_latency(model, X_test if len(X_test) else X)
+    metadata = {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'mode': mode,
+        'rows': int(len(y)),
+        'classes': sorted(np.unique(y).tolist()),
+        'params': {key: value for key, value in params.items() if isinstance(value, (int, float, str, bool, type(None)))},
+        'n_estimators': int(model.n_estimators),
+        'cv_accuracy': cv_score,
+        'holdout_accuracy': accuracy,
+        'training_seconds': training_time,
+        'inference_seconds_single_row': single,
+        'inference_seconds_per_row_batch': batch,
+        'n_jobs': n_jobs,
+    }
+    return model, metadata
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the caching-policy classifier")
+    parser.add_argument('--store', default='Feature_Store', help="Feature store directory")
+    parser.add_argument('--n-jobs', type=int, default=-1, help="Worker processes (-1 = all cores)")
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--n-iter', type=int, default=12, help="Hyperparameter settings sampled by the search")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--warm-start', action='store_true', help="Grow the latest model instead of searching")
+    parser.add_argument('--grow', type=int, default=50, help="Trees added per warm-start run")
+    parser.add_argument('--artifacts', default=ARTIFACT_DIR, help="Directory of versioned model artifacts")
+    parser.add_argument('--publish', action='store_true', help=f"Also save the model as {PUBLISH_PATH}")
+    args = parser.parse_args(argv)
+
+    X, y = load_training_data(args.store)
+    print(f"Training on {len(y)} rows ({len(np.unique(y))} policies)...")
+    model, metadata = train(X, y, n_jobs=args.n_jobs, folds=args.folds, n_iter=args.n_iter, seed=args.seed,
+                            warm_start=args.warm_start, grow=args.grow, artifact_dir=args.artifacts)
+    version_dir = save_artifact(model, metadata, args.artifacts)
+
+    print(f"{metadata['mode']}: {metadata['n_estimators']} trees, params {metadata['params']}")
+    if metadata['cv_accuracy'] is not None:
+        print(f"CV accuracy: {metadata['cv_accuracy'] * 100:.2f}%")
+    if metadata['holdout_accuracy'] is not None:
+        print(f"Hold-out accuracy: {metadata['holdout_accuracy'] * 100:.2f}%")
+    print(f"Training time: {metadata['training_seconds']:.2f}s, inference: "
+          f"{metadata['inference_seconds_single_row'] * 1e3:.2f} ms/row single, "
+          f"{metadata['inference_seconds_per_row_batch'] * 1e6:.1f} us/row batched")
+    print(f"Saved model version to {version_dir}")
+
+    if args.publish:
+        with open(PUBLISH_PATH, 'wb') as file:
+            pickle.dump(model, file)
+        print(f"Published model to {PUBLISH_PATH}")
+
+
+if __name__ == '__main__':
+    main()